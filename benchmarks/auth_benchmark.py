@@ -0,0 +1,92 @@
+"""
+Compara el rendimiento de la verificación del rol con la dependencia require_role frente
+al decorador has_permission, con y sin la caché de tokens ya verificados.
+
+Uso:
+    python -m benchmarks.auth_benchmark [peticiones]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from infrastructure.decorators.role_decorator import has_permission
+from infrastructure.security.authtentication import create_access_token, oauth2_scheme, token_cache
+from infrastructure.security.dependencies import require_role
+from schemas.auth_schema import TokenDataSchema
+
+
+def build_decorator_app() -> FastAPI:
+    """
+    Crea una aplicación que verifica el rol con el decorador.
+    """
+    app = FastAPI()
+
+    @app.get("/films")
+    @has_permission('films')
+    async def films(_token: str = Depends(oauth2_scheme)):
+        return {"ok": True}
+
+    return app
+
+
+def build_dependency_app() -> FastAPI:
+    """
+    Crea una aplicación que verifica el rol con la dependencia.
+    """
+    app = FastAPI()
+
+    @app.get("/films")
+    async def films(principal: TokenDataSchema = Depends(require_role('films'))):
+        return {"ok": principal.role == 'films'}
+
+    return app
+
+
+async def measure(
+    app: FastAPI,
+    token: str,
+    requests: int,
+    token_cache_enabled: bool,
+    concurrency: int = 50
+    ) -> float:
+    """
+    Devuelve las peticiones por segundo atendidas por la aplicación.
+    """
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                if not token_cache_enabled:
+                    token_cache.invalidate()
+                (await client.get("/films", headers=headers)).raise_for_status()
+
+        await asyncio.gather(*(call() for _ in range(concurrency)))
+        start = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    """
+    Ejecuta las mediciones e imprime los resultados.
+    """
+    token = create_access_token({"sub": "bench", "role": "films"})
+    apps = {
+        "has_permission": build_decorator_app(),
+        "require_role": build_dependency_app(),
+    }
+    for token_cache_enabled in (True, False):
+        label = "con caché" if token_cache_enabled else "sin caché"
+        for name, app in apps.items():
+            rate = await measure(app, token, requests, token_cache_enabled)
+            print(f"{label:10} {name:16} {rate:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
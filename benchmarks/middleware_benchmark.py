@@ -0,0 +1,88 @@
+"""
+Compara el rendimiento de SQLAlchemyMiddleware como middleware ASGI puro frente a la
+implementación anterior basada en BaseHTTPMiddleware.
+
+Uso:
+    python -m benchmarks.middleware_benchmark [peticiones]
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from infrastructure.middlewares.sql_alchemy_middleware import SQLAlchemyMiddleware, error_response
+
+
+class BaseHTTPSQLAlchemyMiddleware(BaseHTTPMiddleware):
+    """
+    Implementación anterior, con el mismo mapeo de excepciones, como referencia.
+    """
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            response = error_response(exc)
+            if response is None:
+                raise
+            return response
+
+
+def build_app(middleware) -> FastAPI:
+    """
+    Crea una aplicación con una ruta JSON y una ruta en streaming.
+    """
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/json")
+    async def json_route():
+        return {"id": 1, "username": "admin", "email": "admin@test.com"}
+
+    @app.get("/stream")
+    async def stream_route():
+        async def rows():
+            for i in range(100):
+                yield f'{{"id": {i}}}\n'
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int = 50) -> float:
+    """
+    Devuelve las peticiones por segundo atendidas por la aplicación en la ruta indicada.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call():
+            async with semaphore:
+                (await client.get(path)).raise_for_status()
+
+        await asyncio.gather(*(call() for _ in range(concurrency)))
+        start = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    """
+    Ejecuta las mediciones e imprime los resultados.
+    """
+    apps = {
+        "BaseHTTPMiddleware": build_app(BaseHTTPSQLAlchemyMiddleware),
+        "ASGI": build_app(SQLAlchemyMiddleware),
+    }
+    for path in ("/json", "/stream"):
+        for name, app in apps.items():
+            rate = await measure(app, path, requests)
+            print(f"{path:8} {name:20} {rate:10.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
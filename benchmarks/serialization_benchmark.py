@@ -0,0 +1,82 @@
+"""
+Mide el costo de serializar listas de películas según el tamaño de la lista:
+el camino por defecto de FastAPI (validación del response_model, jsonable_encoder y
+json.dumps) frente al volcado directo con TypeAdapter.dump_json, y JSONResponse frente a
+FastJSONResponse (orjson) para las respuestas proyectadas.
+
+Uso:
+    python -m benchmarks.serialization_benchmark
+"""
+import asyncio
+import time
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from infrastructure.responses import FastJSONResponse, type_adapter
+from schemas.film_schema import FilmSchema
+
+FILM = {
+    "id": "2baf70d1-42bb-4437-b551-e5fed5a87abe",
+    "title": "Castle in the Sky",
+    "original_title": "天空の城ラピュタ",
+    "original_title_romanised": "Tenkū no shiro Rapyuta",
+    "description": "The orphan Sheeta inherited a mysterious crystal that links her to the "
+                   "mythical sky-kingdom of Laputa." * 3,
+    "director": "Hayao Miyazaki",
+    "producer": "Isao Takahata",
+    "release_date": "1986",
+    "running_time": "124",
+    "rt_score": "95",
+    "people": [f"https://ghibliapi.vercel.app/people/{i}" for i in range(10)],
+    "species": ["https://ghibliapi.vercel.app/species/af3910a6-429f-4c74-9ad5-dfe1c4aa04f2"],
+    "locations": ["https://ghibliapi.vercel.app/locations/"],
+    "vehicles": ["https://ghibliapi.vercel.app/vehicles/"],
+    "url": "https://ghibliapi.vercel.app/films/2baf70d1-42bb-4437-b551-e5fed5a87abe"
+}
+
+
+def timeit(func: Callable[[], object], budget: float = 0.5) -> float:
+    """
+    Devuelve el tiempo medio por llamada en microsegundos.
+    """
+    func()
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < budget:
+        func()
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main() -> None:
+    """
+    Ejecuta las mediciones e imprime los resultados.
+    """
+    field = create_response_field(name="response", type_=List[FilmSchema])
+    adapter = type_adapter(List[FilmSchema])
+    loop = asyncio.new_event_loop()
+    print(f"{'films':>6} {'fastapi':>12} {'dump_json':>12} {'json dicts':>12} {'orjson dicts':>12}")
+    for size in (10, 100, 1000):
+        films = [FilmSchema(**FILM) for _ in range(size)]
+        dicts = [film.model_dump() for film in films]
+
+        def default_path():
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=films))
+            return JSONResponse(content=content).body
+
+        results = [
+            timeit(default_path),
+            timeit(lambda: adapter.dump_json(films)),
+            timeit(lambda: JSONResponse(content=dicts).body),
+            timeit(lambda: FastJSONResponse(content=dicts).body),
+        ]
+        print(f"{size:>6} " + " ".join(f"{value:>10.0f}us" for value in results))
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Módulo para agrupar llamadas concurrentes idénticas en una sola ejecución
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from fastapi import Request
+
+
+class SingleFlight:
+    """
+    Garantiza que, para una misma llave, solo exista una llamada en curso.
+    Los llamadores concurrentes esperan el resultado de la llamada original.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor de la clase SingleFlight.
+        """
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Ejecuta la función o se une a la ejecución en curso con la misma llave.
+
+        La llamada se ejecuta en una tarea independiente, de forma que la cancelación
+        de uno de los llamadores no afecta al resto.
+
+        Args:
+            key (Hashable): Llave que identifica la llamada.
+            func (Callable[[], Awaitable[Any]]): Función asíncrona a ejecutar.
+
+        Returns:
+            Any: El resultado de la función.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._create_task(key, func)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Lanza la función en segundo plano sin esperar su resultado.
+
+        Si ya existe una llamada en curso con la misma llave no se lanza una nueva.
+
+        Args:
+            key (Hashable): Llave que identifica la llamada.
+            func (Callable[[], Awaitable[Any]]): Función asíncrona a ejecutar.
+
+        Returns:
+            asyncio.Task: La tarea en curso asociada a la llave.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._create_task(key, func)
+            task.add_done_callback(_report_background_error)
+        return task
+
+    async def cancel_all(self) -> None:
+        """
+        Cancela las llamadas en curso, usado al detener la aplicación.
+        """
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve los contadores de llamadas ejecutadas y compartidas.
+        """
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
+
+
+    def _create_task(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        self.calls += 1
+        task = asyncio.ensure_future(func())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+
+def _report_background_error(task: asyncio.Task) -> None:
+    """
+    Informa los errores de las tareas en segundo plano que nadie espera.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        print(f'Error en tarea en segundo plano: {task.exception()!r}')
+
+
+def get_single_flight(request: Request) -> SingleFlight:
+    """
+    Devuelve el agrupador de llamadas creado durante el arranque de la aplicación.
+    """
+    return request.app.state.single_flight
@@ -0,0 +1,208 @@
+"""
+Módulo de caché en memoria con expiración (TTL) y desalojo LRU
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional
+import sys
+import time
+
+from fastapi import Request
+
+
+@dataclass
+class CacheEntry:
+    """
+    Representa un valor almacenado en la caché junto a sus metadatos.
+    """
+    value: Any
+    expires_at: float
+    stale_until: float
+    size: int
+    created_at: float
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    def is_fresh(self, now: float) -> bool:
+        """
+        Indica si la entrada aún no ha superado su TTL.
+        """
+        return now < self.expires_at
+
+
+class TTLCache:
+    """
+    Caché acotada por número de entradas y por memoria, con expiración por entrada
+    y desalojo del elemento menos usado recientemente (LRU).
+
+    Opcionalmente las entradas expiradas se conservan durante una ventana adicional
+    en la que pueden servirse como obsoletas (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 16 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        """
+        Constructor de la clase TTLCache.
+
+        Args:
+            max_entries (int, optional): Número máximo de entradas. Defaults to 512.
+            max_bytes (int, optional): Memoria máxima estimada en bytes. Defaults to 16 MB.
+            sizeof (Callable[[Any], int], optional): Función que estima el tamaño de un valor.
+            clock (Callable[[], float], optional): Reloj monotónico usado para la expiración.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clock = clock
+        self.current_bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Obtiene un valor vigente de la caché.
+
+        Args:
+            key (Hashable): Llave del valor.
+
+        Returns:
+            Optional[Any]: El valor almacenado o None si no existe o ya expiró.
+        """
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def get_entry(self, key: Hashable, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Obtiene la entrada de la caché, incluyendo las obsoletas si se permite.
+
+        Args:
+            key (Hashable): Llave del valor.
+            allow_stale (bool, optional): Devolver entradas expiradas que aún están dentro
+                de su ventana de obsolescencia. Defaults to False.
+
+        Returns:
+            Optional[CacheEntry]: La entrada encontrada o None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = self.clock()
+        if entry.is_fresh(now):
+            self.hits += 1
+        elif allow_stale and now < entry.stale_until:
+            self.stale_hits += 1
+        else:
+            if now >= entry.stale_until:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """Obtiene la entrada sin actualizar los contadores ni el orden LRU, incluso si
+        está obsoleta.
+
+        Args:
+            key (Hashable): Llave del valor.
+
+        Returns:
+            Optional[CacheEntry]: La entrada almacenada o None.
+        """
+        return self._entries.get(key)
+
+    def add_size(self, key: Hashable, size: int) -> None:
+        """Suma al tamaño de una entrada los datos derivados guardados en sus extras,
+        desalojando entradas si se supera la memoria máxima.
+
+        Args:
+            key (Hashable): Llave de la entrada.
+            size (int): Bytes adicionales.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.size += size
+        self.current_bytes += size
+        self._evict()
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0) -> CacheEntry:
+        """Almacena un valor en la caché desalojando las entradas menos usadas si es necesario.
+
+        Args:
+            key (Hashable): Llave del valor.
+            value (Any): Valor a almacenar.
+            ttl (float): Tiempo de vida en segundos.
+            stale_ttl (float, optional): Segundos adicionales durante los que la entrada
+                expirada puede servirse como obsoleta. Defaults to 0.
+
+        Returns:
+            CacheEntry: La entrada almacenada.
+        """
+        if key in self._entries:
+            self._remove(key)
+        now = self.clock()
+        entry = CacheEntry(
+            value=value,
+            expires_at=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            size=self.sizeof(value),
+            created_at=now)
+        self._entries[key] = entry
+        self.current_bytes += entry.size
+        self._evict()
+        return entry
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Elimina una entrada de la caché, o todas si no se especifica la llave.
+
+        Args:
+            key (Optional[Hashable], optional): Llave a eliminar. Defaults to None.
+        """
+        if key is None:
+            self._entries.clear()
+            self.current_bytes = 0
+        elif key in self._entries:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Devuelve los contadores de uso de la caché.
+        """
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+
+def get_ghibli_cache(request: Request) -> TTLCache:
+    """
+    Devuelve la caché de respuestas de Ghibli creada durante el arranque de la aplicación.
+    """
+    return request.app.state.ghibli_cache
@@ -0,0 +1,129 @@
+"""
+Módulo de compresión de respuestas HTTP: negociación de Accept-Encoding y compresión
+gzip o brotli (si el paquete opcional brotli está instalado)
+"""
+from typing import Callable, Dict, List, Optional
+import gzip
+import zlib
+
+from infrastructure.environment import get_environment_variables
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+env = get_environment_variables()
+
+# Codificaciones disponibles, en orden de preferencia ante la misma calidad
+AVAILABLE_ENCODINGS: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Elige la codificación a usar según la cabecera Accept-Encoding del cliente.
+
+    Args:
+        accept_encoding (Optional[str]): Valor de la cabecera, por ejemplo "gzip, br;q=0.9".
+
+    Returns:
+        Optional[str]: La codificación elegida o None si el cliente no acepta ninguna.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    candidates = [
+        (weights.get(encoding, wildcard), -position, encoding)
+        for position, encoding in enumerate(AVAILABLE_ENCODINGS)
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Comprime el cuerpo completo con la codificación indicada.
+
+    Args:
+        body (bytes): Cuerpo de la respuesta.
+        encoding (str): "gzip" o "br".
+
+    Returns:
+        bytes: Cuerpo comprimido.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=env.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=env.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def streaming_compressor(encoding: str) -> Callable[[bytes, bool], bytes]:
+    """Crea un compresor incremental para respuestas enviadas en varios fragmentos.
+
+    Args:
+        encoding (str): "gzip" o "br".
+
+    Returns:
+        Callable[[bytes, bool], bytes]: Función que recibe cada fragmento y si es el último,
+        y devuelve los bytes comprimidos disponibles.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=env.COMPRESSION_BROTLI_QUALITY)
+
+        def compress_br(chunk: bytes, last: bool) -> bytes:
+            data = compressor.process(chunk)
+            return data + (compressor.finish() if last else compressor.flush())
+        return compress_br
+
+    compressor = zlib.compressobj(env.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress_gzip(chunk: bytes, last: bool) -> bytes:
+        data = compressor.compress(chunk)
+        return data + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return compress_gzip
+
+
+def encoded_body(
+    store: Dict[str, bytes],
+    render: Callable[[], bytes],
+    accept_encoding: Optional[str],
+    minimum_size: Optional[int] = None
+    ) -> tuple[bytes, Optional[str], int]:
+    """Devuelve el cuerpo en la codificación negociada, reutilizando las versiones ya
+    serializadas y comprimidas guardadas en store.
+
+    Args:
+        store (Dict[str, bytes]): Cuerpos ya generados por codificación ("identity", "gzip",
+            "br"), normalmente guardados junto a la entrada de la caché.
+        render (Callable[[], bytes]): Genera el cuerpo sin comprimir si aún no existe.
+        accept_encoding (Optional[str]): Cabecera Accept-Encoding del cliente.
+        minimum_size (Optional[int], optional): Tamaño mínimo a comprimir. Defaults to
+            COMPRESSION_MINIMUM_SIZE.
+
+    Returns:
+        tuple[bytes, Optional[str], int]: El cuerpo, su codificación (None si no está
+        comprimido) y los bytes nuevos agregados a store.
+    """
+    added = 0
+    body = store.get("identity")
+    if body is None:
+        body = store["identity"] = render()
+        added += len(body)
+    if minimum_size is None:
+        minimum_size = env.COMPRESSION_MINIMUM_SIZE
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None or len(body) < minimum_size:
+        return body, None, added
+    compressed = store.get(encoding)
+    if compressed is None:
+        compressed = store[encoding] = compress(body, encoding)
+        added += len(compressed)
+    return compressed, encoding, added
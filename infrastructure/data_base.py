@@ -1,9 +1,14 @@
 """"
 Módulo de creación e interacción con la  base de datos 
 """
+import inspect
+from typing import Any
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
+from infrastructure.db_pool import MeasuredAsyncQueuePool, MeasuredQueuePool
 from infrastructure.environment import get_environment_variables
 
 # Runtime Environment Configuration
@@ -15,22 +20,72 @@ DATABASE_URL = (
     f"{env.DATABASE_PASSWORD}@{env.DATABASE_HOSTNAME}:"
     f"{env.DATABASE_PORT}/{env.DATABASE_NAME}")
 
+ASYNC_DATABASE_URL = (
+    f"{env.DATABASE_ASYNC_DIALECT}://{env.DATABASE_USERNAME}:"
+    f"{env.DATABASE_PASSWORD}@{env.DATABASE_HOSTNAME}:"
+    f"{env.DATABASE_PORT}/{env.DATABASE_NAME}")
+
+# Pool settings shared by both engines. Size workers so that
+# workers * (pool_size + max_overflow) stays below Postgres max_connections
+POOL_OPTIONS = {
+    "pool_size": env.DATABASE_POOL_SIZE,
+    "max_overflow": env.DATABASE_MAX_OVERFLOW,
+    "pool_timeout": env.DATABASE_POOL_TIMEOUT,
+    "pool_recycle": env.DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": env.DATABASE_POOL_PRE_PING,
+}
+
 # Create Database Engine
 Engine = create_engine(
-    DATABASE_URL, echo=env.DEBUG_MODE, future=True
+    DATABASE_URL, echo=env.DATABASE_ECHO, future=True,
+    poolclass=MeasuredQueuePool, **POOL_OPTIONS
 )
 
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=Engine
 )
 
+# Create Async Database Engine (asyncpg)
+AsyncDatabaseEngine = create_async_engine(
+    ASYNC_DATABASE_URL, echo=env.DATABASE_ECHO,
+    poolclass=MeasuredAsyncQueuePool, **POOL_OPTIONS
+)
+
+# expire_on_commit=False evita recargas implícitas, que no están permitidas en modo asíncrono
+AsyncSessionLocal = async_sessionmaker(
+    bind=AsyncDatabaseEngine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db_connection():
     """
-    Devuelve la conexión a la base de datos
+    Devuelve una sesión de la base de datos para la petición actual
     """
-    db = scoped_session(SessionLocal)
+    db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db_connection():
+    """
+    Devuelve una sesión asíncrona de la base de datos
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def maybe_await(result: Any) -> Any:
+    """Espera el resultado de un repositorio asíncrono o devuelve directamente el de uno
+    síncrono, de modo que los servicios funcionen con ambas implementaciones
+
+    Args:
+        result (Any): Valor o corrutina devuelta por el repositorio
+
+    Returns:
+        Any: El resultado de la operación
+    """
+    if inspect.isawaitable(result):
+        return await result
+    return result
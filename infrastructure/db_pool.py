@@ -0,0 +1,107 @@
+"""
+Módulo de pools de conexiones instrumentados para medir la ocupación y el tiempo de espera
+"""
+from typing import Callable, Dict
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Acumula el tiempo que las peticiones esperan para obtener una conexión del pool.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        """
+        Constructor de la clase PoolMetrics.
+
+        Args:
+            clock (Callable[[], float], optional): Reloj de alta resolución.
+        """
+        self.clock = clock
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def measure(self, checkout: Callable):
+        """Obtiene una conexión registrando el tiempo de espera.
+
+        Args:
+            checkout (Callable): Función que obtiene la conexión del pool.
+
+        Raises:
+            TimeoutError: Si se agota DATABASE_POOL_TIMEOUT sin conexiones libres.
+
+        Returns:
+            La conexión obtenida.
+        """
+        start = self.clock()
+        try:
+            connection = checkout()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = self.clock() - start
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        self.checkouts += 1
+        return connection
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Devuelve la cantidad de conexiones obtenidas y el tiempo de espera en milisegundos.
+        """
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": self.total_wait * 1000 / self.checkouts if self.checkouts else 0.0,
+            "wait_max_ms": self.max_wait * 1000,
+        }
+
+
+class MeasuredQueuePool(QueuePool):
+    """
+    Pool de conexiones síncrono que registra el tiempo de espera de cada checkout.
+    Las métricas son de la clase para conservarlas cuando el engine recrea el pool.
+    """
+    metrics = PoolMetrics()
+
+    def _do_get(self):
+        return self.metrics.measure(super()._do_get)
+
+
+class MeasuredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool de conexiones asíncrono que registra el tiempo de espera de cada checkout.
+    """
+    metrics = PoolMetrics()
+
+    def _do_get(self):
+        return self.metrics.measure(super()._do_get)
+
+
+def pool_stats(engine: Engine) -> Dict[str, int | float]:
+    """Devuelve la ocupación del pool del engine y el tiempo de espera de las conexiones.
+
+    Args:
+        engine (Engine): Engine síncrono, o el sync_engine de un AsyncEngine.
+
+    Returns:
+        Dict[str, int | float]: Estadísticas del pool.
+    """
+    pool = engine.pool
+    stats: Dict[str, int | float] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
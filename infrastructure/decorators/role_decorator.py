@@ -2,13 +2,15 @@
 """
 from functools import wraps
 from fastapi import HTTPException, status
-from jose import jwt, JWTError
+from jose import JWTError
 
-from infrastructure.environment import get_environment_variables
+from infrastructure.security.authtentication import decode_access_token
 
 def has_permission(role_name: str):
     """
     Decorador para verificar el rol de un usuario contenido en el token.
+    Las rutas usan la dependencia require_role, que decodifica el token una sola vez por
+    petición; el decorador se conserva como referencia en benchmarks/auth_benchmark.py.
     Args:
         allowed_roles (List[str]): Lista de roles permitidos.
     Returns:
@@ -25,9 +27,8 @@ def has_permission(role_name: str):
                 )
 
             try:
-                # Decodifica el token JWT
-                env = get_environment_variables()
-                payload = jwt.decode(token, env.SECRET_KEY, algorithms=[env.ALGORITHM])
+                # Decodifica el token JWT, o lo obtiene de la caché si ya fue verificado
+                payload = decode_access_token(token)
                 if payload["role"] != 'admin' and payload["role"] != role_name:
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
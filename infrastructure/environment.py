@@ -2,6 +2,7 @@
 Módulo de configuración de las variables de entorno
 """
 from functools import lru_cache
+from typing import Dict, Literal, Optional
 import os
 
 from pydantic_settings import BaseSettings
@@ -28,11 +29,62 @@ class EnvironmentSettings(BaseSettings):
     DATABASE_PASSWORD: str
     DATABASE_PORT: int
     DATABASE_USERNAME: str
+    DATABASE_ASYNC: bool = True
+    DATABASE_ASYNC_DIALECT: str = "postgresql+asyncpg"
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_ECHO: bool = False
     DEBUG_MODE: bool
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    FAST_JSON_RESPONSE: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    USER_BULK_BATCH_SIZE: int = 500
+    USER_EXPORT_BATCH_SIZE: int = 1000
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    LOGIN_RATE_LIMIT_STORAGE: Literal["memory", "redis"] = "memory"
+    LOGIN_RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    LOGIN_RATE_LIMIT_WINDOW: int = 300
+    LOGIN_MAX_ATTEMPTS_PER_USERNAME: int = 5
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 20
     GHIBLI_API:str
+    GHIBLI_HTTP2: bool = False
+    GHIBLI_MAX_CONNECTIONS: int = 100
+    GHIBLI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GHIBLI_KEEPALIVE_EXPIRY: float = 30.0
+    GHIBLI_CONNECT_TIMEOUT: float = 5.0
+    GHIBLI_READ_TIMEOUT: float = 10.0
+    GHIBLI_POOL_TIMEOUT: float = 5.0
+    GHIBLI_CACHE_MAX_ENTRIES: int = 512
+    GHIBLI_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    GHIBLI_CACHE_TTL: int = 3600
+    GHIBLI_CACHE_TTLS: Dict[str, int] = {}
+    GHIBLI_CACHE_STALE_TTL: int = 86400
+    GHIBLI_WARMUP: bool = True
+    GHIBLI_SOURCE: Literal["upstream", "snapshot"] = "upstream"
+    GHIBLI_SNAPSHOT_PATH: Optional[str] = None
+    GHIBLI_SNAPSHOT_RELOAD_SECONDS: int = 0
+    GHIBLI_EXPAND_CONCURRENCY: int = 10
+    GHIBLI_TOTAL_TIMEOUT: float = 15.0
+    GHIBLI_RETRY_ATTEMPTS: int = 2
+    GHIBLI_RETRY_BACKOFF: float = 0.1
+    GHIBLI_RETRY_BACKOFF_MAX: float = 1.0
+    GHIBLI_RETRY_BUDGET_RATIO: float = 0.2
+    GHIBLI_BREAKER_FAILURE_RATE: float = 0.5
+    GHIBLI_BREAKER_WINDOW: int = 20
+    GHIBLI_BREAKER_MIN_CALLS: int = 10
+    GHIBLI_BREAKER_OPEN_SECONDS: float = 30.0
+    GHIBLI_HTTP_MAX_AGE: int = 60
 
     class Config:
         """
@@ -0,0 +1,139 @@
+"""
+Módulo de validación condicional de respuestas HTTP: ETag, Last-Modified, Cache-Control
+y respuestas 304
+"""
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Sufijos que se agregan al ETag de las representaciones comprimidas
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def compute_etag(body: bytes) -> str:
+    """Calcula un ETag fuerte a partir del contenido del cuerpo.
+
+    Args:
+        body (bytes): Cuerpo de la respuesta sin comprimir.
+
+    Returns:
+        str: ETag entre comillas.
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Deriva el ETag de la representación comprimida, que debe ser distinto al de la
+    representación sin comprimir para que sea un validador fuerte.
+
+    Args:
+        etag (str): ETag del cuerpo sin comprimir.
+        encoding (str): Codificación aplicada ("gzip" o "br").
+
+    Returns:
+        str: ETag de la representación comprimida. Los ETags débiles no se modifican.
+    """
+    if etag.startswith("W/"):
+        return etag
+    return f'"{etag.strip(chr(34))}-{encoding}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """Busca en la cabecera If-None-Match un ETag equivalente al actual, con la
+    comparación débil de RFC 9110 y sin considerar la codificación de la representación.
+
+    Args:
+        if_none_match (Optional[str]): Cabecera If-None-Match del cliente.
+        etag (str): ETag actual del recurso.
+
+    Returns:
+        Optional[str]: El ETag del cliente que coincide, o None si ninguno coincide.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    current = _opaque_tag(etag)
+    for tag in if_none_match.split(","):
+        if tag.strip() and _opaque_tag(tag) == current:
+            return tag.strip()
+    return None
+
+
+def http_date(timestamp: float) -> str:
+    """
+    Formatea una marca de tiempo como fecha HTTP (RFC 9110).
+    """
+    return formatdate(timestamp, usegmt=True)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    cache_control: str,
+    last_modified: Optional[float] = None,
+    etag: Optional[str] = None
+    ) -> Response:
+    """Agrega los validadores y Cache-Control a la respuesta, o la reemplaza por un 304
+    sin cuerpo si el cliente ya tiene la misma versión.
+
+    Args:
+        request (Request): Petición con las cabeceras If-None-Match o If-Modified-Since.
+        response (Response): Respuesta completa ya serializada.
+        cache_control (str): Valor de la cabecera Cache-Control.
+        last_modified (Optional[float], optional): Fecha de la última modificación de los
+            datos, si se conoce. Defaults to None.
+        etag (Optional[str], optional): ETag ya calculado. Por defecto se calcula a partir
+            del cuerpo de la respuesta.
+
+    Returns:
+        Response: La respuesta con las cabeceras de caché, o una respuesta 304.
+    """
+    etag = etag or compute_etag(response.body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    validator = _not_modified_validator(request, etag, last_modified)
+    if validator is not None:
+        headers["ETag"] = validator
+        if "vary" in response.headers:
+            headers["Vary"] = response.headers["vary"]
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+def _not_modified_validator(
+    request: Request,
+    etag: str,
+    last_modified: Optional[float]
+    ) -> Optional[str]:
+    """
+    Evalúa las condiciones de la petición. If-None-Match tiene prioridad sobre
+    If-Modified-Since, que solo se usa si el cliente no envía ETags.
+    """
+    if "if-none-match" in request.headers:
+        return matching_etag(request.headers["if-none-match"], etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return None
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return etag if int(last_modified) <= since else None
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
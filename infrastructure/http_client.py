@@ -0,0 +1,54 @@
+"""
+Módulo de creación del cliente HTTP compartido para consumir servicios externos
+"""
+from fastapi import Request
+from httpx import AsyncClient, Limits, Timeout
+
+from infrastructure.environment import EnvironmentSettings
+
+
+def create_http_client(env: EnvironmentSettings) -> AsyncClient:
+    """Crea un cliente HTTP con conexiones persistentes (keep-alive) para toda la aplicación.
+
+    Args:
+        env (EnvironmentSettings): Variables de entorno con la configuración del pool.
+
+    Returns:
+        AsyncClient: Cliente HTTP asíncrono reutilizable entre peticiones.
+    """
+    limits = Limits(
+        max_connections=env.GHIBLI_MAX_CONNECTIONS,
+        max_keepalive_connections=env.GHIBLI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=env.GHIBLI_KEEPALIVE_EXPIRY,
+    )
+    timeout = Timeout(
+        connect=env.GHIBLI_CONNECT_TIMEOUT,
+        read=env.GHIBLI_READ_TIMEOUT,
+        write=env.GHIBLI_READ_TIMEOUT,
+        pool=env.GHIBLI_POOL_TIMEOUT,
+    )
+    return AsyncClient(
+        base_url=env.GHIBLI_API,
+        limits=limits,
+        timeout=timeout,
+        http2=env.GHIBLI_HTTP2 and _is_http2_available(),
+    )
+
+
+def get_http_client(request: Request) -> AsyncClient:
+    """
+    Devuelve el cliente HTTP creado durante el arranque de la aplicación.
+    """
+    return request.app.state.http_client
+
+
+def _is_http2_available() -> bool:
+    """
+    HTTP/2 requiere el paquete opcional h2 (httpx[http2]).
+    """
+    try:
+        import h2  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        print('HTTP/2 deshabilitado: instale httpx[http2] para habilitarlo')
+        return False
+    return True
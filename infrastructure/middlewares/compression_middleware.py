@@ -0,0 +1,104 @@
+"""Middleware para comprimir las respuestas con gzip o brotli
+"""
+from typing import Callable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from infrastructure.compression import (
+    compress,
+    env,
+    negotiate_encoding,
+    streaming_compressor
+)
+from infrastructure.http_cache import encoded_etag
+
+# Tipos de contenido que no se comprimen porque deben enviarse evento a evento
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+class CompressionMiddleware:
+    """ Middleware ASGI que comprime las respuestas según la cabecera Accept-Encoding.
+
+    Las respuestas menores a COMPRESSION_MINIMUM_SIZE y las que ya incluyen
+    Content-Encoding (por ejemplo, cuerpos precomprimidos desde la caché) se envían sin
+    cambios. Las respuestas en streaming se comprimen fragmento a fragmento.
+
+    Args:
+        app (ASGIApp): Aplicación ASGI envuelta.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, CompressionResponder(send, encoding).send)
+
+
+class CompressionResponder:
+    """
+    Retiene el inicio de la respuesta hasta conocer el primer fragmento del cuerpo y
+    decidir si se comprime.
+    """
+    def __init__(self, send: Send, encoding: str) -> None:
+        self.downstream = send
+        self.encoding = encoding
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[Callable[[bytes, bool], bytes]] = None
+
+    async def send(self, message: Message) -> None:
+        """
+        Procesa cada mensaje ASGI de la respuesta.
+        """
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is not None:
+            await self.downstream({
+                "type": "http.response.body",
+                "body": self.compressor(body, not more_body),
+                "more_body": more_body,
+            })
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if ("content-encoding" in headers
+                or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+                or (not more_body and len(body) < env.COMPRESSION_MINIMUM_SIZE)):
+            self.passthrough = True
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+        if not more_body:
+            body = compress(body, self.encoding)
+            headers["Content-Length"] = str(len(body))
+            await self.downstream(self.start_message)
+            await self.downstream({"type": "http.response.body", "body": body})
+            return
+
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.compressor = streaming_compressor(self.encoding)
+        await self.downstream(self.start_message)
+        await self.downstream({
+            "type": "http.response.body",
+            "body": self.compressor(body, False),
+            "more_body": True,
+        })
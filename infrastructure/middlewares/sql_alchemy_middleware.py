@@ -1,11 +1,10 @@
 """Middleware para intersectar todas las excepciones de SQLAlchemy
 """
-from fastapi import Request
+from typing import Optional
 from fastapi.exceptions import ResponseValidationError
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError, NoReferencedTableError, OperationalError
-from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.status import (
     HTTP_500_INTERNAL_SERVER_ERROR,
     HTTP_409_CONFLICT,
@@ -13,58 +12,82 @@ from starlette.status import (
     HTTP_400_BAD_REQUEST)
 
 
-class SQLAlchemyMiddleware(BaseHTTPMiddleware):
-    """ Middleware para manejar excepciones comunes de SQLAlchemy.
+def error_response(exc: Exception) -> Optional[JSONResponse]:
+    """Convierte una excepción conocida en la respuesta JSON correspondiente.
+
+    Args:
+        exc (Exception): Excepción lanzada por la aplicación.
+
+    Returns:
+        Optional[JSONResponse]: La respuesta con el detalle del error, o None si la
+        excepción no se gestiona aquí (por ejemplo, HTTPException de Starlette).
+    """
+    if isinstance(exc, IntegrityError):
+        detail = "Error de integridad: " + str(exc.orig)
+        status_code = HTTP_409_CONFLICT
+    elif isinstance(exc, NoReferencedTableError):
+        detail = "Error: No existe la tabla referenciada"
+        status_code = HTTP_404_NOT_FOUND
+    elif isinstance(exc, OperationalError):
+        detail = "Error de operación: " + str(exc.orig)
+        status_code = HTTP_400_BAD_REQUEST
+    elif isinstance(exc, (ValueError, TypeError, ResponseValidationError)):
+        detail = "Error interno del servidor: " + str(exc)
+        status_code = HTTP_500_INTERNAL_SERVER_ERROR
+    else:
+        return None
+
+    response_body = {"detail": detail, "status_code": status_code}
+    return JSONResponse(content=response_body, status_code=status_code)
+
+
+class SQLAlchemyMiddleware:
+    """ Middleware ASGI para manejar excepciones comunes de SQLAlchemy.
 
     Este middleware intercepta excepciones comunes de SQLAlchemy
     como IntegrityError, NoReferencedTableError y OperationalError,
     y responde con un JSON detallado.
 
-    Args:
-        BaseHTTPMiddleware: Clase base para middleware de Starlette.
-
-    Attributes:
-        No attributes.
+    A diferencia de BaseHTTPMiddleware, no crea una tarea ni envuelve el cuerpo de la
+    respuesta en cada petición: los mensajes se pasan directamente al servidor, por lo que
+    las respuestas en streaming no se almacenan en memoria.
 
-    Methods:
-        dispatch(request: Request, call_next) -> Response: Método principal del middleware
-            que intercepta y maneja las excepciones.
+    Args:
+        app (ASGIApp): Aplicación ASGI envuelta.
     """
-    async def dispatch(self, request: Request, call_next):
-        """
-        Método principal del middleware que intercepta y maneja las excepciones.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        Este método intercepta excepciones comunes de SQLAlchemy y responde
-        con un JSON detallado.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Ejecuta la aplicación y responde con un JSON detallado si lanza una excepción
+        conocida antes de comenzar la respuesta.
 
         Args:
-            request (Request): El objeto Request de Starlette.
-            call_next: La función para llamar al siguiente middleware.
-
-        Returns:
-            JSONResponse: Una respuesta JSON con detalles del error y 
-            el código de estado correspondiente.
+            scope (Scope): Datos de la conexión.
+            receive (Receive): Canal de lectura de mensajes.
+            send (Send): Canal de envío de mensajes.
 
         Raises:
-            StarletteHTTPException: Se vuelve a lanzar una excepción de Starlette si ocurre.
+            Exception: Se vuelve a lanzar la excepción si no es conocida o si la respuesta
+            ya comenzó a enviarse.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
-        except IntegrityError as e:
-            detail = "Error de integridad: " + str(e.orig)
-            status_code = HTTP_409_CONFLICT
-        except NoReferencedTableError:
-            detail = "Error: No existe la tabla referenciada"
-            status_code = HTTP_404_NOT_FOUND
-        except OperationalError as e:
-            detail = "Error de operación: " + str(e.orig)
-            status_code = HTTP_400_BAD_REQUEST
-        except StarletteHTTPException as e:
-            raise e
-        except (ValueError, TypeError, ResponseValidationError) as e:
-            detail = "Error interno del servidor: " + str(e)
-            status_code = HTTP_500_INTERNAL_SERVER_ERROR
-
-        response_body = {"detail": detail, "status_code": status_code}
-        return JSONResponse(content=response_body, status_code=status_code)
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            response = error_response(exc)
+            if response is None or response_started:
+                raise
+            await response(scope, receive, send)
@@ -0,0 +1,41 @@
+"""
+Módulo de paginación por cursor (keyset) con cursores opacos
+"""
+import base64
+import binascii
+import json
+
+
+def encode_cursor(last_id: int) -> str:
+    """Genera el cursor que apunta al registro siguiente al último de la página.
+
+    Args:
+        last_id (int): ID del último registro devuelto.
+
+    Returns:
+        str: Cursor opaco en base64 url-safe.
+    """
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Obtiene el ID a partir del cual continúa la paginación.
+
+    Args:
+        cursor (str): Cursor devuelto en la página anterior.
+
+    Raises:
+        ValueError: Si el cursor no es válido.
+
+    Returns:
+        int: ID del último registro de la página anterior.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Cursor inválido")
+    return last_id
@@ -0,0 +1,103 @@
+"""
+Módulo de lectura incremental de registros enviados como JSON, NDJSON o CSV
+"""
+from typing import AsyncIterator, Dict, List, Union
+import codecs
+import csv
+import json
+
+JSON_CONTENT_TYPE = "application/json"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+CSV_CONTENT_TYPE = "text/csv"
+RECORD_CONTENT_TYPES = (JSON_CONTENT_TYPE, NDJSON_CONTENT_TYPE, CSV_CONTENT_TYPE)
+
+
+class InvalidRecord:
+    """
+    Registro que no pudo interpretarse, con el motivo. Se entrega en lugar del registro
+    para que el resto del flujo siga procesándose.
+    """
+
+    def __init__(self, detail: str) -> None:
+        self.detail = detail
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Divide en líneas un flujo de bytes UTF-8 sin leerlo completo en memoria.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Fragmentos del cuerpo de la petición.
+
+    Yields:
+        str: Cada línea no vacía, sin el salto de línea.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+async def iter_records(
+    content_type: str,
+    chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[Union[Dict[str, str], InvalidRecord]]:
+    """Lee los registros del cuerpo según su tipo de contenido. NDJSON y CSV se procesan
+    línea a línea; un arreglo JSON requiere leer el cuerpo completo. Las líneas NDJSON mal
+    formadas y los elementos que no son objetos se entregan como InvalidRecord.
+
+    Args:
+        content_type (str): Uno de RECORD_CONTENT_TYPES.
+        chunks (AsyncIterator[bytes]): Fragmentos del cuerpo de la petición.
+
+    Raises:
+        ValueError: Si el cuerpo completo no tiene el formato indicado (un arreglo JSON
+            inválido o un cuerpo que no es UTF-8). Los campos CSV entre comillas no pueden
+            contener saltos de línea.
+
+    Yields:
+        Union[Dict[str, str], InvalidRecord]: Cada registro como diccionario, o el motivo
+        por el que no pudo interpretarse.
+    """
+    if content_type == JSON_CONTENT_TYPE:
+        body: List[bytes] = [chunk async for chunk in chunks]
+        try:
+            records = json.loads(b"".join(body) or b"[]")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"JSON inválido: {exc}") from exc
+        if not isinstance(records, list):
+            raise ValueError("Se esperaba un arreglo JSON de registros")
+        for record in records:
+            yield _as_record(record)
+    elif content_type == NDJSON_CONTENT_TYPE:
+        line_number = 0
+        async for line in iter_lines(chunks):
+            line_number += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield InvalidRecord(f"JSON inválido en la línea {line_number}: {exc}")
+                continue
+            yield _as_record(record)
+    elif content_type == CSV_CONTENT_TYPE:
+        header = None
+        async for line in iter_lines(chunks):
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            yield dict(zip(header, values))
+    else:
+        raise ValueError(f"Tipo de contenido no soportado: {content_type}")
+
+
+def _as_record(record) -> Union[Dict[str, str], InvalidRecord]:
+    if not isinstance(record, dict):
+        return InvalidRecord("Cada registro debe ser un objeto JSON")
+    return record
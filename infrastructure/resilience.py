@@ -0,0 +1,288 @@
+"""
+Módulo de políticas de resiliencia para las llamadas a servicios externos:
+timeouts, reintentos con presupuesto global y circuit breaker
+"""
+from collections import deque
+from typing import Awaitable, Callable, Dict
+import asyncio
+import random
+import time
+
+from fastapi import Request
+from httpx import RequestError, Response, TimeoutException
+
+from infrastructure.environment import EnvironmentSettings
+
+# Respuestas del servicio externo que se consideran transitorias
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """
+    Error al consultar un servicio externo, con el código HTTP que debe devolverse al cliente.
+    """
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker basado en la tasa de errores de las últimas llamadas.
+
+    Con el circuito cerrado las llamadas pasan normalmente. Cuando la tasa de errores de la
+    ventana supera el umbral, el circuito se abre y las llamadas fallan de inmediato. Pasado
+    el tiempo de apertura se permite una única llamada de prueba (semiabierto) que decide si
+    el circuito vuelve a cerrarse.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+        ) -> None:
+        """
+        Constructor de la clase CircuitBreaker.
+
+        Args:
+            failure_rate (float, optional): Tasa de errores que abre el circuito. Defaults to 0.5.
+            window_size (int, optional): Cantidad de llamadas evaluadas. Defaults to 20.
+            minimum_calls (int, optional): Llamadas mínimas antes de evaluar la tasa.
+                Defaults to 10.
+            open_seconds (float, optional): Segundos que el circuito permanece abierto.
+                Defaults to 30.0.
+            clock (Callable[[], float], optional): Reloj monotónico.
+        """
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._outcomes: deque = deque(maxlen=window_size)
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """
+        Indica si se permite realizar una llamada en el estado actual del circuito.
+        """
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """
+        Registra una llamada exitosa. Una prueba exitosa cierra el circuito.
+        """
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """
+        Registra una llamada fallida y abre el circuito si se supera el umbral. Una prueba
+        fallida vuelve a abrirlo y libera la prueba en curso.
+        """
+        self._probe_in_flight = False
+        self._outcomes.append(False)
+        if self.state == self.HALF_OPEN or self._should_open():
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+    def stats(self) -> Dict[str, int | float | str]:
+        """
+        Devuelve el estado del circuito y la tasa de errores de la ventana.
+        """
+        return {
+            "state": self.state,
+            "error_rate": self._error_rate(),
+            "rejected": self.rejected,
+        }
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _should_open(self) -> bool:
+        return (len(self._outcomes) >= self.minimum_calls
+                and self._error_rate() >= self.failure_rate)
+
+
+class RetryBudget:
+    """
+    Presupuesto global de reintentos: cada llamada aporta una fracción de reintento y cada
+    reintento consume uno completo, de modo que los reintentos nunca superan esa fracción
+    del tráfico aunque el servicio externo falle de forma sostenida.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0) -> None:
+        """
+        Constructor de la clase RetryBudget.
+
+        Args:
+            ratio (float, optional): Reintentos permitidos por llamada. Defaults to 0.2.
+            max_tokens (float, optional): Reintentos acumulables. Defaults to 10.0.
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        """
+        Registra una llamada original, que aporta saldo para futuros reintentos.
+        """
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        Consume un reintento si queda saldo disponible.
+        """
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class UpstreamGuard:
+    """
+    Aplica a cada llamada externa el circuit breaker, los reintentos con backoff exponencial
+    y jitter limitados por el presupuesto global, y un timeout total.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        retry_budget: RetryBudget,
+        max_retries: int = 2,
+        backoff: float = 0.1,
+        max_backoff: float = 1.0,
+        total_timeout: float = 15.0
+        ) -> None:
+        """
+        Constructor de la clase UpstreamGuard.
+
+        Args:
+            breaker (CircuitBreaker): Circuit breaker del servicio externo.
+            retry_budget (RetryBudget): Presupuesto global de reintentos.
+            max_retries (int, optional): Reintentos máximos por llamada. Defaults to 2.
+            backoff (float, optional): Espera base entre reintentos en segundos. Defaults to 0.1.
+            max_backoff (float, optional): Espera máxima entre reintentos. Defaults to 1.0.
+            total_timeout (float, optional): Tiempo máximo de la llamada incluyendo los
+                reintentos. Defaults to 15.0.
+        """
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.total_timeout = total_timeout
+        self.retries = 0
+
+    @classmethod
+    def from_settings(cls, env: EnvironmentSettings) -> "UpstreamGuard":
+        """Construye la política a partir de las variables de entorno
+
+        Args:
+            env (EnvironmentSettings): Variables de entorno
+
+        Returns:
+            UpstreamGuard: Política configurada
+        """
+        return cls(
+            breaker=CircuitBreaker(
+                failure_rate=env.GHIBLI_BREAKER_FAILURE_RATE,
+                window_size=env.GHIBLI_BREAKER_WINDOW,
+                minimum_calls=env.GHIBLI_BREAKER_MIN_CALLS,
+                open_seconds=env.GHIBLI_BREAKER_OPEN_SECONDS),
+            retry_budget=RetryBudget(ratio=env.GHIBLI_RETRY_BUDGET_RATIO),
+            max_retries=env.GHIBLI_RETRY_ATTEMPTS,
+            backoff=env.GHIBLI_RETRY_BACKOFF,
+            max_backoff=env.GHIBLI_RETRY_BACKOFF_MAX,
+            total_timeout=env.GHIBLI_TOTAL_TIMEOUT)
+
+    async def call(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        """Ejecuta la llamada aplicando la política de resiliencia.
+
+        Args:
+            send (Callable[[], Awaitable[Response]]): Función que realiza la petición HTTP.
+
+        Cualquier otra excepción, incluida la cancelación de la tarea, se registra como un
+        fallo antes de propagarse, para que una prueba en el estado semiabierto no quede
+        pendiente indefinidamente.
+
+        Raises:
+            UpstreamError: 503 si el circuito está abierto, 504 si se agota el tiempo y 502
+                si el servicio externo sigue fallando tras los reintentos.
+
+        Returns:
+            Response: La respuesta del servicio externo, que puede ser un error no transitorio.
+        """
+        if not self.breaker.allow():
+            raise UpstreamError(503, "Servicio externo no disponible temporalmente")
+        self.retry_budget.deposit()
+        try:
+            async with asyncio.timeout(self.total_timeout):
+                response = await self._send_with_retries(send)
+        except TimeoutError as exc:
+            self.breaker.record_failure()
+            raise UpstreamError(504, "Tiempo de espera agotado con el servicio externo") from exc
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def stats(self) -> Dict[str, int | float | str]:
+        """
+        Devuelve el estado del circuito y el consumo de reintentos.
+        """
+        return {
+            **self.breaker.stats(),
+            "retries": self.retries,
+            "retry_tokens": self.retry_budget.tokens,
+        }
+
+    async def _send_with_retries(self, send: Callable[[], Awaitable[Response]]) -> Response:
+        attempt = 0
+        while True:
+            try:
+                response = await send()
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                error = UpstreamError(502, f"HTTP status error: {response.status_code}")
+            except TimeoutException as exc:
+                error = UpstreamError(504, f"Request timeout: {exc!r}")
+            except RequestError as exc:
+                error = UpstreamError(502, f"Request error: {exc!r}")
+            if attempt >= self.max_retries or not self.retry_budget.try_spend():
+                raise error
+            attempt += 1
+            self.retries += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, delay))
+
+
+def get_upstream_guard(request: Request) -> UpstreamGuard:
+    """
+    Devuelve la política de resiliencia de Ghibli creada durante el arranque de la aplicación.
+    """
+    return request.app.state.ghibli_guard
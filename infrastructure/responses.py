@@ -0,0 +1,79 @@
+"""
+Módulo de respuestas JSON rápidas: serialización con orjson y volcado directo de los
+modelos Pydantic, sin pasar por jsonable_encoder
+"""
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from infrastructure.environment import get_environment_variables
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+env = get_environment_variables()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson. Si orjson no está instalado se comporta
+    como JSONResponse.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(model_type: Any) -> TypeAdapter:
+    """Devuelve el TypeAdapter del tipo indicado, creado una única vez por tipo.
+
+    Args:
+        model_type (Any): Tipo de la respuesta, por ejemplo List[FilmSchema].
+
+    Returns:
+        TypeAdapter: Validador y serializador del tipo.
+    """
+    return TypeAdapter(model_type)
+
+
+def model_response(
+    content: Any,
+    model_type: Any,
+    from_attributes: bool = False,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+    ) -> Response:
+    """Serializa el contenido directamente con el serializador de Pydantic (pydantic-core),
+    evitando la validación del response_model, jsonable_encoder y json.dumps de FastAPI.
+
+    Si FAST_JSON_RESPONSE está deshabilitado se serializa como lo hace FastAPI por
+    defecto (jsonable_encoder y json.dumps), para poder comparar ambos caminos.
+
+    Args:
+        content (Any): Modelos a serializar, u objetos ORM si from_attributes es True.
+        model_type (Any): Tipo de la respuesta, por ejemplo List[FilmSchema].
+        from_attributes (bool, optional): Convierte primero los objetos ORM al modelo.
+            Defaults to False.
+        status_code (int, optional): Código HTTP de la respuesta. Defaults to 200.
+        headers (Optional[Mapping[str, str]], optional): Cabeceras adicionales.
+
+    Returns:
+        Response: Respuesta con el JSON serializado.
+    """
+    adapter = type_adapter(model_type)
+    if from_attributes:
+        content = adapter.validate_python(content, from_attributes=True)
+    if not env.FAST_JSON_RESPONSE:
+        return JSONResponse(
+            content=jsonable_encoder(content), status_code=status_code, headers=headers)
+    return Response(
+        content=adapter.dump_json(content), status_code=status_code, headers=headers,
+        media_type="application/json")
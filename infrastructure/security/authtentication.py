@@ -1,16 +1,25 @@
 """Módulo para gestionar la seguridad en la autenticación
 """
 # Runtime Environment Configuration
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import hashlib
+import secrets
+import time
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 
+from infrastructure.cache.ttl_cache import TTLCache
 from infrastructure.environment import get_environment_variables
 
 env = get_environment_variables()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+# Tokens ya verificados, indexados por su hash SHA-256, hasta su expiración
+token_cache = TTLCache(max_entries=env.TOKEN_CACHE_MAX_ENTRIES)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar si dos contraseñas
@@ -36,6 +45,57 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+@lru_cache
+def get_password_executor() -> Executor:
+    """Devuelve el pool acotado donde se ejecuta bcrypt, fuera del event loop.
+    bcrypt libera el GIL, por lo que un pool de hilos es suficiente; el pool de procesos
+    queda disponible mediante PASSWORD_HASH_EXECUTOR=process.
+
+    Returns:
+        Executor: Pool de hilos o de procesos con PASSWORD_HASH_WORKERS trabajadores
+    """
+    if env.PASSWORD_HASH_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=env.PASSWORD_HASH_WORKERS)
+    return ThreadPoolExecutor(
+        max_workers=env.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def shutdown_password_executor() -> None:
+    """
+    Libera el pool de cifrado de contraseñas al detener la aplicación.
+    """
+    if get_password_executor.cache_info().currsize:
+        get_password_executor().shutdown(wait=True)
+        get_password_executor.cache_clear()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verificar dos contraseñas sin bloquear el event loop
+
+    Args:
+        plain_password (str): Contraseña en texto plano
+        hashed_password (str): contraseña cifrada
+
+    Returns:
+        bool: Retorna true si son iguales, false si no
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_password_executor(), verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Cifrar la contraseña sin bloquear el event loop
+
+    Args:
+        password (str): Contraseña en texto plano
+
+    Returns:
+        str: retorna la contraseña cifrada
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), get_password_hash, password)
+
 def create_access_token(data: dict) -> str:
     """Crear un token de acceso a los usuarios que validen sus credenciales
 
@@ -56,3 +116,51 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, env.SECRET_KEY, algorithm=env.ALGORITHM)
     return encoded_jwt
+
+def create_refresh_token() -> str:
+    """Crear un token de actualización opaco y aleatorio
+
+    Returns:
+        str: El token de actualización generado
+    """
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """Calcula el hash con el que se guarda el token de actualización. El token es aleatorio
+    y de 256 bits, por lo que basta con SHA-256 y no requiere un hash lento como bcrypt.
+
+    Args:
+        token (str): Token de actualización
+
+    Returns:
+        str: Hash SHA-256 en hexadecimal
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_access_token(token: str) -> dict:
+    """Decodifica y verifica un token de acceso. Los tokens ya verificados se guardan en
+    caché hasta su expiración, de modo que las peticiones siguientes con el mismo token
+    solo requieren una búsqueda por su hash. Cada llamada recibe su propia copia de los
+    valores, por lo que modificarlos no afecta a la caché.
+
+    Args:
+        token (str): Token de acceso
+
+    Raises:
+        JWTError: Si el token es inválido o ha expirado
+
+    Returns:
+        dict: Valores contenidos en el token
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
+    payload = jwt.decode(token, env.SECRET_KEY, algorithms=[env.ALGORITHM])
+    ttl = env.TOKEN_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, payload, ttl)
+    return dict(payload)
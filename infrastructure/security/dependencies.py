@@ -0,0 +1,59 @@
+"""Dependencias de FastAPI para autenticar al usuario y verificar su rol
+"""
+from functools import lru_cache
+from typing import Awaitable, Callable
+from fastapi import Depends, HTTPException, status
+from jose import JWTError
+
+from infrastructure.security.authtentication import decode_access_token, oauth2_scheme
+from schemas.auth_schema import TokenDataSchema
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> TokenDataSchema:
+    """Decodifica el token de acceso y devuelve los datos del usuario autenticado.
+    FastAPI guarda el resultado en la caché de dependencias de la petición, por lo que el
+    token se decodifica una sola vez aunque varias dependencias lo requieran.
+
+    Args:
+        token (str): Token de acceso de la cabecera Authorization.
+
+    Raises:
+        HTTPException: Si el token es inválido o ha expirado el sistema retorna error 401
+
+    Returns:
+        TokenDataSchema: Usuario y rol contenidos en el token
+    """
+    try:
+        payload = decode_access_token(token)
+    except JWTError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de acceso inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
+    return TokenDataSchema(username=payload.get("sub"), role=payload.get("role"))
+
+
+@lru_cache
+def require_role(role_name: str) -> Callable[..., Awaitable[TokenDataSchema]]:
+    """Crea la dependencia que exige el rol indicado o el rol admin. La dependencia de cada
+    rol es única, de modo que FastAPI también la resuelve una sola vez por petición.
+
+    Args:
+        role_name (str): Rol requerido.
+
+    Returns:
+        Callable[..., Awaitable[TokenDataSchema]]: Dependencia que devuelve el usuario
+        autenticado
+    """
+    async def check_role(
+        principal: TokenDataSchema = Depends(get_current_principal)
+        ) -> TokenDataSchema:
+        if principal.role != 'admin' and principal.role != role_name:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Permisos insuficientes"
+            )
+        return principal
+
+    return check_role
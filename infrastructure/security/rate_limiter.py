@@ -0,0 +1,366 @@
+"""
+Módulo de limitación de intentos de inicio de sesión con ventana deslizante, por nombre de
+usuario y por IP, sobre un almacenamiento en memoria o compatible con Redis
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import math
+import time
+import uuid
+
+from fastapi import Request
+
+from infrastructure.environment import EnvironmentSettings
+
+
+class RateLimitExceeded(Exception):
+    """
+    Se superó el límite de intentos, con los segundos que deben esperarse antes de reintentar.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Demasiados intentos, reintente en {math.ceil(retry_after)} segundos")
+        self.retry_after = retry_after
+
+
+class InMemoryRateLimitStorage:
+    """
+    Almacenamiento en memoria del proceso con el subconjunto de comandos de Redis que usa el
+    limitador (ZADD, ZREM, ZREMRANGEBYSCORE, ZCARD, ZRANGE, EXPIRE, DELETE y MULTI/EXEC
+    mediante pipeline), de modo que un cliente redis.asyncio.Redis puede reemplazarlo sin
+    cambios.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        """
+        Constructor de la clase InMemoryRateLimitStorage.
+
+        Args:
+            clock (Callable[[], float], optional): Reloj usado para expirar las llaves.
+        """
+        self.clock = clock
+        self._sets: Dict[str, Dict[str, float]] = {}
+        self._expires: Dict[str, float] = {}
+        self._next_purge = 0.0
+
+    async def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        self._purge_expired()
+        members = self._sets.setdefault(name, {})
+        added = len([member for member in mapping if member not in members])
+        members.update(mapping)
+        return added
+
+    async def zrem(self, name: str, *members: str) -> int:
+        current = self._live_set(name)
+        return len([current.pop(member) for member in members if member in current])
+
+    async def zremrangebyscore(self, name: str, min_score: float, max_score: float) -> int:
+        members = self._live_set(name)
+        removed = [member for member, score in members.items() if min_score <= score <= max_score]
+        for member in removed:
+            del members[member]
+        return len(removed)
+
+    async def zcard(self, name: str) -> int:
+        return len(self._live_set(name))
+
+    async def zrange(
+        self,
+        name: str,
+        start: int,
+        end: int,
+        withscores: bool = False
+        ) -> List[str] | List[Tuple[str, float]]:
+        ordered = sorted(self._live_set(name).items(), key=lambda item: item[1])
+        selected = ordered[start:None if end == -1 else end + 1]
+        return selected if withscores else [member for member, _ in selected]
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        if name not in self._sets:
+            return False
+        self._expires[name] = self.clock() + seconds
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            deleted += self._sets.pop(name, None) is not None
+            self._expires.pop(name, None)
+        return deleted
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _live_set(self, name: str) -> Dict[str, float]:
+        expires_at = self._expires.get(name)
+        if expires_at is not None and expires_at <= self.clock():
+            self._sets.pop(name, None)
+            self._expires.pop(name, None)
+        return self._sets.get(name, {})
+
+    def _purge_expired(self) -> None:
+        """
+        Elimina periódicamente las llaves expiradas para acotar la memoria.
+        """
+        now = self.clock()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + 1
+        for name in [name for name, expires_at in self._expires.items() if expires_at <= now]:
+            self._sets.pop(name, None)
+            del self._expires[name]
+
+
+class InMemoryPipeline:
+    """
+    Acumula comandos y los ejecuta juntos, como un pipeline transaccional de Redis. Los
+    comandos en memoria no ceden el control al bucle de eventos, por lo que ninguna otra
+    corrutina se intercala durante execute.
+    """
+
+    def __init__(self, storage: InMemoryRateLimitStorage) -> None:
+        self.storage = storage
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, command: str) -> Callable[..., "InMemoryPipeline"]:
+        if command.startswith("_") or not hasattr(self.storage, command):
+            raise AttributeError(command)
+
+        def queue(*args, **kwargs) -> "InMemoryPipeline":
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List:
+        commands, self._commands = self._commands, []
+        return [await getattr(self.storage, command)(*args, **kwargs)
+                for command, args, kwargs in commands]
+
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands = []
+
+
+class SlidingWindowRateLimiter:
+    """
+    Limitador con ventana deslizante: cada llave admite a lo sumo `limit` intentos en los
+    últimos `window` segundos. Cada intento se guarda en un conjunto ordenado por su marca
+    de tiempo, por lo que no hay ráfagas permitidas en el borde entre dos ventanas fijas.
+    """
+
+    def __init__(
+        self,
+        storage,
+        limit: int,
+        window: float,
+        prefix: str = "rate_limit",
+        clock: Callable[[], float] = time.time
+        ) -> None:
+        """
+        Constructor de la clase SlidingWindowRateLimiter.
+
+        Args:
+            storage: Almacenamiento compatible con Redis (InMemoryRateLimitStorage o un
+                cliente redis.asyncio.Redis).
+            limit (int): Intentos permitidos por llave dentro de la ventana.
+            window (float): Duración de la ventana en segundos.
+            prefix (str, optional): Prefijo de las llaves. Defaults to "rate_limit".
+            clock (Callable[[], float], optional): Reloj de pared compartido entre procesos.
+        """
+        self.storage = storage
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self.clock = clock
+
+    async def hit(self, key: str) -> Tuple[str, float]:
+        """Registra un intento y cuenta los intentos de la ventana en una misma transacción
+        (MULTI/EXEC), de modo que los intentos concurrentes, incluso desde otros procesos,
+        no pueden pasar el límite entre la verificación y el registro. Si se supera el
+        límite el intento se elimina y no cuenta.
+
+        Args:
+            key (str): Llave limitada.
+
+        Returns:
+            Tuple[str, float]: Miembro registrado y segundos de espera, 0 si el intento
+            está dentro del límite.
+        """
+        name = self._name(key)
+        now = self.clock()
+        member = f"{now}:{uuid.uuid4().hex}"
+        async with self.storage.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(name, 0, now - self.window)
+            pipe.zadd(name, {member: now})
+            pipe.expire(name, math.ceil(self.window))
+            pipe.zcard(name)
+            pipe.zrange(name, 0, 0, withscores=True)
+            *_, count, oldest = await pipe.execute()
+        if count <= self.limit:
+            return member, 0.0
+        await self.remove(key, member)
+        return member, max(0.0, oldest[0][1] + self.window - now)
+
+    async def remove(self, key: str, member: str) -> None:
+        """Elimina un intento registrado con hit.
+
+        Args:
+            key (str): Llave limitada.
+            member (str): Miembro devuelto por hit.
+        """
+        await self.storage.zrem(self._name(key), member)
+
+    async def reset(self, key: str) -> None:
+        """Elimina los intentos registrados para la llave.
+
+        Args:
+            key (str): Llave limitada.
+        """
+        await self.storage.delete(self._name(key))
+
+    def _name(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+
+LoginAttempt = List[Tuple[SlidingWindowRateLimiter, str, str]]
+
+
+class LoginRateLimiter:
+    """
+    Limita los intentos de inicio de sesión por nombre de usuario y por IP. Los intentos se
+    registran antes de consultar la base de datos y verificar la contraseña, para que las
+    peticiones concurrentes también cuenten; un inicio de sesión exitoso libera los intentos
+    del usuario y el propio intento en la IP, de modo que por IP solo se acumulan los
+    intentos fallidos.
+    """
+
+    def __init__(
+        self,
+        by_username: SlidingWindowRateLimiter,
+        by_ip: SlidingWindowRateLimiter
+        ) -> None:
+        """
+        Constructor de la clase LoginRateLimiter.
+
+        Args:
+            by_username (SlidingWindowRateLimiter): Limitador por nombre de usuario.
+            by_ip (SlidingWindowRateLimiter): Limitador por IP del cliente.
+        """
+        self.by_username = by_username
+        self.by_ip = by_ip
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, env: EnvironmentSettings, storage=None) -> "LoginRateLimiter":
+        """Construye el limitador a partir de las variables de entorno
+
+        Args:
+            env (EnvironmentSettings): Variables de entorno
+            storage (optional): Almacenamiento a usar. Por defecto se crea según
+                LOGIN_RATE_LIMIT_STORAGE.
+
+        Returns:
+            LoginRateLimiter: Limitador configurado
+        """
+        if storage is None:
+            storage = create_rate_limit_storage(env)
+        return cls(
+            by_username=SlidingWindowRateLimiter(
+                storage, env.LOGIN_MAX_ATTEMPTS_PER_USERNAME, env.LOGIN_RATE_LIMIT_WINDOW,
+                prefix="login:username"),
+            by_ip=SlidingWindowRateLimiter(
+                storage, env.LOGIN_MAX_ATTEMPTS_PER_IP, env.LOGIN_RATE_LIMIT_WINDOW,
+                prefix="login:ip"))
+
+    async def acquire(self, username: str, client_ip: Optional[str]) -> LoginAttempt:
+        """Registra el intento y verifica los límites. Si alguno se supera, el intento no
+        cuenta para ninguna de las llaves.
+
+        Args:
+            username (str): Nombre de usuario del intento.
+            client_ip (Optional[str]): IP del cliente, si se conoce.
+
+        Raises:
+            RateLimitExceeded: Si el usuario o la IP superaron su límite.
+
+        Returns:
+            LoginAttempt: Intento registrado en cada llave, para liberarlo con succeeded.
+        """
+        accepted: LoginAttempt = []
+        for limiter, key in self._checks(username, client_ip):
+            member, retry_after = await limiter.hit(key)
+            if retry_after > 0:
+                for accepted_limiter, accepted_key, accepted_member in accepted:
+                    await accepted_limiter.remove(accepted_key, accepted_member)
+                self.rejected += 1
+                raise RateLimitExceeded(retry_after)
+            accepted.append((limiter, key, member))
+        return accepted
+
+    async def succeeded(self, attempt: LoginAttempt) -> None:
+        """Libera los intentos del usuario y el intento de la IP tras un inicio de sesión
+        exitoso. Los intentos fallidos previos de la IP se conservan.
+
+        Args:
+            attempt (LoginAttempt): Intento devuelto por acquire.
+        """
+        for limiter, key, member in attempt:
+            if limiter is self.by_username:
+                await limiter.reset(key)
+            else:
+                await limiter.remove(key, member)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Devuelve la cantidad de intentos rechazados.
+        """
+        return {"rejected": self.rejected}
+
+    async def close(self) -> None:
+        """
+        Cierra la conexión con el almacenamiento, si tiene una.
+        """
+        close = getattr(self.by_username.storage, "aclose", None)
+        if close is not None:
+            await close()
+
+    def _checks(
+        self,
+        username: str,
+        client_ip: Optional[str]
+        ) -> Sequence[Tuple[SlidingWindowRateLimiter, str]]:
+        checks = [(self.by_username, username.lower())]
+        if client_ip:
+            checks.append((self.by_ip, client_ip))
+        return checks
+
+
+def create_rate_limit_storage(env: EnvironmentSettings):
+    """Crea el almacenamiento de los intentos según LOGIN_RATE_LIMIT_STORAGE. Redis requiere
+    el paquete opcional redis; si no está instalado se usa la memoria del proceso.
+
+    Args:
+        env (EnvironmentSettings): Variables de entorno
+
+    Returns:
+        InMemoryRateLimitStorage | redis.asyncio.Redis: Almacenamiento de los intentos
+    """
+    if env.LOGIN_RATE_LIMIT_STORAGE == "redis":
+        try:
+            from redis import asyncio as redis  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            print('Límite de intentos en memoria: instale redis para compartirlo entre procesos')
+        else:
+            return redis.from_url(env.LOGIN_RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimitStorage()
+
+
+def get_login_limiter(request: Request) -> LoginRateLimiter:
+    """
+    Devuelve el limitador de inicio de sesión creado durante el arranque de la aplicación.
+    """
+    return request.app.state.login_limiter
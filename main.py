@@ -2,30 +2,102 @@
 """
    Módulo principal, punto de inicio de la App
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from infrastructure.cache.single_flight import SingleFlight
+from infrastructure.cache.ttl_cache import TTLCache
 from infrastructure.environment import get_environment_variables
+from infrastructure.http_client import create_http_client
+from infrastructure.responses import FastJSONResponse
+from infrastructure.resilience import UpstreamError, UpstreamGuard
+from infrastructure.security.authtentication import shutdown_password_executor
+from infrastructure.security.rate_limiter import LoginRateLimiter
+from infrastructure.middlewares.compression_middleware import CompressionMiddleware
 from infrastructure.middlewares.sql_alchemy_middleware import SQLAlchemyMiddleware
 from metadata.tags import Tags
 from metadata.initializer_seeder import seed_data
 from models.BaseModel import init
+from repositories.ghibli_snapshot_repository import GhibliSnapshotRepository
+from repositories.role_registry import RoleRegistry
+from repositories.user_repository import UserRepository
 from routers.v1.auth_router import AuthRouter
 from routers.v1.ghibli_router import GhibliRouter
+from routers.v1.metrics_router import MetricsRouter
 from routers.v1.user_router import UserRouter
+from services.ghibli_endpoint_service import GhibliService, estimate_size
 from infrastructure.data_base import (
+    AsyncDatabaseEngine,
+    SessionLocal,
     get_db_connection,
 )
 
 # Application Environment Configuration
 env = get_environment_variables()
 
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Ciclo de vida de la aplicación: crea y libera los recursos compartidos.
+
+    Args:
+        application (FastAPI): Instancia de la aplicación.
+    """
+    application.state.http_client = create_http_client(env)
+    application.state.ghibli_cache = TTLCache(
+        max_entries=env.GHIBLI_CACHE_MAX_ENTRIES,
+        max_bytes=env.GHIBLI_CACHE_MAX_BYTES,
+        sizeof=estimate_size
+    )
+    application.state.single_flight = SingleFlight()
+    application.state.ghibli_snapshot = GhibliSnapshotRepository()
+    application.state.ghibli_guard = UpstreamGuard.from_settings(env)
+    application.state.login_limiter = LoginRateLimiter.from_settings(env)
+    application.state.role_registry = RoleRegistry()
+    with SessionLocal() as db:
+        application.state.role_registry.load(UserRepository(db).list_roles())
+    ghibli_service = GhibliService(
+        client=application.state.http_client,
+        cache=application.state.ghibli_cache,
+        single_flight=application.state.single_flight,
+        snapshot_repository=application.state.ghibli_snapshot,
+        guard=application.state.ghibli_guard
+    )
+    background_tasks = []
+    if env.GHIBLI_SOURCE == 'snapshot':
+        try:
+            await ghibli_service.reload_snapshot()
+        except (UpstreamError, ValueError, OSError) as e:
+            print(f'No se pudo cargar el catálogo de Ghibli, se usará la API: {e}')
+        if env.GHIBLI_SNAPSHOT_RELOAD_SECONDS > 0:
+            background_tasks.append(asyncio.create_task(
+                ghibli_service.reload_snapshot_periodically(env.GHIBLI_SNAPSHOT_RELOAD_SECONDS)))
+    elif env.GHIBLI_WARMUP:
+        await ghibli_service.warm_up()
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await application.state.single_flight.cancel_all()
+        await application.state.http_client.aclose()
+        await application.state.login_limiter.close()
+        shutdown_password_executor()
+        await AsyncDatabaseEngine.dispose()
+
+
 # Core Application Instance
 app = FastAPI(
     title=env.APP_NAME,
     version=env.API_VERSION,
     openapi_tags=Tags,
-    root_path="/api/v1"
+    root_path="/api/v1",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if env.FAST_JSON_RESPONSE else JSONResponse
 )
 
 # Middlewares
@@ -35,13 +107,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 app.add_middleware(SQLAlchemyMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 # Add Routers
 app.include_router(UserRouter)
 app.include_router(AuthRouter)
 app.include_router(GhibliRouter)
+app.include_router(MetricsRouter)
 
 # Initialize Data Model Attributes
 init()
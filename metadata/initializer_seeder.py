@@ -16,9 +16,11 @@ def seed_data(session: Session = Depends(get_db_connection)):
     db = next(session)
     resp = is_database_empty(db)
     if resp <= 1:
+        admin_role = None
         if resp <= 0:
             print('Creating roles....')
-            db.add(Role(name = "admin"))
+            admin_role = Role(name = "admin")
+            db.add(admin_role)
             db.add(Role(name = "films"))
             db.add(Role(name = "people"))
             db.add(Role(name = "locations"))
@@ -28,7 +30,8 @@ def seed_data(session: Session = Depends(get_db_connection)):
         if resp >= -1:
             print('Creating superadmin user....')
             password= get_password_hash("P@ssw0rd")
-            admin_role = db.query(Role).filter_by(name="admin").first()
+            if admin_role is None:
+                admin_role = db.query(Role).filter_by(name="admin").first()
             db.add(
                 User(username="admin",
                      role_id=admin_role.id,
@@ -13,4 +13,8 @@ Tags = [
         "name": "Rutas de Ghibli",
         "description": "Contiene los controladores necesarios para las rutas de Ghibli",
     },
+    {
+        "name": "Métricas",
+        "description": "Contiene los controladores que exponen las métricas internas de la App",
+    },
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 
 from models.BaseModel import EntityMeta
@@ -21,3 +21,17 @@ class User(EntityMeta):
     # Se define la relación de uno a muchos con la tabla Role
     role_id = Column(Integer, ForeignKey('roles.id'))
     role = relationship("Role")
+
+class RefreshToken(EntityMeta):
+    __tablename__ = 'refresh_tokens'
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Solo se guarda el hash SHA-256 del token, nunca el token
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # Los tokens obtenidos por rotación desde un mismo inicio de sesión comparten familia
+    family_id = Column(String(32), index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), index=True, nullable=False)
+    user = relationship("User")
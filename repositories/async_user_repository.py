@@ -0,0 +1,330 @@
+"""
+Módulo de repositorio asíncrono de usuario
+
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import Depends
+from sqlalchemy import ColumnElement, Delete, Row, Update, delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from models.UserModel import RefreshToken, User, Role
+
+from infrastructure.data_base import (
+    get_async_db_connection,
+)
+from repositories.user_repository import (
+    Q,
+    build_bulk_filter,
+    build_bulk_insert_statement,
+    build_chunk_statement,
+    build_list_statement,
+    build_refresh_token_statement,
+    build_revoke_statement,
+    build_role_statement
+)
+
+class AsyncUserRepository():
+    """
+    Repositorio asíncrono para la entidad User.
+
+    En modo asíncrono no se permiten cargas diferidas, por lo que el rol del usuario
+    se carga junto con cada consulta.
+    """
+    db: AsyncSession
+
+    def __init__(
+        self, db: AsyncSession = Depends(get_async_db_connection)
+    ) -> None:
+        """
+        Constructor de la clase AsyncUserRepository.
+
+        Args:
+            db (AsyncSession, optional): Sesión asíncrona de base de datos.
+                Defaults to Depends(get_async_db_connection).
+        """
+        self.db = db
+
+    async def create(self, instance: User) -> User:
+        """
+        Crea un nuevo usuario en la base de datos.
+
+        Args:
+            instance (User): Instancia del usuario a crear.
+
+        Returns:
+            User: El usuario creado.
+        """
+        self.db.add(instance)
+        await self.db.commit()
+        await self.db.refresh(instance, ["role"])
+        return instance
+
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Inserta un lote de usuarios en una sola sentencia y una sola transacción.
+
+        Args:
+            rows (List[Dict[str, Any]]): Columnas de cada usuario.
+
+        Returns:
+            List[Row]: ID y nombre de los usuarios insertados; los repetidos se omiten.
+
+        Raises:
+            SQLAlchemyError: Si el lote no pudo insertarse. La transacción se revierte.
+        """
+        statement = build_bulk_insert_statement(self.db.get_bind().dialect.name, rows)
+        try:
+            result = await self.db.execute(statement)
+            inserted = result.all()
+            await self.db.commit()
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise
+        return inserted
+
+    async def bulk_update(
+        self,
+        ids: Optional[List[int]],
+        query_params: Optional[Q],
+        values: Dict[str, Any],
+        chunk_size: Optional[int] = None
+        ) -> List[int]:
+        """
+        Actualiza los usuarios seleccionados con una sentencia UPDATE por fragmento.
+
+        Args:
+            ids (Optional[List[int]]): IDs de los usuarios.
+            query_params (Optional[Q]): Parámetros de consulta.
+            values (Dict[str, Any]): Columnas a actualizar.
+            chunk_size (Optional[int]): Usuarios por transacción. Defaults to None.
+
+        Returns:
+            List[int]: IDs de los usuarios actualizados.
+        """
+        return await self._run_in_chunks(
+            update(User).values(**values), build_bulk_filter(ids, query_params), chunk_size)
+
+    async def bulk_delete(
+        self,
+        ids: Optional[List[int]],
+        query_params: Optional[Q],
+        chunk_size: Optional[int] = None
+        ) -> List[int]:
+        """
+        Elimina los usuarios seleccionados con una sentencia DELETE por fragmento.
+
+        Args:
+            ids (Optional[List[int]]): IDs de los usuarios.
+            query_params (Optional[Q]): Parámetros de consulta.
+            chunk_size (Optional[int]): Usuarios por transacción. Defaults to None.
+
+        Returns:
+            List[int]: IDs de los usuarios eliminados.
+        """
+        return await self._run_in_chunks(
+            delete(User), build_bulk_filter(ids, query_params), chunk_size)
+
+    async def _run_in_chunks(
+        self,
+        statement: Update | Delete,
+        clauses: List[ColumnElement],
+        chunk_size: Optional[int]
+        ) -> List[int]:
+        affected: List[int] = []
+        after_id = 0
+        while True:
+            chunk_statement = build_chunk_statement(statement, clauses, after_id, chunk_size)
+            result = await self.db.execute(
+                chunk_statement.execution_options(synchronize_session=False))
+            ids = result.scalars().all()
+            await self.db.commit()
+            affected.extend(ids)
+            if chunk_size is None or len(ids) < chunk_size:
+                return sorted(affected)
+            after_id = max(ids)
+
+    async def list(
+        self,
+        query_params: Optional[Q],
+        limit: Optional[int] | None = 100,
+        start: Optional[int] | None = 0,
+        after_id: Optional[int] = None
+        ) -> List[User]:
+        """
+        Obtiene una lista de usuarios de la base de datos con filtros opcionales.
+
+        Args:
+            query_params (Optional[Q]): Parámetros de consulta.
+            limit (Optional[int]): Límite de resultados.
+            start (Optional[int]): Índice de inicio.
+            after_id (Optional[int]): ID a partir del cual continuar. Defaults to None.
+
+        Returns:
+            List[User]: Lista de usuarios que coinciden con los filtros.
+        """
+        statement = build_list_statement(query_params, limit, start, after_id)
+        result = await self.db.execute(statement)
+        return result.scalars().all()
+
+    async def stream(
+        self,
+        query_params: Optional[Q],
+        batch_size: int = 1000
+        ) -> AsyncIterator[User]:
+        """
+        Recorre los usuarios con un cursor del servidor, leyendo de a batch_size filas
+        para que la memoria no dependa del tamaño de la tabla.
+
+        Args:
+            query_params (Optional[Q]): Parámetros de consulta.
+            batch_size (int): Filas leídas por cada viaje a la base de datos.
+
+        Yields:
+            User: Cada usuario, ordenado por ID.
+        """
+        statement = build_list_statement(query_params, limit=None, start=None)
+        result = await self.db.stream_scalars(
+            statement.execution_options(yield_per=batch_size))
+        async for user in result:
+            yield user
+
+    async def get(self, user_id: int) -> User:
+        """
+        Obtiene un usuario por su ID de la base de datos.
+
+        Args:
+            user_id (int): ID del usuario.
+
+        Returns:
+            User: El usuario encontrado.
+        """
+        return await self.db.get(
+            User, user_id, options=[joinedload(User.role)]
+        )
+
+    async def delete(self, user_id: int) -> None:
+        """
+        Elimina un usuario de la base de datos por su ID.
+
+        Args:
+            user_id (int): ID del usuario a eliminar.
+
+        Raises:
+            ValueError: Si no se encuentra un usuario con el ID especificado.
+        """
+        instance = await self.get(user_id=user_id)
+        if not instance:
+            raise ValueError(f"No se encontró un usuario con el ID {user_id}")
+        await self.db.delete(instance)
+        await self.db.commit()
+
+    async def update(self, user_id: int, user_data: dict) -> User:
+        """
+        Actualiza un usuario existente en la base de datos.
+
+        Args:
+            user_id (int): ID del usuario a actualizar.
+            user_data (dict): Datos del usuario con los campos a actualizar.
+
+        Returns:
+            User: El usuario actualizado.
+        """
+        db_user = await self.get(user_id)
+        if not db_user:
+            return None
+
+        # Actualizar los campos del usuario existente con los valores no nulos en user_data
+        for field, value in user_data.items():
+            if hasattr(db_user, field) and value is not None:
+                setattr(db_user, field, value)
+
+        await self.db.commit()
+        # El rol puede haber cambiado a través de role_id
+        await self.db.refresh(db_user, ["role"])
+        return db_user
+
+    async def get_rol(self, role_name: str) -> Role:
+        """Obtener un rol por su nombre
+
+        Args:
+            role_name (str): Nombre del rol
+
+        Returns:
+            Role: Retorna el rol encontrado
+        """
+        result = await self.db.execute(build_role_statement(role_name))
+        return result.scalars().first()
+
+    async def list_roles(self) -> List[Role]:
+        """Obtener todos los roles
+
+        Returns:
+            List[Role]: Roles registrados en la base de datos
+        """
+        result = await self.db.execute(select(Role).order_by(Role.id))
+        return result.scalars().all()
+
+    async def get_refresh_token(self, token_hash: str) -> Optional[RefreshToken]:
+        """Obtener un token de actualización por su hash
+
+        Args:
+            token_hash (str): Hash del token
+
+        Returns:
+            Optional[RefreshToken]: El token con su usuario, o None si no existe
+        """
+        result = await self.db.execute(build_refresh_token_statement(token_hash))
+        return result.scalars().first()
+
+    async def add_refresh_token(self, refresh_token: RefreshToken) -> RefreshToken:
+        """Guardar un nuevo token de actualización
+
+        Args:
+            refresh_token (RefreshToken): Token a guardar
+
+        Returns:
+            RefreshToken: El token guardado
+        """
+        self.db.add(refresh_token)
+        await self.db.commit()
+        return refresh_token
+
+    async def rotate_refresh_token(
+        self,
+        current: RefreshToken,
+        replacement: RefreshToken
+        ) -> bool:
+        """Revoca el token actual y guarda su reemplazo en una misma transacción. La
+        revocación es condicional, por lo que si dos peticiones rotan el mismo token solo
+        una lo consigue.
+
+        Args:
+            current (RefreshToken): Token presentado por el cliente
+            replacement (RefreshToken): Nuevo token de la misma familia
+
+        Returns:
+            bool: True si se rotó el token, False si ya había sido revocado
+        """
+        result = await self.db.execute(build_revoke_statement(RefreshToken.id == current.id))
+        if result.rowcount != 1:
+            await self.db.rollback()
+            return False
+        self.db.add(replacement)
+        await self.db.commit()
+        return True
+
+    async def revoke_refresh_tokens(self, family_id: str) -> int:
+        """Revocar todos los tokens de actualización de una familia
+
+        Args:
+            family_id (str): Familia de tokens de un inicio de sesión
+
+        Returns:
+            int: Cantidad de tokens revocados
+        """
+        result = await self.db.execute(
+            build_revoke_statement(RefreshToken.family_id == family_id))
+        await self.db.commit()
+        return result.rowcount
@@ -0,0 +1,120 @@
+"""
+Módulo de repositorio del catálogo local de Ghibli
+
+"""
+from typing import Dict, List, Optional, Type
+import json
+import time
+
+from fastapi import Request
+from pydantic import BaseModel
+
+
+class GhibliSnapshot:
+    """
+    Copia inmutable del catálogo de Ghibli con índices en memoria por ID.
+    """
+
+    def __init__(self, collections: Dict[str, List[BaseModel]]) -> None:
+        """
+        Constructor de la clase GhibliSnapshot.
+
+        Args:
+            collections (Dict[str, List[BaseModel]]): Modelos validados de cada colección,
+                en el orden devuelto por la API.
+        """
+        self.loaded_at = time.time()
+        self.collections = collections
+        self.indexes: Dict[str, Dict[str, BaseModel]] = {
+            endpoint: {item.id: item for item in items}
+            for endpoint, items in collections.items()
+        }
+
+    def find(
+        self,
+        endpoint: str,
+        limit: int,
+        endpoint_id: str | None = None
+        ) -> List[BaseModel]:
+        """Busca en el catálogo un recurso por su ID o los primeros registros de una colección.
+
+        Args:
+            endpoint (str): Nombre de la colección
+            limit (int): Cantidad de registros a devolver
+            endpoint_id (str | None, optional): Identificador del recurso. Defaults to None.
+
+        Returns:
+            List[BaseModel]: Lista con los modelos encontrados
+        """
+        if endpoint_id:
+            item = self.indexes.get(endpoint, {}).get(endpoint_id)
+            return [item] if item is not None else []
+        return self.collections.get(endpoint, [])[:limit]
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Devuelve la cantidad de registros cargados por colección.
+        """
+        stats: Dict[str, int | float] = {
+            endpoint: len(items) for endpoint, items in self.collections.items()}
+        stats["loaded_at"] = self.loaded_at
+        return stats
+
+
+class GhibliSnapshotRepository:
+    """
+    Repositorio que mantiene el catálogo local vigente y permite reemplazarlo de forma atómica.
+    """
+    snapshot: Optional[GhibliSnapshot]
+
+    def __init__(self) -> None:
+        """
+        Constructor de la clase GhibliSnapshotRepository.
+        """
+        self.snapshot = None
+
+    def swap(self, snapshot: GhibliSnapshot) -> None:
+        """Reemplaza el catálogo vigente. Las peticiones en curso conservan la referencia
+        al catálogo anterior, por lo que nunca observan un catálogo a medio cargar.
+
+        Args:
+            snapshot (GhibliSnapshot): Nuevo catálogo.
+        """
+        self.snapshot = snapshot
+
+    def load_file(
+        self,
+        path: str,
+        models: Dict[str, Type[BaseModel]]
+        ) -> GhibliSnapshot:
+        """Carga el catálogo desde un archivo JSON o msgpack y lo reemplaza.
+
+        Args:
+            path (str): Ruta del archivo. Los archivos con extensión .msgpack requieren
+                el paquete msgpack.
+            models (Dict[str, Type[BaseModel]]): Esquema con el que se valida cada colección.
+
+        Returns:
+            GhibliSnapshot: El catálogo cargado.
+        """
+        if path.endswith(".msgpack"):
+            import msgpack  # pylint: disable=import-outside-toplevel
+            with open(path, "rb") as file:
+                data = msgpack.unpackb(file.read())
+        else:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+
+        snapshot = GhibliSnapshot({
+            endpoint: [model(**item) for item in data.get(endpoint, [])]
+            for endpoint, model in models.items()
+        })
+        self.swap(snapshot)
+        return snapshot
+
+
+def get_ghibli_snapshot(request: Request) -> GhibliSnapshotRepository:
+    """
+    Devuelve el repositorio del catálogo local creado durante el arranque de la aplicación.
+    """
+    return request.app.state.ghibli_snapshot
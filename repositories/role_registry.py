@@ -0,0 +1,63 @@
+"""
+Módulo del registro en memoria de los roles
+
+"""
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request
+
+from models.UserModel import Role
+from schemas.user_schema import RoleEnum, RoleSchema
+
+
+class RoleRegistry:
+    """
+    Registro de los roles del sistema, cargado una vez al arrancar la aplicación.
+
+    La tabla de roles es pequeña y prácticamente inmutable, por lo que las altas y
+    modificaciones de usuarios resuelven el rol en memoria en lugar de consultar la base
+    de datos. Si los roles cambian en la base de datos se recargan con
+    POST /users/roles/reload, que llama a invalidate.
+    """
+    by_name: Dict[str, RoleSchema]
+
+    def __init__(self) -> None:
+        """
+        Constructor de la clase RoleRegistry.
+        """
+        self.by_name = {}
+        self.loaded = False
+
+    def load(self, roles: Iterable[Role]) -> None:
+        """Reemplaza los roles registrados.
+
+        Args:
+            roles (Iterable[Role]): Roles leídos de la base de datos.
+        """
+        self.by_name = {role.name: RoleSchema(id=role.id, name=role.name) for role in roles}
+        self.loaded = True
+
+    def invalidate(self) -> None:
+        """
+        Descarta los roles registrados para que se recarguen en el próximo uso.
+        """
+        self.by_name = {}
+        self.loaded = False
+
+    def get_by_name(self, role_name: str | RoleEnum) -> Optional[RoleSchema]:
+        """Obtiene un rol por su nombre
+
+        Args:
+            role_name (str | RoleEnum): Nombre del rol
+
+        Returns:
+            Optional[RoleSchema]: El rol o None si no existe
+        """
+        return self.by_name.get(getattr(role_name, "value", role_name))
+
+
+def get_role_registry(request: Request) -> RoleRegistry:
+    """
+    Devuelve el registro de roles creado durante el arranque de la aplicación.
+    """
+    return request.app.state.role_registry
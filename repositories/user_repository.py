@@ -2,11 +2,16 @@
 Módulo de repositorio de usuario
 
 """
-from typing import TypeVar, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, TypeVar, List, Optional
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Delete, Row, Select, Update, delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.orm import Session, joinedload
 
-from models.UserModel import User, Role
+from models.UserModel import RefreshToken, User, Role
 
 from infrastructure.data_base import (
     get_db_connection,
@@ -14,6 +19,142 @@ from infrastructure.data_base import (
 
 Q = TypeVar("Q")
 
+
+def build_list_statement(
+    query_params: Optional[Q],
+    limit: Optional[int] | None = 100,
+    start: Optional[int] | None = 0,
+    after_id: Optional[int] = None
+    ) -> Select:
+    """Construye la consulta de listado de usuarios ordenada por ID, compartida por los
+    repositorios síncrono y asíncrono. El rol se carga en la misma consulta para no
+    emitir un SELECT por usuario al serializar la página
+
+    Args:
+        query_params (Optional[Q]): Parámetros de consulta.
+        limit (Optional[int]): Límite de resultados.
+        start (Optional[int]): Índice de inicio.
+        after_id (Optional[int]): Paginación por cursor: devuelve los usuarios con ID
+            mayor al indicado y reemplaza a start. Defaults to None.
+
+    Returns:
+        Select: Consulta de usuarios con los filtros aplicados.
+    """
+    statement = select(User).options(joinedload(User.role))
+    if query_params:
+        filters = {k: v for k, v in query_params.model_dump().items() if v is not None}
+        statement = statement.filter_by(**filters)
+    if after_id is not None:
+        # Keyset: usa el índice de la clave primaria, el costo no depende de la página
+        statement = statement.where(User.id > after_id)
+    else:
+        statement = statement.offset(start)
+    return statement.order_by(User.id).limit(limit)
+
+
+def build_bulk_insert_statement(dialect_name: str, rows: List[Dict[str, Any]]) -> Insert:
+    """Construye un INSERT de varias filas que omite los usuarios que ya existen
+    (username o email repetidos) y devuelve los insertados
+
+    Args:
+        dialect_name (str): Dialecto de la conexión, postgresql en producción
+        rows (List[Dict[str, Any]]): Columnas de cada usuario
+
+    Returns:
+        Insert: Sentencia INSERT ... ON CONFLICT DO NOTHING RETURNING id, username
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert(User).values(rows).on_conflict_do_nothing().returning(User.id, User.username)
+
+
+def build_bulk_filter(ids: Optional[List[int]], query_params: Optional[Q]) -> List[ColumnElement]:
+    """Construye las condiciones que seleccionan los usuarios de una operación masiva
+
+    Args:
+        ids (Optional[List[int]]): IDs de los usuarios
+        query_params (Optional[Q]): Parámetros de consulta
+
+    Returns:
+        List[ColumnElement]: Condiciones de la cláusula WHERE
+    """
+    clauses = []
+    if ids is not None:
+        clauses.append(User.id.in_(ids))
+    if query_params:
+        clauses.extend(
+            getattr(User, field) == value
+            for field, value in query_params.model_dump().items() if value is not None)
+    return clauses
+
+
+def build_chunk_statement(
+    statement: Update | Delete,
+    clauses: List[ColumnElement],
+    after_id: int,
+    chunk_size: Optional[int]
+    ) -> Update | Delete:
+    """Limita un UPDATE o DELETE masivo a los siguientes chunk_size usuarios por ID, o a
+    todos los seleccionados si no se indica chunk_size
+
+    Args:
+        statement (Update | Delete): Sentencia sin condiciones
+        clauses (List[ColumnElement]): Condiciones que seleccionan los usuarios
+        after_id (int): Último ID procesado en el fragmento anterior
+        chunk_size (Optional[int]): Usuarios por fragmento
+
+    Returns:
+        Update | Delete: Sentencia que devuelve los IDs afectados
+    """
+    if chunk_size is None:
+        return statement.where(*clauses).returning(User.id)
+    chunk = (select(User.id).where(*clauses, User.id > after_id)
+             .order_by(User.id).limit(chunk_size))
+    return statement.where(User.id.in_(chunk)).returning(User.id)
+
+
+def build_role_statement(role_name: str) -> Select:
+    """Construye la consulta de un rol por su nombre
+
+    Args:
+        role_name (str): Nombre del rol
+
+    Returns:
+        Select: Consulta del rol
+    """
+    return select(Role).filter_by(name=role_name)
+
+
+def build_refresh_token_statement(token_hash: str) -> Select:
+    """Construye la consulta de un token de actualización por su hash, con el usuario y su
+    rol cargados para emitir el nuevo token de acceso
+
+    Args:
+        token_hash (str): Hash del token
+
+    Returns:
+        Select: Consulta del token
+    """
+    return (select(RefreshToken)
+            .options(joinedload(RefreshToken.user).joinedload(User.role))
+            .where(RefreshToken.token_hash == token_hash))
+
+
+def build_revoke_statement(*clauses: ColumnElement) -> Update:
+    """Construye la revocación de los tokens de actualización vigentes que cumplen las
+    condiciones
+
+    Args:
+        clauses (ColumnElement): Condiciones sobre los tokens
+
+    Returns:
+        Update: Sentencia que marca los tokens como revocados
+    """
+    return (update(RefreshToken)
+            .where(RefreshToken.revoked_at.is_(None), *clauses)
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False))
+
+
 class UserRepository():
     """
     Repositorio para la entidad User.
@@ -46,11 +187,94 @@ class UserRepository():
         self.db.refresh(instance)
         return instance
 
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Inserta un lote de usuarios en una sola sentencia y una sola transacción.
+
+        Args:
+            rows (List[Dict[str, Any]]): Columnas de cada usuario.
+
+        Returns:
+            List[Row]: ID y nombre de los usuarios insertados; los repetidos se omiten.
+
+        Raises:
+            SQLAlchemyError: Si el lote no pudo insertarse. La transacción se revierte.
+        """
+        statement = build_bulk_insert_statement(self.db.get_bind().dialect.name, rows)
+        try:
+            inserted = self.db.execute(statement).all()
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+        return inserted
+
+    def bulk_update(
+        self,
+        ids: Optional[List[int]],
+        query_params: Optional[Q],
+        values: Dict[str, Any],
+        chunk_size: Optional[int] = None
+        ) -> List[int]:
+        """
+        Actualiza los usuarios seleccionados con una sentencia UPDATE por fragmento.
+
+        Args:
+            ids (Optional[List[int]]): IDs de los usuarios.
+            query_params (Optional[Q]): Parámetros de consulta.
+            values (Dict[str, Any]): Columnas a actualizar.
+            chunk_size (Optional[int]): Usuarios por transacción. Defaults to None.
+
+        Returns:
+            List[int]: IDs de los usuarios actualizados.
+        """
+        return self._run_in_chunks(
+            update(User).values(**values), build_bulk_filter(ids, query_params), chunk_size)
+
+    def bulk_delete(
+        self,
+        ids: Optional[List[int]],
+        query_params: Optional[Q],
+        chunk_size: Optional[int] = None
+        ) -> List[int]:
+        """
+        Elimina los usuarios seleccionados con una sentencia DELETE por fragmento.
+
+        Args:
+            ids (Optional[List[int]]): IDs de los usuarios.
+            query_params (Optional[Q]): Parámetros de consulta.
+            chunk_size (Optional[int]): Usuarios por transacción. Defaults to None.
+
+        Returns:
+            List[int]: IDs de los usuarios eliminados.
+        """
+        return self._run_in_chunks(
+            delete(User), build_bulk_filter(ids, query_params), chunk_size)
+
+    def _run_in_chunks(
+        self,
+        statement: Update | Delete,
+        clauses: List[ColumnElement],
+        chunk_size: Optional[int]
+        ) -> List[int]:
+        affected: List[int] = []
+        after_id = 0
+        while True:
+            chunk_statement = build_chunk_statement(statement, clauses, after_id, chunk_size)
+            ids = self.db.execute(
+                chunk_statement.execution_options(synchronize_session=False)).scalars().all()
+            self.db.commit()
+            affected.extend(ids)
+            if chunk_size is None or len(ids) < chunk_size:
+                return sorted(affected)
+            after_id = max(ids)
+
     def list(
         self,
         query_params: Optional[Q],
         limit: Optional[int] | None = 100,
-        start: Optional[int] | None = 0
+        start: Optional[int] | None = 0,
+        after_id: Optional[int] = None
         ) -> List[User]:
         """
         Obtiene una lista de usuarios de la base de datos con filtros opcionales.
@@ -59,15 +283,29 @@ class UserRepository():
             query_params (Optional[Q]): Parámetros de consulta.
             limit (Optional[int]): Límite de resultados.
             start (Optional[int]): Índice de inicio.
+            after_id (Optional[int]): ID a partir del cual continuar. Defaults to None.
 
         Returns:
             List[User]: Lista de usuarios que coinciden con los filtros.
         """
-        result = self.db.query(User)
-        if query_params:
-            filters = {k: v for k, v in query_params.model_dump().items() if v is not None}
-            result = result.filter_by(**filters)
-        return result.offset(start).limit(limit).all()
+        statement = build_list_statement(query_params, limit, start, after_id)
+        return self.db.execute(statement).scalars().all()
+
+    def stream(self, query_params: Optional[Q], batch_size: int = 1000) -> Iterator[User]:
+        """
+        Recorre los usuarios con un cursor del servidor, leyendo de a batch_size filas
+        para que la memoria no dependa del tamaño de la tabla.
+
+        Args:
+            query_params (Optional[Q]): Parámetros de consulta.
+            batch_size (int): Filas leídas por cada viaje a la base de datos.
+
+        Yields:
+            User: Cada usuario, ordenado por ID.
+        """
+        statement = build_list_statement(query_params, limit=None, start=None)
+        yield from self.db.execute(
+            statement.execution_options(yield_per=batch_size)).scalars()
 
     def get(self, user_id: int) -> User:
         """
@@ -80,7 +318,7 @@ class UserRepository():
             User: El usuario encontrado.
         """
         return self.db.get(
-            User, user_id
+            User, user_id, options=[joinedload(User.role)]
         )
 
     def delete(self, user_id: int) -> None:
@@ -110,7 +348,7 @@ class UserRepository():
         Returns:
             User: El usuario actualizado.
         """
-        db_user = self.db.get(User, user_id)
+        db_user = self.get(user_id)
         if not db_user:
             return None
 
@@ -132,4 +370,69 @@ class UserRepository():
         Returns:
             Role: Retorna el rol encontrado
         """
-        return self.db.query(Role).filter_by(name=role_name).first()
+        return self.db.execute(build_role_statement(role_name)).scalars().first()
+
+    def list_roles(self) -> List[Role]:
+        """Obtener todos los roles
+
+        Returns:
+            List[Role]: Roles registrados en la base de datos
+        """
+        return self.db.execute(select(Role).order_by(Role.id)).scalars().all()
+
+    def get_refresh_token(self, token_hash: str) -> Optional[RefreshToken]:
+        """Obtener un token de actualización por su hash
+
+        Args:
+            token_hash (str): Hash del token
+
+        Returns:
+            Optional[RefreshToken]: El token con su usuario, o None si no existe
+        """
+        return self.db.execute(build_refresh_token_statement(token_hash)).scalars().first()
+
+    def add_refresh_token(self, refresh_token: RefreshToken) -> RefreshToken:
+        """Guardar un nuevo token de actualización
+
+        Args:
+            refresh_token (RefreshToken): Token a guardar
+
+        Returns:
+            RefreshToken: El token guardado
+        """
+        self.db.add(refresh_token)
+        self.db.commit()
+        return refresh_token
+
+    def rotate_refresh_token(self, current: RefreshToken, replacement: RefreshToken) -> bool:
+        """Revoca el token actual y guarda su reemplazo en una misma transacción. La
+        revocación es condicional, por lo que si dos peticiones rotan el mismo token solo
+        una lo consigue.
+
+        Args:
+            current (RefreshToken): Token presentado por el cliente
+            replacement (RefreshToken): Nuevo token de la misma familia
+
+        Returns:
+            bool: True si se rotó el token, False si ya había sido revocado
+        """
+        result = self.db.execute(build_revoke_statement(RefreshToken.id == current.id))
+        if result.rowcount != 1:
+            self.db.rollback()
+            return False
+        self.db.add(replacement)
+        self.db.commit()
+        return True
+
+    def revoke_refresh_tokens(self, family_id: str) -> int:
+        """Revocar todos los tokens de actualización de una familia
+
+        Args:
+            family_id (str): Familia de tokens de un inicio de sesión
+
+        Returns:
+            int: Cantidad de tokens revocados
+        """
+        result = self.db.execute(build_revoke_statement(RefreshToken.family_id == family_id))
+        self.db.commit()
+        return result.rowcount
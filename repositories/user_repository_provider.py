@@ -0,0 +1,30 @@
+"""
+Módulo que selecciona la implementación del repositorio de usuarios
+
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from infrastructure.data_base import AsyncSessionLocal, SessionLocal
+from infrastructure.environment import get_environment_variables
+from repositories.async_user_repository import AsyncUserRepository
+from repositories.user_repository import UserRepository
+
+env = get_environment_variables()
+
+# DATABASE_ASYNC permite volver a la implementación síncrona para comparar rendimiento
+UserRepositoryImplementation = AsyncUserRepository if env.DATABASE_ASYNC else UserRepository
+
+
+@asynccontextmanager
+async def open_user_repository() -> AsyncIterator[AsyncUserRepository | UserRepository]:
+    """
+    Abre un repositorio con una sesión propia, para operaciones que continúan después de
+    que se liberan las dependencias de la petición, como las respuestas en streaming.
+    """
+    if env.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield AsyncUserRepository(db=db)
+    else:
+        with SessionLocal() as db:
+            yield UserRepository(db=db)
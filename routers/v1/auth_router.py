@@ -2,10 +2,12 @@
     Módulo de los controladores de la autenticación
 """
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from schemas.auth_schema import TokenSchema
+from infrastructure.security.rate_limiter import RateLimitExceeded
+from schemas.auth_schema import RefreshRequestSchema, TokenSchema
 from services.auth_service import AuthService
 
 
@@ -17,12 +19,16 @@ AuthRouter = APIRouter(
 
 @AuthRouter.post("/login", response_model=TokenSchema)
 async def login(
+    request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth_service: AuthService = Depends()
     ) -> TokenSchema:
     """Controlador para la autenticación de usuario.
 
     Args:
+        request (Request): Petición HTTP, usada para obtener la IP del cliente. Detrás de
+            un proxy, uvicorn la toma de X-Forwarded-For si el proxy figura en
+            FORWARDED_ALLOW_IPS.
         form_data (Annotated[OAuth2PasswordRequestForm, Depends): 
         Modelo con todos los atributos disponibles para un flujo oauth2. 
         Solo se va autilizar los atributos username y password
@@ -30,12 +36,21 @@ async def login(
         auth_service (AuthService, optional): Inyección del servicio auth.
 
     Raises:
-        HTTPException: Usuario o contraseña incorrecta el sistema retorna error 401
+        HTTPException: Usuario o contraseña incorrecta el sistema retorna error 401.
+            Si el usuario o la IP superaron el límite de intentos se retorna error 429
 
     Returns:
         TokenSchema: Token de acceso del usuario
     """
-    token = auth_service.login(form_data.username, form_data.password)
+    client_ip = request.client.host if request.client else None
+    try:
+        token = await auth_service.login(form_data.username, form_data.password, client_ip)
+    except RateLimitExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        ) from exc
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,3 +58,45 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return token
+
+@AuthRouter.post("/refresh", response_model=TokenSchema)
+async def refresh(
+    refresh_request: RefreshRequestSchema,
+    auth_service: AuthService = Depends()
+    ) -> TokenSchema:
+    """Controlador para renovar el token de acceso sin volver a iniciar sesión.
+
+    Args:
+        refresh_request (RefreshRequestSchema): Token de actualización vigente. Se
+            reemplaza por el token devuelto y no puede volver a usarse.
+        auth_service (AuthService, optional): Inyección del servicio auth.
+
+    Raises:
+        HTTPException: Si el token no existe, expiró o fue revocado el sistema retorna
+            error 401
+
+    Returns:
+        TokenSchema: Nuevo token de acceso y nuevo token de actualización
+    """
+    token = await auth_service.refresh(refresh_request.refresh_token)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de actualización inválido o expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token
+
+@AuthRouter.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    refresh_request: RefreshRequestSchema,
+    auth_service: AuthService = Depends()
+    ) -> None:
+    """Controlador para cerrar la sesión revocando el token de actualización y los
+    obtenidos a partir del mismo inicio de sesión.
+
+    Args:
+        refresh_request (RefreshRequestSchema): Token de actualización a revocar.
+        auth_service (AuthService, optional): Inyección del servicio auth.
+    """
+    await auth_service.revoke(refresh_request.refresh_token)
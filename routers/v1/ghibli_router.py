@@ -1,126 +1,266 @@
 """
     Módulo de los controladores del usuario
 """
-from typing import List
-from fastapi import APIRouter, Depends, Query
+from typing import Dict, List, Type, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
+from schemas.auth_schema import TokenDataSchema
 from schemas.film_schema import FilmSchema
+from schemas.ghibli_query_schema import GhibliFilterSchema, GhibliQuerySchema
 from schemas.location_schema import LocationSchema
 from schemas.people_schema import PeopleSchema
 from schemas.specie_schema import SpeciesSchema
 from schemas.vehicle_schema import VehicleSchema
 
 from services.ghibli_endpoint_service import GhibliService
-from infrastructure.decorators.role_decorator import has_permission
-from infrastructure.security.authtentication import oauth2_scheme
+from infrastructure.http_cache import conditional_response, encoded_etag
+from infrastructure.resilience import UpstreamError
+from infrastructure.responses import FastJSONResponse, model_response
+from infrastructure.security.dependencies import require_role
+
+T = TypeVar("T")
 
 GhibliRouter = APIRouter(
     prefix="/ghibli", tags=["Rutas de Ghibli"],
     responses={404: {"description": "No encontrado"}},
 )
 
+def get_ghibli_query(
+    filters: List[str] = Query(
+        None, alias="filter",
+        description="Condiciones campo-operador-valor, por ejemplo rt_score>=90. "
+        "Operadores: ==, !=, >=, <=, >, <"),
+    sort: str = Query(
+        None, description="Campos de ordenamiento separados por coma, con - para descendente"),
+    fields: str = Query(None, description="Campos a devolver separados por coma"),
+    expand: str = Query(
+        None, description="Campos con URLs de referencia a reemplazar por los objetos, "
+        "separados por coma"),
+    offset: int = Query(0, ge=0, description="Cantidad de resultados a omitir")
+    ) -> GhibliQuerySchema:
+    """Construye la consulta de filtrado, ordenamiento, proyección, paginación y expansión
+
+    Raises:
+        HTTPException: Si algún filtro no es válido el sistema retorna error 400
+
+    Returns:
+        GhibliQuerySchema: Consulta a aplicar sobre la colección
+    """
+    try:
+        return GhibliQuerySchema(
+            filters=[GhibliFilterSchema.parse(expression) for expression in filters or []],
+            sort=_split(sort),
+            fields=_split(fields),
+            expand=_split(expand),
+            offset=offset)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+async def query_collection(
+    request: Request,
+    ghibli_service: GhibliService,
+    model: Type[T],
+    endpoint: str,
+    query: GhibliQuerySchema,
+    limit: int | None,
+    endpoint_id: str | None
+    ) -> List[T] | Response:
+    """Consulta la colección aplicando la consulta, la expansión de referencias y la
+    proyección de campos solicitada
+
+    Raises:
+        HTTPException: Si la consulta usa campos desconocidos el sistema retorna error 400.
+            Si la API de Ghibli no responde se retorna el error correspondiente (404, 502,
+            503 o 504)
+
+    Returns:
+        List[T] | Response: Objetos completos ya serializados, o expandidos y con solo los
+        campos solicitados. Las consultas sin filtros reutilizan el cuerpo ya serializado y
+        comprimido junto a la entrada de la caché. Si el cliente envía un ETag vigente en
+        If-None-Match se responde 304 sin cuerpo
+    """
+    try:
+        ghibli_service.validate_query(model, query)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    try:
+        items = await ghibli_service.query_info(
+            model, endpoint=endpoint, query=query, limit=limit, endpoint_id=endpoint_id)
+    except UpstreamError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    cache_control = f"private, max-age={ghibli_service.env.GHIBLI_HTTP_MAX_AGE}"
+    last_modified = ghibli_service.last_modified(endpoint, query, limit, endpoint_id)
+    if not (query.fields or query.expand) and (endpoint_id or query.is_empty()):
+        cached = ghibli_service.cached_body(
+            model, endpoint, limit, endpoint_id, request.headers.get("accept-encoding"))
+        if cached is not None:
+            body, encoding, etag = cached
+            headers = {"Vary": "Accept-Encoding"}
+            if encoding:
+                headers["Content-Encoding"] = encoding
+                etag = encoded_etag(etag, encoding)
+            return conditional_response(
+                request, Response(body, media_type="application/json", headers=headers),
+                cache_control, last_modified, etag)
+    if not (query.fields or query.expand):
+        # Los modelos ya fueron validados por el servicio, se serializan sin revalidarlos
+        return conditional_response(
+            request, model_response(items, List[model]), cache_control, last_modified)
+    content = await ghibli_service.expand(items, query.expand) if query.expand else items
+    if query.fields:
+        content = ghibli_service.project(content, query.fields)
+    return conditional_response(
+        request, FastJSONResponse(content=content), cache_control, last_modified)
+
+def _split(value: str | None) -> List[str]:
+    """
+    Separa una lista de valores delimitada por comas.
+    """
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
 @GhibliRouter.get("/films")
-@has_permission('films')
 async def get_films(
-    limit: int = Query(None, description="Limitar el número de resultados"),
+    request: Request,
+    limit: int = Query(None, ge=1, description="Limitar el número de resultados"),
     film_id: str = Query(None, description="ID de la película"),
+    query: GhibliQuerySchema = Depends(get_ghibli_query),
     ghibli_service: GhibliService = Depends(),
-    _token: str = Depends(oauth2_scheme)
+    _principal: TokenDataSchema = Depends(require_role('films'))
     )-> List[FilmSchema]:
     """Obtiene los datos de las peliculas
 
     Args:
+        request (Request): Petición HTTP, usada para negociar la compresión y la caché.
         limit (int, optional): Limitar el número de resultados.
         film_id (str, optional): ID de la película.
+        query (GhibliQuerySchema, optional): Filtros, ordenamiento, proyección y desplazamiento.
         ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
-        _token (str, optional): _token del usuario autenticado. Defaults to Depends(oauth2_scheme).
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
 
     Returns:
         _type_: _description_
     """
-    return await ghibli_service.get_info(FilmSchema, limit=limit, endpoint='films', endpoint_id=film_id)
+    return await query_collection(
+        request, ghibli_service, FilmSchema, 'films', query, limit, film_id)
 
 @GhibliRouter.get("/people")
-@has_permission('people')
 async def get_people(
-    limit: int = Query(None, description="Limitar el número de resultados"),
+    request: Request,
+    limit: int = Query(None, ge=1, description="Limitar el número de resultados"),
     people_id: str = Query(None, description="ID de la persona"),
+    query: GhibliQuerySchema = Depends(get_ghibli_query),
     ghibli_service: GhibliService = Depends(),
-    _token: str = Depends(oauth2_scheme)) -> List[PeopleSchema]:
+    _principal: TokenDataSchema = Depends(require_role('people'))) -> List[PeopleSchema]:
     """Obtiene los datos de las personas
 
     Args:
+        request (Request): Petición HTTP, usada para negociar la compresión y la caché.
         limit (int, optional): Limitar el número de resultados.
         people_id (str, optional): ID de la persona.
+        query (GhibliQuerySchema, optional): Filtros, ordenamiento, proyección y desplazamiento.
         ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
-        _token (str, optional): _token del usuario autenticado. Defaults to Depends(oauth2_scheme).
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
 
     Returns:
         _type_: _description_
     """
-    return await ghibli_service.get_info(PeopleSchema, limit=limit, endpoint='people', endpoint_id=people_id)
+    return await query_collection(
+        request, ghibli_service, PeopleSchema, 'people', query, limit, people_id)
 
 @GhibliRouter.get("/locations")
-@has_permission('locations')
 async def get_location(
-    limit: int = Query(None, description="Limitar el número de resultados"),
+    request: Request,
+    limit: int = Query(None, ge=1, description="Limitar el número de resultados"),
     location_id: str = Query(None, description="ID de la localización"),
+    query: GhibliQuerySchema = Depends(get_ghibli_query),
     ghibli_service: GhibliService = Depends(),
-    _token: str = Depends(oauth2_scheme)) -> List[LocationSchema]:
+    _principal: TokenDataSchema = Depends(require_role('locations'))) -> List[LocationSchema]:
     """Obtiene los datos de las localizaciones
 
     Args:
+        request (Request): Petición HTTP, usada para negociar la compresión y la caché.
         limit (int, optional): Limitar el número de resultados.
         location_id (str, optional): ID de la localización.
+        query (GhibliQuerySchema, optional): Filtros, ordenamiento, proyección y desplazamiento.
         ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
-        _token (str, optional): _token del usuario autenticado. Defaults to Depends(oauth2_scheme).
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
 
     Returns:
         _type_: _description_
     """
-    # result: List[SpeciesSchema] =
-    return await ghibli_service.get_info(LocationSchema, limit=limit, endpoint='locations', endpoint_id=location_id)
+    return await query_collection(
+        request, ghibli_service, LocationSchema, 'locations', query, limit, location_id)
 
 @GhibliRouter.get("/species")
-@has_permission('species')
 async def get_species(
-    limit: int = Query(None, description="Limitar el número de resultados"),
+    request: Request,
+    limit: int = Query(None, ge=1, description="Limitar el número de resultados"),
     species_id: str = Query(None, description="ID de la especie"),
+    query: GhibliQuerySchema = Depends(get_ghibli_query),
     ghibli_service: GhibliService = Depends(),
-    _token: str = Depends(oauth2_scheme)
+    _principal: TokenDataSchema = Depends(require_role('species'))
     ) -> List[SpeciesSchema]:
     """Obtiene los datos de las especies
 
     Args:
+        request (Request): Petición HTTP, usada para negociar la compresión y la caché.
         limit (int, optional): Limitar el número de resultados.
         species_id (str, optional): ID de la localización.
+        query (GhibliQuerySchema, optional): Filtros, ordenamiento, proyección y desplazamiento.
         ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
-        _token (str, optional): _token del usuario autenticado. Defaults to Depends(oauth2_scheme).
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
 
     Returns:
         _type_: _description_
     """
-    return await ghibli_service.get_info(
-        SpeciesSchema,
-        limit=limit,
-        endpoint='species',
-        endpoint_id=species_id)
+    return await query_collection(
+        request, ghibli_service, SpeciesSchema, 'species', query, limit, species_id)
 
 @GhibliRouter.get("/vehicles")
-@has_permission('vehicles')
 async def get_vehicles(
-    limit: int = Query(None, description="Limitar el número de resultados"),
+    request: Request,
+    limit: int = Query(None, ge=1, description="Limitar el número de resultados"),
     vehicles_id: str = Query(None, description="ID de los vehiculos"),
+    query: GhibliQuerySchema = Depends(get_ghibli_query),
     ghibli_service: GhibliService = Depends(),
-    _token: str = Depends(oauth2_scheme)) -> List[VehicleSchema]:
+    _principal: TokenDataSchema = Depends(require_role('vehicles'))) -> List[VehicleSchema]:
     """Obtiene los datos de las especies
 
     Args:
+        request (Request): Petición HTTP, usada para negociar la compresión y la caché.
         limit (int, optional): Limitar el número de resultados.
         vehicles_id (str, optional): ID del vehiculo.
+        query (GhibliQuerySchema, optional): Filtros, ordenamiento, proyección y desplazamiento.
         ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
-        _token (str, optional): _token del usuario autenticado. Defaults to Depends(oauth2_scheme).
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
 
     Returns:
         _type_: _description_
     """
-    return await ghibli_service.get_info(VehicleSchema, limit=limit, endpoint='vehicles', endpoint_id=vehicles_id)
+    return await query_collection(
+        request, ghibli_service, VehicleSchema, 'vehicles', query, limit, vehicles_id)
+
+@GhibliRouter.post("/snapshot/reload")
+async def reload_snapshot(
+    ghibli_service: GhibliService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))) -> Dict[str, int | float]:
+    """Recarga el catálogo local de Ghibli y lo reemplaza de forma atómica
+
+    Args:
+        ghibli_service (GhibliService, optional): Inyección del servicio que interactua con la API.
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
+
+    Raises:
+        HTTPException: Si no se pudo cargar el catálogo se retorna error 502
+
+    Returns:
+        Dict[str, int | float]: Cantidad de registros cargados por colección
+    """
+    try:
+        snapshot = await ghibli_service.reload_snapshot()
+    except (UpstreamError, ValueError, OSError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"No se pudo recargar el catálogo: {exc}"
+        ) from exc
+    return snapshot.stats()
@@ -0,0 +1,78 @@
+"""
+    Módulo de los controladores de métricas
+"""
+from typing import Dict
+from fastapi import APIRouter, Depends
+
+from infrastructure.cache.single_flight import SingleFlight, get_single_flight
+from infrastructure.cache.ttl_cache import TTLCache, get_ghibli_cache
+from infrastructure.data_base import AsyncDatabaseEngine, Engine
+from infrastructure.db_pool import pool_stats
+from infrastructure.resilience import UpstreamGuard, get_upstream_guard
+from infrastructure.security.authtentication import token_cache
+from infrastructure.security.dependencies import require_role
+from infrastructure.security.rate_limiter import LoginRateLimiter, get_login_limiter
+from repositories.ghibli_snapshot_repository import (
+    GhibliSnapshotRepository,
+    get_ghibli_snapshot
+)
+from schemas.auth_schema import TokenDataSchema
+
+MetricsRouter = APIRouter(
+    prefix="/metrics", tags=["Métricas"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+@MetricsRouter.get("/cache")
+async def get_cache_metrics(
+    cache: TTLCache = Depends(get_ghibli_cache),
+    single_flight: SingleFlight = Depends(get_single_flight),
+    snapshot_repository: GhibliSnapshotRepository = Depends(get_ghibli_snapshot),
+    guard: UpstreamGuard = Depends(get_upstream_guard),
+    login_limiter: LoginRateLimiter = Depends(get_login_limiter),
+    _principal: TokenDataSchema = Depends(require_role('admin'))
+    ) -> Dict[str, Dict[str, int | float | str]]:
+    """Obtiene los contadores de aciertos, fallos y desalojos de las cachés, las llamadas
+    a la API de Ghibli compartidas entre peticiones concurrentes, el catálogo local cargado
+    y el estado del circuit breaker, además de los tokens de acceso ya verificados y los
+    intentos de inicio de sesión rechazados
+
+    Args:
+        cache (TTLCache, optional): Caché de respuestas de Ghibli.
+        single_flight (SingleFlight, optional): Agrupador de llamadas a la API de Ghibli.
+        snapshot_repository (GhibliSnapshotRepository, optional): Catálogo local de Ghibli.
+        guard (UpstreamGuard, optional): Estado del circuit breaker y de los reintentos.
+        login_limiter (LoginRateLimiter, optional): Limitador de inicio de sesión.
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
+
+    Returns:
+        Dict[str, Dict[str, int | float | str]]: Estadísticas de cada caché
+    """
+    metrics = {
+        "ghibli": cache.stats(),
+        "ghibli_single_flight": single_flight.stats(),
+        "ghibli_upstream": guard.stats(),
+        "tokens": token_cache.stats(),
+        "login_rate_limit": login_limiter.stats(),
+    }
+    if snapshot_repository.snapshot is not None:
+        metrics["ghibli_snapshot"] = snapshot_repository.snapshot.stats()
+    return metrics
+
+@MetricsRouter.get("/database")
+async def get_database_metrics(
+    _principal: TokenDataSchema = Depends(require_role('admin'))
+    ) -> Dict[str, Dict[str, int | float]]:
+    """Obtiene la ocupación de los pools de conexiones y el tiempo que esperan las peticiones
+    por una conexión, para dimensionar los workers frente a max_connections de Postgres
+
+    Args:
+        _principal (TokenDataSchema, optional): Usuario autenticado con el rol requerido.
+
+    Returns:
+        Dict[str, Dict[str, int | float]]: Estadísticas del pool síncrono y del asíncrono
+    """
+    return {
+        "sync": pool_stats(Engine),
+        "async": pool_stats(AsyncDatabaseEngine.sync_engine),
+    }
@@ -1,12 +1,22 @@
 """
     Módulo de los controladores del usuario
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from infrastructure.decorators.role_decorator import has_permission
-from infrastructure.security.authtentication import oauth2_scheme
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from infrastructure.environment import get_environment_variables
+from infrastructure.http_cache import conditional_response
+from infrastructure.record_stream import RECORD_CONTENT_TYPES, iter_records
+from infrastructure.responses import model_response
+from infrastructure.security.dependencies import require_role
 
+from schemas.auth_schema import TokenDataSchema
 from schemas.user_schema import (
+    RoleSchema,
+    UserBulkChangeResultSchema,
+    UserBulkResultSchema,
+    UserBulkSelectionSchema,
+    UserBulkUpdateRequestSchema,
     UserSchema,
     UserQuerySchema,
     UserCreateRequestSchema,
@@ -14,47 +24,186 @@ from schemas.user_schema import (
     )
 from services.user_service import UserService
 
+env = get_environment_variables()
+
+# Los usuarios pueden cambiar en cualquier momento: el cliente debe revalidar con el ETag
+USER_CACHE_CONTROL = "private, no-cache"
+
 UserRouter = APIRouter(
     prefix="/users", tags=["User"],
     responses={404: {"description": "No encontrado"}},
 )
 
 @UserRouter.get("/", response_model=List[UserSchema])
-@has_permission('admin')
 async def get_all_users(
+    request: Request,
     limit: int = Query(None, description="Limitar el número de resultados"),
     start: int = Query(None, description="Comenzar los resultados desde este índice"),
+    cursor: str = Query(None, description="Cursor de la página siguiente, reemplaza a start"),
     username: str = Query(None, description="Valor de nombre de usuario"),
     email: str = Query(None, description="Valor de correo electrónico"),
     role_id: int = Query(None, description="ID del rol"),
     user_service: UserService = Depends(),
-    _token: str = Depends(oauth2_scheme)
+    _principal: TokenDataSchema = Depends(require_role('admin'))
 ):
     """
     Obtener una lista de usuarios con filtros opcionales.
 
     - **limit**: Limitar el número de resultados.
     - **start**: Comenzar los resultados desde este índice.
+    - **cursor**: Cursor devuelto en la cabecera X-Next-Cursor de la página anterior.
+      El costo de cada página es constante, a diferencia de start.
     - **username**: Filtrar por nombre de usuario.
     - **email**: Filtrar por correo electrónico.
     - **role_id**: Filtrar por ID de rol.
 
     Returns:
-        List[UserSchema]: Lista de usuarios que coinciden con los filtros.
+        List[UserSchema]: Lista de usuarios que coinciden con los filtros. Si hay más
+        resultados, la cabecera X-Next-Cursor contiene el cursor de la página siguiente.
+        Si la cabecera If-None-Match coincide con el ETag de la página se responde 304.
     """
     query = UserQuerySchema()
     query.username = username
     query.email = email
     query.role_id = role_id
-    users = user_service.list(limit=limit, start=start, query_params=query)
-    return users
+    try:
+        users = await user_service.list(
+            limit=limit, start=start, query_params=query, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    next_cursor = UserService.next_cursor(users, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return conditional_response(
+        request,
+        model_response(users, List[UserSchema], from_attributes=True, headers=headers),
+        USER_CACHE_CONTROL)
+
+@UserRouter.get("/export")
+async def export_users(
+    export_format: Literal["ndjson", "csv"] = Query(
+        "ndjson", alias="format", description="Formato de la exportación: ndjson o csv"),
+    username: str = Query(None, description="Valor de nombre de usuario"),
+    email: str = Query(None, description="Valor de correo electrónico"),
+    role_id: int = Query(None, description="ID del rol"),
+    user_service: UserService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))
+):
+    """
+    Exportar los usuarios como NDJSON o CSV.
+
+    Las filas se leen con un cursor del servidor y se envían a medida que se leen, por lo
+    que la memoria usada no depende de la cantidad de usuarios.
+
+    - **format**: ndjson (un usuario por línea) o csv.
+    - **username**: Filtrar por nombre de usuario.
+    - **email**: Filtrar por correo electrónico.
+    - **role_id**: Filtrar por ID de rol.
+
+    Returns:
+        StreamingResponse: Los usuarios en el formato indicado.
+    """
+    query = UserQuerySchema()
+    query.username = username
+    query.email = email
+    query.role_id = role_id
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        user_service.export(query, export_format, env.USER_EXPORT_BATCH_SIZE),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'})
+
+@UserRouter.post("/bulk", response_model=UserBulkResultSchema)
+async def bulk_create_users(
+    request: Request,
+    batch_size: int = Query(
+        None, gt=0, description="Usuarios insertados por sentencia. Por defecto USER_BULK_BATCH_SIZE"),
+    user_service: UserService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
+    """
+    Crear usuarios de forma masiva.
+
+    El cuerpo puede ser un arreglo JSON (application/json), un objeto JSON por línea
+    (application/x-ndjson) o un CSV con cabecera (text/csv), con los mismos campos que la
+    creación individual. NDJSON y CSV se procesan a medida que llegan.
+
+    Returns:
+        UserBulkResultSchema: Resultado de cada fila: created, conflict si el usuario o el
+        correo ya existen o se repiten en la carga, invalid si los datos no son válidos o
+        la fila no pudo interpretarse, o error si su lote no pudo insertarse.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in RECORD_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Tipos de contenido soportados: {', '.join(RECORD_CONTENT_TYPES)}")
+    records = iter_records(content_type, request.stream())
+    try:
+        return await user_service.bulk_create(records, batch_size or env.USER_BULK_BATCH_SIZE)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@UserRouter.patch("/bulk", response_model=UserBulkChangeResultSchema)
+async def bulk_update_users(
+    request: UserBulkUpdateRequestSchema,
+    user_service: UserService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
+    """
+    Reasignar el rol de varios usuarios en una sola sentencia UPDATE.
+
+    - **ids**: IDs de los usuarios.
+    - **filters**: Filtros por username, email o role_id.
+    - **role_name** o **role_id**: Rol a asignar.
+    - **chunk_size**: Usuarios por transacción, para conjuntos muy grandes.
+
+    Returns:
+        UserBulkChangeResultSchema: IDs de los usuarios actualizados.
+    """
+    try:
+        return await user_service.bulk_update(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@UserRouter.delete("/bulk", response_model=UserBulkChangeResultSchema)
+async def bulk_delete_users(
+    request: UserBulkSelectionSchema,
+    user_service: UserService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
+    """
+    Eliminar varios usuarios en una sola sentencia DELETE.
+
+    - **ids**: IDs de los usuarios.
+    - **filters**: Filtros por username, email o role_id.
+    - **chunk_size**: Usuarios por transacción, para conjuntos muy grandes.
+
+    Returns:
+        UserBulkChangeResultSchema: IDs de los usuarios eliminados.
+    """
+    try:
+        return await user_service.bulk_delete(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@UserRouter.post("/roles/reload", response_model=List[RoleSchema])
+async def reload_roles(
+    user_service: UserService = Depends(),
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
+    """
+    Recargar los roles desde la base de datos.
+
+    Los roles se mantienen en memoria; después de modificarlos en la base de datos debe
+    llamarse a esta ruta para que las altas y modificaciones de usuarios los vean.
+
+    Returns:
+        List[RoleSchema]: Roles cargados.
+    """
+    return await user_service.reload_roles()
 
 @UserRouter.get("/{user_id}", response_model=UserSchema)
-@has_permission('admin')
 async def get_user(
-    user_id: int, 
+    request: Request,
+    user_id: int,
     user_service: UserService = Depends(), 
-    _token: str = Depends(oauth2_scheme)):
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
     """
     Obtener un usuario por su ID.
 
@@ -62,19 +211,20 @@ async def get_user(
         user_id (int): El ID del usuario.
 
     Returns:
-        UserSchema: La información del usuario.
+        UserSchema: La información del usuario. Si la cabecera If-None-Match coincide con
+        el ETag del usuario se responde 304.
     """
-    user = user_service.get(user_id)
+    user = await user_service.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return conditional_response(
+        request, model_response(user, UserSchema, from_attributes=True), USER_CACHE_CONTROL)
 
 @UserRouter.post("/", response_model=UserSchema)
-@has_permission('admin')
 async def create_user(
     user: UserCreateRequestSchema, 
     user_service: UserService = Depends(),
-    _token: str = Depends(oauth2_scheme)):
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
     """
     Crear un nuevo usuario.
 
@@ -84,15 +234,14 @@ async def create_user(
     Returns:
         UserSchema: El usuario recién creado.
     """
-    return user_service.create(user)
+    return model_response(await user_service.create(user), UserSchema, from_attributes=True)
 
 @UserRouter.patch("/{user_id}", response_model=UserSchema)
-@has_permission('admin')
-def update(
+async def update(
     user_id: int,
     user: UserUpdateRequestSchema,
     user_service: UserService = Depends(),
-    _token: str = Depends(oauth2_scheme)):
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
     """
     Actualizar un usuario existente.
 
@@ -103,17 +252,16 @@ def update(
     Returns:
         UserSchema: La información actualizada del usuario.
     """
-    user = user_service.update(user_id, user)
+    user = await user_service.update(user_id, user)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return model_response(user, UserSchema, from_attributes=True)
 
 @UserRouter.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-# @has_permission('admin')
-def delete(
+async def delete(
     user_id: int,
     user_service: UserService = Depends(),
-    _token: str = Depends(oauth2_scheme)):
+    _principal: TokenDataSchema = Depends(require_role('admin'))):
     """
     Eliminar un usuario por su ID.
 
@@ -122,6 +270,6 @@ def delete(
 
     """
     try:
-        return user_service.delete(user_id)         
+        return await user_service.delete(user_id)         
     except Exception as exc:
         raise HTTPException(status_code=404, detail="User not found") from exc
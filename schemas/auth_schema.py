@@ -5,14 +5,17 @@ from pydantic import BaseModel
 
 
 class TokenSchema(BaseModel):
-    """_summary_
+    """
+    Representa el token de acceso y el token de actualización con el que se renueva.
     """
     access_token: str
     token_type: str
+    refresh_token: str | None = None
 
 
 class TokenDataSchema(BaseModel):
-    """_summary_
+    """
+    Representa al usuario autenticado a partir de los datos de su token de acceso.
     """
     username: str | None = None
     role: str | None = None
@@ -23,3 +26,9 @@ class LoginSchema(BaseModel):
     """
     username: str
     password: str
+
+class RefreshRequestSchema(BaseModel):
+    """
+    Representa el token de actualización enviado para renovar o cerrar la sesión.
+    """
+    refresh_token: str
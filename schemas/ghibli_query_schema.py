@@ -0,0 +1,53 @@
+"""
+Módulo que define los esquemas Pydantic para las consultas sobre las rutas de Ghibli.
+"""
+import re
+from typing import List, Literal
+from pydantic import BaseModel
+
+FILTER_PATTERN = re.compile(r"^\s*(\w+)\s*(==|!=|>=|<=|>|<|=)(.*)$")
+
+class GhibliFilterSchema(BaseModel):
+    """
+    Representa una condición de filtrado con la forma campo-operador-valor, por ejemplo
+    `rt_score>=90` o `director==Hayao Miyazaki`.
+    """
+    field: str
+    operator: Literal["==", "!=", ">=", "<=", ">", "<"]
+    value: str
+
+    @classmethod
+    def parse(cls, expression: str) -> "GhibliFilterSchema":
+        """Construye el filtro a partir de su expresión textual
+
+        Args:
+            expression (str): Expresión del filtro
+
+        Raises:
+            ValueError: Si la expresión no tiene la forma campo-operador-valor
+
+        Returns:
+            GhibliFilterSchema: El filtro construido
+        """
+        match = FILTER_PATTERN.match(expression)
+        if not match:
+            raise ValueError(f"Filtro inválido: {expression}")
+        field, operator, value = match.groups()
+        return cls(field=field, operator="==" if operator == "=" else operator, value=value.strip())
+
+class GhibliQuerySchema(BaseModel):
+    """
+    Representa los parámetros de filtrado, ordenamiento, proyección, paginación y
+    expansión de referencias aplicados sobre una colección de Ghibli.
+    """
+    filters: List[GhibliFilterSchema] = []
+    sort: List[str] = []
+    fields: List[str] = []
+    expand: List[str] = []
+    offset: int = 0
+
+    def is_empty(self) -> bool:
+        """
+        Indica si la consulta no requiere procesar la colección completa.
+        """
+        return not self.filters and not self.sort and self.offset == 0
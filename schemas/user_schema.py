@@ -1,9 +1,9 @@
 """
 Módulo que define los esquemas Pydantic para los usuarios.
 """
-from typing import Optional
+from typing import List, Literal, Optional
 from enum import Enum
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 class RoleEnum(str, Enum):
     admin = "admin"
@@ -62,3 +62,51 @@ class UserQuerySchema(BaseModel):
     username: Optional[str] = None
     email: Optional[str] = None
     role_id: Optional[int] = None
+
+class UserBulkRowSchema(BaseModel):
+    """
+    Representa el resultado de importar una fila en la carga masiva de usuarios.
+    """
+    row: int
+    status: Literal["created", "conflict", "invalid", "error"]
+    id: Optional[int] = None
+    username: Optional[str] = None
+    detail: Optional[str] = None
+
+class UserBulkResultSchema(BaseModel):
+    """
+    Representa el resultado de la carga masiva de usuarios.
+    """
+    created: int = 0
+    failed: int = 0
+    results: List[UserBulkRowSchema] = []
+
+class UserBulkSelectionSchema(BaseModel):
+    """
+    Representa los usuarios afectados por una operación masiva: una lista de IDs,
+    filtros, o ambos. chunk_size divide la operación en transacciones más pequeñas.
+    """
+    ids: Optional[List[int]] = None
+    filters: Optional[UserQuerySchema] = None
+    chunk_size: Optional[int] = Field(None, gt=0)
+
+    def is_empty(self) -> bool:
+        """
+        Indica si no se indicaron IDs ni filtros, para no afectar toda la tabla por error.
+        """
+        return self.ids is None and (
+            self.filters is None or not self.filters.model_dump(exclude_none=True))
+
+class UserBulkUpdateRequestSchema(UserBulkSelectionSchema):
+    """
+    Representa el esquema de datos para la reasignación masiva de rol.
+    """
+    role_name: Optional[RoleEnum] = None
+    role_id: Optional[int] = None
+
+class UserBulkChangeResultSchema(BaseModel):
+    """
+    Representa el resultado de una actualización o eliminación masiva.
+    """
+    count: int
+    ids: List[int]
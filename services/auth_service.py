@@ -1,49 +1,161 @@
 """
  Módulo que define los servicios de autenticación
 """
+from datetime import datetime, timedelta, timezone
+import uuid
 from fastapi import Depends
-from infrastructure.security.authtentication import create_access_token, verify_password
+from infrastructure.data_base import maybe_await
+from infrastructure.environment import get_environment_variables
+from infrastructure.security.authtentication import (
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    verify_password_async
+)
+from infrastructure.security.rate_limiter import LoginRateLimiter, get_login_limiter
 
+from models.UserModel import RefreshToken, User
+from repositories.async_user_repository import AsyncUserRepository
 from repositories.user_repository import UserRepository
+from repositories.user_repository_provider import UserRepositoryImplementation
 from schemas.auth_schema import TokenSchema
 from schemas.user_schema import UserQuerySchema
 
+env = get_environment_variables()
+
 class AuthService:
     """
         Servicios de autenticación
     """
-    user_repository: UserRepository
+    user_repository: AsyncUserRepository | UserRepository
+    login_limiter: LoginRateLimiter
 
     def __init__(
-        self, user_repository: UserRepository = Depends()
+        self,
+        user_repository: AsyncUserRepository | UserRepository = Depends(
+            UserRepositoryImplementation),
+        login_limiter: LoginRateLimiter = Depends(get_login_limiter)
     ) -> None:
         """
         Constructor de la clase AuthService.
 
         Args:
-            userRepository (UserRepository, optional): 
-                Repositorio de usuarios. Defaults to Depends().
+            userRepository (AsyncUserRepository | UserRepository, optional):
+                Repositorio de usuarios según DATABASE_ASYNC.
+                Defaults to Depends(UserRepositoryImplementation).
+            login_limiter (LoginRateLimiter, optional): Limitador de intentos de inicio de
+                sesión. Defaults to Depends(get_login_limiter).
         """
         self.user_repository = user_repository
+        self.login_limiter = login_limiter
 
-    def login(self, username: str, password: str) -> TokenSchema | None:
-        """Devuelve el token de acceso del usuario
+    async def login(
+        self,
+        username: str,
+        password: str,
+        client_ip: str | None = None
+        ) -> TokenSchema | None:
+        """Devuelve el token de acceso del usuario. Los intentos por usuario y por IP se
+        limitan antes de consultar la base de datos y verificar la contraseña; un inicio
+        exitoso no cuenta para ninguno de los dos límites.
 
         Args:
             username (str): nombre de usuario
             password (str): contraseña
+            client_ip (str | None, optional): IP del cliente. Defaults to None.
+
+        Raises:
+            RateLimitExceeded: Si el usuario o la IP superaron el límite de intentos
 
         Returns:
-            TokenSchema: Retorna el token de acceso del usuario. 
+            TokenSchema: Retorna el token de acceso del usuario y un token de actualización
+            que inicia una nueva familia de tokens.
             Si no encuentra el usuario o  falla la verificación de contraseña se retorna None
         """
+        attempt = await self.login_limiter.acquire(username, client_ip)
         query = UserQuerySchema()
         query.username = username
-        users = self.user_repository.list(query)
+        users = await maybe_await(self.user_repository.list(query))
         if len(users) == 0:
             return None
         user = users[0]
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             return None
-        access_token = create_access_token(data={"sub": user.username, "role": user.role.name})
-        return TokenSchema(access_token=access_token, token_type="bearer")
+        await self.login_limiter.succeeded(attempt)
+        refresh_token, stored = self._new_refresh_token(user.id, uuid.uuid4().hex)
+        claims = self._claims(user)
+        await maybe_await(self.user_repository.add_refresh_token(stored))
+        return self._token_response(claims, refresh_token)
+
+    async def refresh(self, refresh_token: str) -> TokenSchema | None:
+        """Renueva el token de acceso con un token de actualización, que se reemplaza por
+        uno nuevo de la misma familia. Solo requiere buscar el token por su hash, sin
+        verificar la contraseña. Si se presenta un token ya rotado, se asume que fue robado
+        y se revoca toda su familia.
+
+        Args:
+            refresh_token (str): Token de actualización
+
+        Returns:
+            TokenSchema | None: El nuevo token de acceso y el nuevo token de actualización,
+            o None si el token no existe, expiró o fue revocado
+        """
+        stored = await maybe_await(
+            self.user_repository.get_refresh_token(hash_refresh_token(refresh_token)))
+        if stored is None:
+            return None
+        if stored.revoked_at is not None:
+            await maybe_await(self.user_repository.revoke_refresh_tokens(stored.family_id))
+            return None
+        if _as_utc(stored.expires_at) <= datetime.now(timezone.utc):
+            return None
+        claims = self._claims(stored.user)
+        new_token, replacement = self._new_refresh_token(stored.user_id, stored.family_id)
+        if not await maybe_await(self.user_repository.rotate_refresh_token(stored, replacement)):
+            # Otra petición rotó el mismo token al mismo tiempo
+            await maybe_await(self.user_repository.revoke_refresh_tokens(stored.family_id))
+            return None
+        return self._token_response(claims, new_token)
+
+    async def revoke(self, refresh_token: str) -> bool:
+        """Revoca el token de actualización y todos los de su familia, cerrando la sesión.
+
+        Args:
+            refresh_token (str): Token de actualización
+
+        Returns:
+            bool: True si el token existía, False si no
+        """
+        stored = await maybe_await(
+            self.user_repository.get_refresh_token(hash_refresh_token(refresh_token)))
+        if stored is None:
+            return False
+        await maybe_await(self.user_repository.revoke_refresh_tokens(stored.family_id))
+        return True
+
+    @staticmethod
+    def _claims(user: User) -> dict:
+        return {"sub": user.username, "role": user.role.name}
+
+    @staticmethod
+    def _new_refresh_token(user_id: int, family_id: str) -> tuple[str, RefreshToken]:
+        token = create_refresh_token()
+        return token, RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=env.REFRESH_TOKEN_EXPIRE_DAYS))
+
+    @staticmethod
+    def _token_response(claims: dict, refresh_token: str) -> TokenSchema:
+        return TokenSchema(
+            access_token=create_access_token(data=claims),
+            token_type="bearer",
+            refresh_token=refresh_token)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """
+    SQLite no conserva la zona horaria: las fechas sin zona se interpretan en UTC.
+    """
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -1,62 +1,588 @@
 """
  Módulo que define los servicios para consumir el Ghibli
 """
-from typing import TypeVar, List, Type
-from httpx import AsyncClient, HTTPStatusError, RequestError
+import asyncio
+import operator
+import time
+from typing import Any, Dict, Optional, TypeVar, List, Tuple, Type
+from urllib.parse import urlparse
+from fastapi import Depends
+from httpx import AsyncClient
 
+from infrastructure.cache.single_flight import SingleFlight, get_single_flight
+from infrastructure.cache.ttl_cache import TTLCache, get_ghibli_cache
+from infrastructure.compression import encoded_body
 from infrastructure.environment import  get_environment_variables
+from infrastructure.http_cache import compute_etag
+from infrastructure.http_client import get_http_client
+from infrastructure.resilience import UpstreamError, UpstreamGuard, get_upstream_guard
+from infrastructure.responses import type_adapter
+from repositories.ghibli_snapshot_repository import (
+    GhibliSnapshot,
+    GhibliSnapshotRepository,
+    get_ghibli_snapshot
+)
+from schemas.film_schema import FilmSchema
+from schemas.ghibli_query_schema import GhibliFilterSchema, GhibliQuerySchema
+from schemas.location_schema import LocationSchema
+from schemas.people_schema import PeopleSchema
+from schemas.specie_schema import SpeciesSchema
+from schemas.vehicle_schema import VehicleSchema
 
 T = TypeVar("T")
 
+DEFAULT_LIMIT = 50
+# Límite máximo admitido por la API, usado para descargar el catálogo completo
+SNAPSHOT_LIMIT = 250
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+# Colecciones expuestas por la API de Ghibli y el esquema con el que se validan
+ENDPOINT_MODELS = {
+    'films': FilmSchema,
+    'people': PeopleSchema,
+    'locations': LocationSchema,
+    'species': SpeciesSchema,
+    'vehicles': VehicleSchema,
+}
+
 class GhibliService:
     """
         Servicios del usuario
     """
 
-    def __init__(self):
+    client: AsyncClient
+    cache: TTLCache
+    single_flight: SingleFlight
+    snapshot_repository: GhibliSnapshotRepository
+    guard: UpstreamGuard
+
+    def __init__(
+        self,
+        client: AsyncClient = Depends(get_http_client),
+        cache: TTLCache = Depends(get_ghibli_cache),
+        single_flight: SingleFlight = Depends(get_single_flight),
+        snapshot_repository: GhibliSnapshotRepository = Depends(get_ghibli_snapshot),
+        guard: UpstreamGuard = Depends(get_upstream_guard)
+        ):
         """
         Constructor de la clase GhibliService.
+
+        Args:
+            client (AsyncClient, optional): Cliente HTTP compartido por la aplicación.
+                Defaults to Depends(get_http_client).
+            cache (TTLCache, optional): Caché de respuestas compartida por la aplicación.
+                Defaults to Depends(get_ghibli_cache).
+            single_flight (SingleFlight, optional): Agrupador de llamadas concurrentes
+                idénticas a la API. Defaults to Depends(get_single_flight).
+            snapshot_repository (GhibliSnapshotRepository, optional): Catálogo local usado
+                cuando GHIBLI_SOURCE es 'snapshot'. Defaults to Depends(get_ghibli_snapshot).
+            guard (UpstreamGuard, optional): Timeouts, reintentos y circuit breaker aplicados
+                a las llamadas a la API. Defaults to Depends(get_upstream_guard).
         """
         self.env = get_environment_variables()
+        self.client = client
+        self.cache = cache
+        self.single_flight = single_flight
+        self.snapshot_repository = snapshot_repository
+        self.guard = guard
 
     async def get_info(
         self,
         model: Type[T],
         endpoint: str,
-        limit: int | None = 50,
+        limit: int | None = DEFAULT_LIMIT,
         endpoint_id: str | None = None
         ) -> List[T]:
-        """Obtiene según el endpoint especificado los valores devueltos por GHIBLI
+        """Obtiene según el endpoint especificado los valores devueltos por GHIBLI.
+        Las respuestas ya validadas se guardan en caché durante el TTL del endpoint y
+        las peticiones concurrentes con la misma llave comparten una única llamada a la API.
+        Una vez expirado el TTL, la entrada obsoleta se sirve de inmediato mientras se
+        refresca en segundo plano. Con GHIBLI_SOURCE='snapshot' se responde desde el
+        catálogo local sin consultar la API. Si la API falla se responde con los datos en
+        caché que contengan lo solicitado, cuando existan.
 
         Args:
             endpoint (str): Selecciona que endpoint consultar
             limit (int): Cantidad de registros a devolver, en caso de omitirlo el valor es 50
             endpoint_id (any | None): Identificador del tipo de endpoint
 
+        Raises:
+            UpstreamError: 404 si el recurso no existe, o si la API no está disponible y no
+                hay datos en caché
+
         Returns:
             List[T]: Retorna una lista de objetos segun el endpoint consultado
         """
-        url = f"{self.env.GHIBLI_API}/{endpoint}"
+        snapshot = self.snapshot_repository.snapshot
+        if self.env.GHIBLI_SOURCE == 'snapshot' and snapshot is not None:
+            items = snapshot.find(endpoint, limit or DEFAULT_LIMIT, endpoint_id)
+            if endpoint_id and not items:
+                raise UpstreamError(404, "No encontrado")
+            return items
+
+        key = self.cache_key(endpoint, limit, endpoint_id)
+        entry = self.cache.get_entry(key, allow_stale=True)
+        if entry is not None:
+            if not entry.is_fresh(self.cache.clock()):
+                self.single_flight.start(
+                    key, lambda: self._load(key, model, endpoint, limit, endpoint_id))
+            return list(entry.value)
+
+        try:
+            result = await self.single_flight.do(
+                key, lambda: self._load(key, model, endpoint, limit, endpoint_id))
+        except UpstreamError:
+            fallback = self._cached_fallback(endpoint, limit, endpoint_id)
+            if fallback is None:
+                raise
+            return fallback
+        return list(result)
+
+    async def query_info(
+        self,
+        model: Type[T],
+        endpoint: str,
+        query: GhibliQuerySchema,
+        limit: int | None = None,
+        endpoint_id: str | None = None
+        ) -> List[T]:
+        """Aplica filtros, ordenamiento y paginación sobre la colección completa, obtenida
+        desde la caché o el catálogo local. Sin filtros ni ordenamiento se comporta como get_info.
+
+        Args:
+            model (Type[T]): Esquema de la colección
+            endpoint (str): Selecciona que endpoint consultar
+            query (GhibliQuerySchema): Filtros, ordenamiento y desplazamiento a aplicar
+            limit (int | None, optional): Cantidad de registros a devolver. Defaults to None.
+            endpoint_id (str | None, optional): Identificador del recurso. Defaults to None.
+
+        Returns:
+            List[T]: Lista de objetos que cumplen la consulta
+        """
+        if endpoint_id or query.is_empty():
+            return await self.get_info(model, endpoint=endpoint, limit=limit, endpoint_id=endpoint_id)
+
+        items = await self.get_info(model, endpoint=endpoint, limit=SNAPSHOT_LIMIT)
+        items = [item for item in items if all(_matches(item, rule) for rule in query.filters)]
+        # Ordenamientos estables aplicados del último criterio al primero
+        for field in reversed(query.sort):
+            name = field.lstrip("-")
+            items.sort(
+                key=lambda item, name=name: _sort_key(getattr(item, name)),
+                reverse=field.startswith("-"))
+        return items[query.offset:query.offset + (limit or DEFAULT_LIMIT)]
+
+    @staticmethod
+    def validate_query(model: Type[T], query: GhibliQuerySchema) -> None:
+        """Verifica que los campos usados en la consulta existan en el esquema
+
+        Args:
+            model (Type[T]): Esquema de la colección
+            query (GhibliQuerySchema): Consulta a validar
+
+        Raises:
+            ValueError: Si algún campo no pertenece al esquema
+        """
+        fields = [rule.field for rule in query.filters]
+        fields += [field.lstrip("-") for field in query.sort]
+        fields += query.fields
+        fields += query.expand
+        unknown = [field for field in fields if field not in model.model_fields]
+        if unknown:
+            raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+
+    @staticmethod
+    def project(items: List[T | Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+        """Reduce cada objeto a los campos solicitados
+
+        Args:
+            items (List[T | Dict[str, Any]]): Objetos, o diccionarios ya expandidos, a proyectar
+            fields (List[str]): Campos a conservar
+
+        Returns:
+            List[Dict[str, Any]]: Objetos con solo los campos solicitados
+        """
+        include = set(fields)
+        return [
+            {key: value for key, value in item.items() if key in include}
+            if isinstance(item, dict) else item.model_dump(include=include)
+            for item in items
+        ]
+
+    async def expand(self, items: List[T], fields: List[str]) -> List[Dict[str, Any]]:
+        """Reemplaza las URLs de referencia de los campos indicados por los objetos a los que
+        apuntan. Las URLs se deduplican y se resuelven de forma concurrente, con un máximo de
+        GHIBLI_EXPAND_CONCURRENCY consultas simultáneas, desde la caché o el catálogo local
+        cuando están disponibles. Las URLs que no apuntan a un recurso se conservan.
+
+        Args:
+            items (List[T]): Objetos a expandir
+            fields (List[str]): Campos con URLs de referencia
+
+        Returns:
+            List[Dict[str, Any]]: Objetos con las referencias embebidas
+        """
+        references: Dict[str, Tuple[str, str]] = {}
+        for item in items:
+            for field in fields:
+                for url in _as_list(getattr(item, field)):
+                    reference = _parse_reference(url)
+                    if reference is not None:
+                        references[url] = reference
+
+        resolved: Dict[str, Any] = {}
+        pending = []
+        for url, (endpoint, endpoint_id) in references.items():
+            cached = self._find_in_cached_collection(endpoint, endpoint_id)
+            if cached is not None:
+                resolved[url] = cached
+            else:
+                pending.append(url)
+
+        semaphore = asyncio.Semaphore(self.env.GHIBLI_EXPAND_CONCURRENCY)
+
+        async def resolve(url: str) -> Optional[Any]:
+            endpoint, endpoint_id = references[url]
+            async with semaphore:
+                try:
+                    result = await self.get_info(
+                        ENDPOINT_MODELS[endpoint], endpoint=endpoint, endpoint_id=endpoint_id)
+                except UpstreamError:
+                    return None
+            return result[0] if result else None
+
+        for url, result in zip(pending, await asyncio.gather(*[resolve(url) for url in pending])):
+            if result is not None:
+                resolved[url] = result
+
+        expanded = []
+        for item in items:
+            data = item.model_dump()
+            for field in fields:
+                value = getattr(item, field)
+                if isinstance(value, list):
+                    data[field] = [_embed(url, resolved) for url in value]
+                elif value is not None:
+                    data[field] = _embed(value, resolved)
+            expanded.append(data)
+        return expanded
+
+    def cached_body(
+        self,
+        model: Type[T],
+        endpoint: str,
+        limit: int | None,
+        endpoint_id: str | None,
+        accept_encoding: str | None
+        ) -> Optional[Tuple[bytes, Optional[str], str]]:
+        """Devuelve la respuesta JSON de una entrada de la caché en la codificación negociada.
+        El JSON, su ETag y sus versiones comprimidas se generan una sola vez por entrada y se
+        guardan junto a ella, contando su tamaño en el presupuesto de memoria de la caché.
+
+        Args:
+            model (Type[T]): Esquema de la colección
+            endpoint (str): Nombre del endpoint
+            limit (int | None): Cantidad de registros solicitados
+            endpoint_id (str | None): Identificador del recurso
+            accept_encoding (str | None): Cabecera Accept-Encoding del cliente
+
+        Returns:
+            Optional[Tuple[bytes, Optional[str], str]]: El cuerpo, su codificación (None si no
+            está comprimido) y el ETag del JSON sin comprimir, o None si la consulta no tiene
+            una entrada en la caché
+        """
+        snapshot = self.snapshot_repository.snapshot
+        if self.env.GHIBLI_SOURCE == 'snapshot' and snapshot is not None:
+            return None
+        key = self.cache_key(endpoint, limit, endpoint_id)
+        entry = self.cache.peek(key)
+        if entry is None:
+            return None
+        bodies = entry.extras.setdefault("bodies", {})
+        body, encoding, added = encoded_body(
+            bodies,
+            lambda: type_adapter(List[model]).dump_json(entry.value),
+            accept_encoding,
+            self.env.COMPRESSION_MINIMUM_SIZE)
+        if added:
+            self.cache.add_size(key, added)
+        etag = entry.extras.get("etag")
+        if etag is None:
+            etag = entry.extras["etag"] = compute_etag(bodies["identity"])
+        return body, encoding, etag
+
+    def last_modified(
+        self,
+        endpoint: str,
+        query: GhibliQuerySchema,
+        limit: int | None,
+        endpoint_id: str | None
+        ) -> Optional[float]:
+        """Obtiene la fecha de carga de los datos con los que se responde la consulta: la
+        del catálogo local o la de la entrada de la caché.
+
+        Args:
+            endpoint (str): Nombre del endpoint
+            query (GhibliQuerySchema): Consulta aplicada
+            limit (int | None): Cantidad de registros solicitados
+            endpoint_id (str | None): Identificador del recurso
+
+        Returns:
+            Optional[float]: Marca de tiempo de la carga, o None si no se conoce
+        """
+        snapshot = self.snapshot_repository.snapshot
+        if self.env.GHIBLI_SOURCE == 'snapshot' and snapshot is not None:
+            return snapshot.loaded_at
+        if not (endpoint_id or query.is_empty()):
+            limit = SNAPSHOT_LIMIT
+        entry = self.cache.peek(self.cache_key(endpoint, limit, endpoint_id))
+        return entry.extras.get("loaded_at") if entry is not None else None
+
+    def _find_in_cached_collection(self, endpoint: str, endpoint_id: str) -> Optional[Any]:
+        """
+        Busca un recurso en el catálogo local o en la colección completa si ya está en caché.
+        """
+        snapshot = self.snapshot_repository.snapshot
+        if self.env.GHIBLI_SOURCE == 'snapshot' and snapshot is not None:
+            return snapshot.indexes.get(endpoint, {}).get(endpoint_id)
+        for limit in (SNAPSHOT_LIMIT, DEFAULT_LIMIT):
+            entry = self.cache.get_entry(self.cache_key(endpoint, limit, None), allow_stale=True)
+            if entry is None:
+                continue
+            index = entry.extras.get("index")
+            if index is None:
+                index = entry.extras["index"] = {item.id: item for item in entry.value}
+            if endpoint_id in index:
+                return index[endpoint_id]
+        return None
+
+    def _cached_fallback(
+        self,
+        endpoint: str,
+        limit: int | None,
+        endpoint_id: str | None
+        ) -> Optional[List[Any]]:
+        """
+        Busca lo solicitado dentro de las colecciones en caché cuando la API no responde.
+        """
+        if endpoint_id:
+            item = self._find_in_cached_collection(endpoint, endpoint_id)
+            return [item] if item is not None else None
+        entry = self.cache.get_entry(
+            self.cache_key(endpoint, SNAPSHOT_LIMIT, None), allow_stale=True)
+        return entry.value[:limit or DEFAULT_LIMIT] if entry is not None else None
+
+    async def warm_up(self) -> None:
+        """
+        Precarga en caché las colecciones de Ghibli con el límite por defecto.
+        """
+        endpoints = list(ENDPOINT_MODELS)
+        results = await asyncio.gather(
+            *[self.get_info(ENDPOINT_MODELS[endpoint], endpoint=endpoint, limit=None)
+              for endpoint in endpoints],
+            return_exceptions=True)
+        for endpoint, result in zip(endpoints, results):
+            if not isinstance(result, list):
+                print(f'No se pudo precargar {endpoint}: {result}')
+
+    async def reload_snapshot(self) -> GhibliSnapshot:
+        """Carga el catálogo completo desde GHIBLI_SNAPSHOT_PATH o, si no está configurado,
+        desde la API, y lo reemplaza de forma atómica.
+
+        Raises:
+            UpstreamError: Si alguna de las colecciones no pudo descargarse. En ese caso se
+                conserva el catálogo anterior.
+
+        Returns:
+            GhibliSnapshot: El catálogo cargado
+        """
+        if self.env.GHIBLI_SNAPSHOT_PATH:
+            return await asyncio.to_thread(
+                self.snapshot_repository.load_file,
+                self.env.GHIBLI_SNAPSHOT_PATH,
+                ENDPOINT_MODELS)
+
+        endpoints = list(ENDPOINT_MODELS)
+        results = await asyncio.gather(
+            *[self._fetch(ENDPOINT_MODELS[endpoint], endpoint, SNAPSHOT_LIMIT, None)
+              for endpoint in endpoints])
+        snapshot = GhibliSnapshot(dict(zip(endpoints, results)))
+        self.snapshot_repository.swap(snapshot)
+        return snapshot
+
+    async def reload_snapshot_periodically(self, interval: int) -> None:
+        """Recarga el catálogo local cada cierto intervalo hasta que se cancele la tarea.
+
+        Args:
+            interval (int): Segundos entre recargas
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_snapshot()
+            except (UpstreamError, ValueError, OSError) as e:
+                print(f'No se pudo recargar el catálogo de Ghibli: {e}')
+
+    def cache_ttl(self, endpoint: str) -> int:
+        """Devuelve el tiempo de vida en caché configurado para un endpoint
+
+        Args:
+            endpoint (str): Nombre del endpoint
+
+        Returns:
+            int: TTL en segundos
+        """
+        return self.env.GHIBLI_CACHE_TTLS.get(endpoint, self.env.GHIBLI_CACHE_TTL)
+
+    @staticmethod
+    def cache_key(endpoint: str, limit: int | None, endpoint_id: str | None) -> tuple:
+        """Construye la llave de caché normalizando el límite efectivo de la consulta
+
+        Args:
+            endpoint (str): Nombre del endpoint
+            limit (int | None): Cantidad de registros solicitados
+            endpoint_id (str | None): Identificador del recurso
+
+        Returns:
+            tuple: Llave (endpoint, endpoint_id, limit)
+        """
+        if endpoint_id:
+            return (endpoint, endpoint_id, None)
+        return (endpoint, None, limit or DEFAULT_LIMIT)
+
+    async def _load(
+        self,
+        key: tuple,
+        model: Type[T],
+        endpoint: str,
+        limit: int | None,
+        endpoint_id: str | None
+        ) -> List[T]:
+        """
+        Consulta la API y guarda en caché el resultado.
+        """
+        result = await self._fetch(model, endpoint, limit, endpoint_id)
+        entry = self.cache.set(
+            key, result, self.cache_ttl(endpoint), self.env.GHIBLI_CACHE_STALE_TTL)
+        entry.extras["loaded_at"] = time.time()
+        return result
+
+    async def _fetch(
+        self,
+        model: Type[T],
+        endpoint: str,
+        limit: int | None,
+        endpoint_id: str | None
+        ) -> List[T]:
+        """
+        Consulta la API de GHIBLI y valida la respuesta con el modelo indicado.
+
+        Raises:
+            UpstreamError: 404 si el recurso no existe, o el error de la política de resiliencia.
+        """
+        url = f"/{endpoint}"
         if endpoint_id:
             url = url + f"/{endpoint_id}"
         elif limit:
             url = url + f"?limit={limit}"
         else:
-            url = url + "?limit=50"
+            url = url + f"?limit={DEFAULT_LIMIT}"
 
-        try:
-            async with AsyncClient() as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
-                if isinstance(data, list):
-                    return[model(**item) for item in data]
-                else:
-                    return [model(**data)]
-
-        except HTTPStatusError as e:
-            # Manejar errores de status HTTP
-            return {"error": f"HTTP status error: {e.response.status_code}"}
-        except RequestError as e:
-            # Manejar errores de solicitud
-            return {"error": f"Request error: {str(e)}"}
+        response = await self.guard.call(lambda: self.client.get(url))
+        if response.status_code == 404:
+            raise UpstreamError(404, "No encontrado")
+        if response.is_error:
+            raise UpstreamError(502, f"HTTP status error: {response.status_code}")
+        data = response.json()
+        if isinstance(data, list):
+            return[model(**item) for item in data]
+        else:
+            return [model(**data)]
+
+
+def _comparable(value: Any) -> float | str:
+    """
+    Convierte a número los valores numéricos para compararlos como tales.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _matches(item: Any, rule: GhibliFilterSchema) -> bool:
+    """
+    Evalúa si un objeto cumple una condición de filtrado.
+    """
+    value = getattr(item, rule.field)
+    if isinstance(value, list):
+        # En los campos de tipo lista la igualdad se interpreta como pertenencia
+        if rule.operator in ("==", "!="):
+            return (rule.value in value) == (rule.operator == "==")
+        return False
+    if value is None:
+        return rule.operator == "!="
+    left, right = _comparable(value), _comparable(rule.value)
+    if type(left) is not type(right):
+        left, right = str(value), rule.value
+    return OPERATORS[rule.operator](left, right)
+
+
+def _as_list(value: Any) -> List[Any]:
+    """
+    Normaliza un campo de referencia, que puede ser una URL o una lista de URLs.
+    """
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _parse_reference(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Obtiene la colección y el ID de una URL de Ghibli. Las URLs que apuntan a la raíz
+    de una colección no identifican un recurso y se ignoran.
+    """
+    if not isinstance(url, str):
+        return None
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if len(segments) != 2 or segments[0] not in ENDPOINT_MODELS:
+        return None
+    return segments[0], segments[1]
+
+
+def _embed(url: Any, resolved: Dict[str, Any]) -> Any:
+    """
+    Devuelve el objeto resuelto para una URL, o la URL original si no se pudo resolver.
+    """
+    item = resolved.get(url) if isinstance(url, str) else None
+    return item.model_dump() if item is not None else url
+
+
+def _sort_key(value: Any) -> tuple:
+    """
+    Ordena primero los valores numéricos, luego los textuales y al final los nulos.
+    """
+    if value is None:
+        return (2, "")
+    comparable = _comparable(value)
+    return (0, comparable) if isinstance(comparable, float) else (1, comparable)
+
+
+def estimate_size(value: list) -> int:
+    """Estima la memoria ocupada por una lista de modelos Pydantic según su tamaño serializado
+
+    Args:
+        value (list): Lista de modelos almacenada en caché
+
+    Returns:
+        int: Tamaño aproximado en bytes
+    """
+    return sum(len(item.model_dump_json()) for item in value)
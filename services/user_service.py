@@ -1,37 +1,70 @@
 """
  Módulo que define los servicios del usuario
 """
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+import asyncio
+import csv
+import io
 from fastapi import Depends
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import iterate_in_threadpool
 
-from infrastructure.security.authtentication import get_password_hash
+from infrastructure.data_base import maybe_await
+from infrastructure.pagination import decode_cursor, encode_cursor
+from infrastructure.record_stream import InvalidRecord
+from infrastructure.security.authtentication import get_password_hash_async
 from models.UserModel import User
+from repositories.async_user_repository import AsyncUserRepository
+from repositories.role_registry import RoleRegistry, get_role_registry
 from repositories.user_repository import UserRepository
+from repositories.user_repository_provider import (
+    UserRepositoryImplementation,
+    open_user_repository
+)
 from schemas.user_schema import (
+    RoleSchema,
+    UserBulkChangeResultSchema,
+    UserBulkResultSchema,
+    UserBulkRowSchema,
+    UserBulkSelectionSchema,
+    UserBulkUpdateRequestSchema,
     UserCreateRequestSchema,
     UserQuerySchema,
     UserSchema,
     UserUpdateRequestSchema)
 
+EXPORT_CSV_COLUMNS = ["id", "username", "email", "role_id", "role"]
+# Filas acumuladas antes de enviar un fragmento de la exportación
+EXPORT_FLUSH_ROWS = 100
+
 class UserService:
     """
         Servicios del usuario
     """
-    user_repository: UserRepository
+    user_repository: AsyncUserRepository | UserRepository
+    role_registry: RoleRegistry
 
     def __init__(
-        self, user_repository: UserRepository = Depends()
+        self,
+        user_repository: AsyncUserRepository | UserRepository = Depends(
+            UserRepositoryImplementation),
+        role_registry: RoleRegistry = Depends(get_role_registry)
     ) -> None:
         """
         Constructor de la clase UserService.
 
         Args:
-            userRepository (UserRepository, optional): 
-                Repositorio de usuarios. Defaults to Depends().
+            userRepository (AsyncUserRepository | UserRepository, optional):
+                Repositorio de usuarios según DATABASE_ASYNC.
+                Defaults to Depends(UserRepositoryImplementation).
+            role_registry (RoleRegistry, optional): Registro de roles en memoria.
+                Defaults to Depends(get_role_registry).
         """
         self.user_repository = user_repository
+        self.role_registry = role_registry
 
-    def create(self, instance: UserCreateRequestSchema) -> UserSchema:
+    async def create(self, instance: UserCreateRequestSchema) -> UserSchema:
         """
         Crea un nuevo usuario.
 
@@ -44,15 +77,183 @@ class UserService:
         role_name = instance.role_name
         del instance.role_name
         user = User(**instance.model_dump())
-        user.role = self.user_repository.get_rol(role_name)
-        user.password = get_password_hash(user.password)
-        return self.user_repository.create(user)
+        role = await self.get_role(role_name)
+        user.role_id = role.id if role else None
+        user.password = await get_password_hash_async(user.password)
+        return await maybe_await(self.user_repository.create(user))
+
+    async def bulk_create(
+        self,
+        records: AsyncIterator[Union[Dict[str, str], InvalidRecord]],
+        batch_size: int
+        ) -> UserBulkResultSchema:
+        """
+        Crea usuarios de forma masiva. Las filas se validan a medida que llegan y se
+        insertan por lotes: las contraseñas de cada lote se cifran en paralelo en el pool de
+        cifrado y el lote se inserta con una única sentencia y un único commit.
+
+        Los registros que no pudieron interpretarse se informan como inválidos y se
+        continúa con los siguientes. Si el flujo falla después de haber leído filas, los
+        lotes ya insertados se conservan y el error se informa en la fila siguiente. Un
+        usuario o correo repetido dentro de un lote se informa como conflicto, y si el
+        lote no puede insertarse cada una de sus filas se informa como error.
+
+        Args:
+            records (AsyncIterator[Union[Dict[str, str], InvalidRecord]]): Registros con los
+                datos de cada usuario.
+            batch_size (int): Cantidad de usuarios insertados por sentencia.
+
+        Raises:
+            ValueError: Si el cuerpo no puede leerse antes de procesar la primera fila.
 
-    def list(
+        Returns:
+            UserBulkResultSchema: Resultado de cada fila, numeradas desde 1.
+        """
+        result = UserBulkResultSchema()
+        batch: List[Tuple[int, UserCreateRequestSchema]] = []
+        row = 0
+        async for record in _report_stream_error(records):
+            row += 1
+            if isinstance(record, InvalidRecord):
+                result.results.append(UserBulkRowSchema(
+                    row=row, status="invalid", detail=record.detail))
+                continue
+            try:
+                batch.append((row, UserCreateRequestSchema(**record)))
+            except ValidationError as exc:
+                result.results.append(UserBulkRowSchema(
+                    row=row, status="invalid", username=record.get("username"),
+                    detail=_validation_detail(exc)))
+            if len(batch) >= batch_size:
+                result.results.extend(await self._create_batch(batch))
+                batch = []
+        if batch:
+            result.results.extend(await self._create_batch(batch))
+
+        result.results.sort(key=lambda item: item.row)
+        result.created = sum(item.status == "created" for item in result.results)
+        result.failed = len(result.results) - result.created
+        return result
+
+    async def _create_batch(
+        self,
+        batch: List[Tuple[int, UserCreateRequestSchema]]
+        ) -> List[UserBulkRowSchema]:
+        results = []
+        valid: List[Tuple[int, UserCreateRequestSchema, RoleSchema]] = []
+        usernames, emails = set(), set()
+        for row, item in batch:
+            role = await self.get_role(item.role_name)
+            if role is None:
+                results.append(UserBulkRowSchema(
+                    row=row, status="invalid", username=item.username,
+                    detail=f"No existe el rol {item.role_name.value}"))
+            elif item.username in usernames or item.email in emails:
+                results.append(UserBulkRowSchema(
+                    row=row, status="conflict", username=item.username,
+                    detail="El nombre de usuario o el correo se repiten en la carga"))
+            else:
+                usernames.add(item.username)
+                emails.add(item.email)
+                valid.append((row, item, role))
+
+        passwords = await asyncio.gather(
+            *(get_password_hash_async(item.password) for _, item, _ in valid),
+            return_exceptions=True)
+        pending: List[Tuple[int, UserCreateRequestSchema, RoleSchema, str]] = []
+        for (row, item, role), password in zip(valid, passwords):
+            if isinstance(password, ValueError):
+                results.append(UserBulkRowSchema(
+                    row=row, status="invalid", username=item.username, detail=str(password)))
+            elif isinstance(password, BaseException):
+                raise password
+            else:
+                pending.append((row, item, role, password))
+        if not pending:
+            return results
+
+        rows = [
+            {
+                "username": item.username,
+                "email": item.email,
+                "password": password,
+                "role_id": role.id,
+            }
+            for _, item, role, password in pending
+        ]
+        try:
+            inserted = {
+                username: user_id
+                for user_id, username in await maybe_await(self.user_repository.bulk_create(rows))
+            }
+        except SQLAlchemyError as exc:
+            print(f'No se pudo insertar el lote de usuarios: {exc!r}')
+            return results + [
+                UserBulkRowSchema(
+                    row=row, status="error", username=item.username,
+                    detail="No se pudo insertar el lote")
+                for row, item, _, _ in pending]
+        for row, item, _, _ in pending:
+            user_id = inserted.get(item.username)
+            if user_id is None:
+                results.append(UserBulkRowSchema(
+                    row=row, status="conflict", username=item.username,
+                    detail="El nombre de usuario o el correo ya existen"))
+            else:
+                results.append(UserBulkRowSchema(
+                    row=row, status="created", id=user_id, username=item.username))
+        return results
+
+    async def bulk_update(self, request: UserBulkUpdateRequestSchema) -> UserBulkChangeResultSchema:
+        """
+        Reasigna el rol de los usuarios seleccionados con sentencias UPDATE por conjunto.
+
+        Args:
+            request (UserBulkUpdateRequestSchema): Usuarios seleccionados y rol a asignar.
+
+        Raises:
+            ValueError: Si no se seleccionan usuarios, no se indica el rol o este no existe.
+
+        Returns:
+            UserBulkChangeResultSchema: IDs de los usuarios actualizados.
+        """
+        _check_selection(request)
+        role_id = request.role_id
+        if request.role_name:
+            role = await self.get_role(request.role_name)
+            if role is None:
+                raise ValueError(f"No existe el rol {request.role_name.value}")
+            role_id = role.id
+        if role_id is None:
+            raise ValueError("Debe indicar role_name o role_id")
+        ids = await maybe_await(self.user_repository.bulk_update(
+            request.ids, request.filters, {"role_id": role_id}, request.chunk_size))
+        return UserBulkChangeResultSchema(count=len(ids), ids=ids)
+
+    async def bulk_delete(self, request: UserBulkSelectionSchema) -> UserBulkChangeResultSchema:
+        """
+        Elimina los usuarios seleccionados con sentencias DELETE por conjunto.
+
+        Args:
+            request (UserBulkSelectionSchema): Usuarios seleccionados.
+
+        Raises:
+            ValueError: Si no se seleccionan usuarios.
+
+        Returns:
+            UserBulkChangeResultSchema: IDs de los usuarios eliminados.
+        """
+        _check_selection(request)
+        ids = await maybe_await(self.user_repository.bulk_delete(
+            request.ids, request.filters, request.chunk_size))
+        return UserBulkChangeResultSchema(count=len(ids), ids=ids)
+
+    async def list(
         self,
         query_params: Optional[UserQuerySchema],
         limit: Optional[int],
-        start: Optional[int]
+        start: Optional[int],
+        cursor: Optional[str] = None
         ) -> List[UserSchema]:
         """
         Obtiene una lista de usuarios con filtros opcionales.
@@ -61,13 +262,75 @@ class UserService:
             query_params (UserQuerySchema, optional): Parámetros de consulta. Defaults to None.
             limit (int, optional): Límite de resultados. Defaults to None.
             start (int, optional): Índice de inicio. Defaults to None.
+            cursor (str, optional): Cursor de la página anterior, reemplaza a start.
+                Defaults to None.
+
+        Raises:
+            ValueError: Si el cursor no es válido.
 
         Returns:
             List[UserSchema]: Lista de usuarios que coinciden con los filtros.
         """
-        return self.user_repository.list(query_params, limit, start)
+        after_id = decode_cursor(cursor) if cursor else None
+        return await maybe_await(
+            self.user_repository.list(query_params, limit, start, after_id))
+
+    @staticmethod
+    def next_cursor(users: List[User], limit: Optional[int]) -> Optional[str]:
+        """Devuelve el cursor de la página siguiente cuando la página actual está completa.
 
-    def get(self, user_id: int) -> User:
+        Args:
+            users (List[User]): Usuarios de la página actual, ordenados por ID.
+            limit (Optional[int]): Límite de resultados solicitado.
+
+        Returns:
+            Optional[str]: Cursor de la página siguiente o None si no hay más resultados.
+        """
+        if not limit or len(users) < limit:
+            return None
+        return encode_cursor(users[-1].id)
+
+    async def export(
+        self,
+        query_params: Optional[UserQuerySchema],
+        export_format: Literal["ndjson", "csv"],
+        batch_size: int
+        ) -> AsyncIterator[str]:
+        """
+        Exporta los usuarios como NDJSON o CSV a medida que se leen de la base de datos.
+
+        La exportación usa una sesión propia porque continúa después de que FastAPI
+        libera las dependencias de la petición.
+
+        Args:
+            query_params (UserQuerySchema, optional): Parámetros de consulta.
+            export_format (Literal["ndjson", "csv"]): Formato de salida.
+            batch_size (int): Filas leídas por cada viaje a la base de datos.
+
+        Yields:
+            str: Fragmentos de la exportación, de hasta EXPORT_FLUSH_ROWS filas.
+        """
+        async with open_user_repository() as repository:
+            users = repository.stream(query_params, batch_size)
+            if not hasattr(users, "__aiter__"):
+                # El repositorio síncrono bloquea mientras lee, se recorre en el threadpool
+                users = iterate_in_threadpool(users)
+            lines = [_csv_line(EXPORT_CSV_COLUMNS)] if export_format == "csv" else []
+            async for user in users:
+                role = user.role.name if user.role else None
+                if export_format == "csv":
+                    lines.append(_csv_line(
+                        [user.id, user.username, user.email, user.role_id, role]))
+                else:
+                    lines.append(UserSchema.model_validate(
+                        user, from_attributes=True).model_dump_json() + "\n")
+                if len(lines) >= EXPORT_FLUSH_ROWS:
+                    yield "".join(lines)
+                    lines = []
+            if lines:
+                yield "".join(lines)
+
+    async def get(self, user_id: int) -> User:
         """
         Obtiene un usuario por su ID.
 
@@ -77,18 +340,18 @@ class UserService:
         Returns:
             User: El usuario encontrado.
         """
-        return self.user_repository.get(user_id)
+        return await maybe_await(self.user_repository.get(user_id))
 
-    def delete(self, user_id: int) -> None:
+    async def delete(self, user_id: int) -> None:
         """
         Elimina un usuario por su ID.
 
         Args:
             id (int): ID del usuario a eliminar.
         """
-        return self.user_repository.delete(user_id)
+        return await maybe_await(self.user_repository.delete(user_id))
 
-    def update(self, user_id: int, instance: UserUpdateRequestSchema) -> UserSchema:
+    async def update(self, user_id: int, instance: UserUpdateRequestSchema) -> UserSchema:
         """
         Actualiza un usuario existente.
 
@@ -102,9 +365,68 @@ class UserService:
         # user = instance.model_dump()
         # user.id = user_id
         if instance.role_name:
-            role = self.user_repository.get_rol(instance.role_name)
+            role = await self.get_role(instance.role_name)
             if role:
                 instance.role_id = role.id
         if instance.password:
-            instance.password = get_password_hash(instance.password)
-        return self.user_repository.update(user_id, instance.model_dump())
+            instance.password = await get_password_hash_async(instance.password)
+        return await maybe_await(self.user_repository.update(user_id, instance.model_dump()))
+
+    async def reload_roles(self) -> List[RoleSchema]:
+        """Descarta el registro de roles en memoria y lo vuelve a cargar desde la base de
+        datos, para que los cambios en los roles se vean sin reiniciar la aplicación.
+
+        Returns:
+            List[RoleSchema]: Roles cargados
+        """
+        self.role_registry.invalidate()
+        self.role_registry.load(await maybe_await(self.user_repository.list_roles()))
+        return list(self.role_registry.by_name.values())
+
+    async def get_role(self, role_name: str) -> Optional[RoleSchema]:
+        """Obtiene un rol del registro en memoria, recargándolo si fue invalidado.
+
+        Args:
+            role_name (str): Nombre del rol
+
+        Returns:
+            Optional[RoleSchema]: El rol o None si no existe
+        """
+        if not self.role_registry.loaded:
+            self.role_registry.load(await maybe_await(self.user_repository.list_roles()))
+        return self.role_registry.get_by_name(role_name)
+
+
+def _check_selection(request: UserBulkSelectionSchema) -> None:
+    if request.is_empty():
+        raise ValueError("Debe indicar ids o filtros para seleccionar los usuarios")
+
+
+async def _report_stream_error(
+    records: AsyncIterator[Union[Dict[str, str], InvalidRecord]]
+    ) -> AsyncIterator[Union[Dict[str, str], InvalidRecord]]:
+    """
+    Entrega los registros y, si la lectura falla después del primero, informa el error como
+    un registro inválido final en lugar de propagarlo.
+    """
+    read = False
+    try:
+        async for record in records:
+            read = True
+            yield record
+    except ValueError as exc:
+        if not read:
+            raise
+        yield InvalidRecord(str(exc))
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors())
+
+
+def _csv_line(values: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
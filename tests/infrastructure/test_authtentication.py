@@ -0,0 +1,86 @@
+""" Módulo de pruebas para el cifrado de contraseñas
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from jose import JWTError, jwt
+import pytest
+
+from infrastructure.security.authtentication import (
+    create_access_token,
+    decode_access_token,
+    env,
+    get_password_hash_async,
+    token_cache,
+    verify_password,
+    verify_password_async
+)
+
+
+def test_async_hash_and_verify_roundtrip():
+    """
+    Prueba que el cifrado y la verificación en el pool son compatibles con la versión síncrona.
+    """
+    async def scenario():
+        hashed = await get_password_hash_async("P@ssw0rd")
+        return hashed, await verify_password_async("P@ssw0rd", hashed), \
+            await verify_password_async("wrong", hashed)
+
+    hashed, valid, invalid = asyncio.run(scenario())
+
+    assert verify_password("P@ssw0rd", hashed)
+    assert valid
+    assert not invalid
+
+
+def test_hashing_does_not_block_event_loop():
+    """
+    Prueba que el event loop sigue atendiendo otras tareas mientras se cifra una contraseña.
+    """
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*[get_password_hash_async("P@ssw0rd") for _ in range(4)])
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) > 10
+
+
+def test_decode_access_token_caches_verified_claims():
+    """
+    Prueba que un token verificado se sirve desde la caché en las peticiones siguientes, y
+    que cada llamada recibe una copia que no modifica la caché.
+    """
+    token = create_access_token({"sub": "admin", "role": "admin"})
+    hits = token_cache.hits
+
+    first = decode_access_token(token)
+    first["role"] = "films"
+    second = decode_access_token(token)
+    second["sub"] = "jane"
+    third = decode_access_token(token)
+
+    assert (third["sub"], third["role"]) == ("admin", "admin")
+    assert third is not second
+    assert token_cache.hits == hits + 2
+
+
+def test_decode_access_token_rejects_expired_tokens():
+    """
+    Prueba que los tokens expirados no se guardan en caché y se rechazan.
+    """
+    expired = jwt.encode(
+        {"sub": "admin", "role": "admin", "exp": datetime.now(timezone.utc) - timedelta(seconds=1)},
+        env.SECRET_KEY, algorithm=env.ALGORITHM)
+    entries = len(token_cache)
+
+    with pytest.raises(JWTError):
+        decode_access_token(expired)
+    assert len(token_cache) == entries
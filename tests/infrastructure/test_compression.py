@@ -0,0 +1,139 @@
+""" Módulo de pruebas para la compresión de respuestas
+"""
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from infrastructure.compression import compress, encoded_body, negotiate_encoding
+from infrastructure.middlewares.compression_middleware import CompressionMiddleware
+
+LARGE_BODY = "ghibli " * 500
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/large")
+async def large():
+    return PlainTextResponse(LARGE_BODY)
+
+
+@app.get("/small")
+async def small():
+    return PlainTextResponse("ok")
+
+
+@app.get("/precompressed")
+async def precompressed():
+    return PlainTextResponse(
+        compress(LARGE_BODY.encode(), "gzip"), headers={"Content-Encoding": "gzip"})
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        for _ in range(5):
+            yield LARGE_BODY
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br" if negotiate_encoding("br") else "gzip"),
+])
+def test_negotiate_encoding(accept_encoding: str, expected: str):
+    """
+    Prueba la selección de la codificación según Accept-Encoding.
+    """
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_encoded_body_is_rendered_and_compressed_once():
+    """
+    Prueba que el cuerpo y su versión comprimida se generan una sola vez.
+    """
+    store: dict = {}
+    renders = []
+
+    def render() -> bytes:
+        renders.append(1)
+        return LARGE_BODY.encode()
+
+    body, encoding, added = encoded_body(store, render, "gzip")
+    again, _, added_again = encoded_body(store, render, "gzip")
+    plain, plain_encoding, _ = encoded_body(store, render, None)
+
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == LARGE_BODY.encode()
+    assert again is body
+    assert added == len(LARGE_BODY) + len(body)
+    assert added_again == 0
+    assert plain_encoding is None and plain == LARGE_BODY.encode()
+    assert len(renders) == 1
+
+
+def test_encoded_body_skips_small_bodies():
+    """
+    Prueba que los cuerpos menores al umbral no se comprimen.
+    """
+    store: dict = {}
+    body, encoding, _ = encoded_body(store, lambda: b"[]", "gzip")
+
+    assert (body, encoding) == (b"[]", None)
+    assert "gzip" not in store
+
+
+def test_middleware_compresses_large_responses():
+    """
+    Prueba que las respuestas grandes se comprimen y se ajusta su Content-Length.
+    """
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(LARGE_BODY)
+    assert response.text == LARGE_BODY
+
+
+def test_middleware_skips_small_and_unaccepted_responses():
+    """
+    Prueba que no se comprimen las respuestas pequeñas ni las de clientes sin soporte.
+    """
+    small_response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    identity_response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small_response.headers
+    assert small_response.text == "ok"
+    assert "content-encoding" not in identity_response.headers
+    assert identity_response.text == LARGE_BODY
+
+
+def test_middleware_keeps_precompressed_responses():
+    """
+    Prueba que las respuestas que ya incluyen Content-Encoding no se comprimen otra vez.
+    """
+    response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == LARGE_BODY
+
+
+def test_middleware_compresses_streaming_responses():
+    """
+    Prueba que las respuestas en streaming se comprimen por fragmentos.
+    """
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == LARGE_BODY * 5
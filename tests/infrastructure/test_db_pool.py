@@ -0,0 +1,46 @@
+""" Módulo de pruebas para los pools de conexiones instrumentados
+"""
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from infrastructure.db_pool import MeasuredQueuePool, PoolMetrics, pool_stats
+
+
+@pytest.fixture
+def engine(monkeypatch: pytest.MonkeyPatch):
+    """
+    Engine con un pool de una sola conexión y métricas limpias.
+    """
+    monkeypatch.setattr(MeasuredQueuePool, "metrics", PoolMetrics())
+    engine = create_engine(
+        "sqlite://", creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        poolclass=MeasuredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_stats_report_checked_out_connections(engine):
+    """
+    Las estadísticas reflejan las conexiones en uso y los checkouts realizados.
+    """
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 1
+        assert stats["checkouts"] == 1
+
+    assert pool_stats(engine)["checked_out"] == 0
+
+
+def test_pool_timeout_is_counted(engine):
+    """
+    Agotar el pool registra el timeout y el tiempo esperado.
+    """
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["timeouts"] == 1
+    assert stats["wait_max_ms"] >= 10
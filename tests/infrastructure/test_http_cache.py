@@ -0,0 +1,103 @@
+""" Módulo de pruebas para la validación condicional de respuestas
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from infrastructure.http_cache import (
+    compute_etag,
+    conditional_response,
+    encoded_etag,
+    http_date,
+    matching_etag
+)
+from infrastructure.middlewares.compression_middleware import CompressionMiddleware
+
+BODY = "totoro " * 500
+LAST_MODIFIED = 1_700_000_000.0
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/resource")
+async def resource(request: Request):
+    return conditional_response(
+        request, PlainTextResponse(BODY), "private, max-age=60", LAST_MODIFIED)
+
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, None),
+    ('"other"', None),
+    ('"abc"', '"abc"'),
+    ('W/"abc"', 'W/"abc"'),
+    ('"other", "abc-gzip"', '"abc-gzip"'),
+    ("*", '"abc"'),
+])
+def test_matching_etag(if_none_match: str, expected: str):
+    """
+    Prueba la comparación débil de ETags, sin considerar la codificación.
+    """
+    assert matching_etag(if_none_match, '"abc"') == expected
+
+
+def test_etag_depends_on_content_and_encoding():
+    """
+    Prueba que el ETag cambia con el contenido y con la codificación.
+    """
+    etag = compute_etag(b"a")
+
+    assert etag == compute_etag(b"a")
+    assert etag != compute_etag(b"b")
+    assert encoded_etag(etag, "gzip") == etag[:-1] + '-gzip"'
+    assert encoded_etag('W/"abc"', "gzip") == 'W/"abc"'
+
+
+def test_response_includes_validators():
+    """
+    Prueba que la respuesta completa incluye ETag, Last-Modified y Cache-Control.
+    """
+    response = client.get("/resource", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == compute_etag(BODY.encode())
+    assert response.headers["last-modified"] == http_date(LAST_MODIFIED)
+    assert response.headers["cache-control"] == "private, max-age=60"
+
+
+def test_if_none_match_returns_not_modified():
+    """
+    Prueba que un ETag vigente, incluso el de la versión comprimida, responde 304 sin cuerpo.
+    """
+    compressed = client.get("/resource", headers={"Accept-Encoding": "gzip"})
+    etag = compressed.headers["etag"]
+
+    response = client.get(
+        "/resource", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    changed = client.get("/resource", headers={"If-None-Match": '"stale"'})
+
+    assert etag.endswith('-gzip"')
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert changed.status_code == 200
+
+
+def test_if_modified_since_is_used_without_etag():
+    """
+    Prueba que If-Modified-Since solo se evalúa cuando no se envía If-None-Match.
+    """
+    not_modified = client.get(
+        "/resource", headers={"If-Modified-Since": http_date(LAST_MODIFIED)})
+    modified = client.get(
+        "/resource", headers={"If-Modified-Since": http_date(LAST_MODIFIED - 60)})
+    etag_wins = client.get("/resource", headers={
+        "If-Modified-Since": http_date(LAST_MODIFIED), "If-None-Match": '"stale"'})
+
+    assert not_modified.status_code == 304
+    assert modified.status_code == 200
+    assert etag_wins.status_code == 200
@@ -0,0 +1,46 @@
+""" Módulo de pruebas para la paginación por cursor
+"""
+import pytest
+
+from infrastructure.pagination import decode_cursor, encode_cursor
+from models.UserModel import User
+from repositories.user_repository import build_list_statement
+from services.user_service import UserService
+
+
+def test_cursor_round_trip():
+    """
+    El cursor es opaco y devuelve el ID con el que se generó.
+    """
+    cursor = encode_cursor(42)
+    assert "42" not in cursor
+    assert decode_cursor(cursor) == 42
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("42"), "e30"])
+def test_invalid_cursor_raises_value_error(cursor: str):
+    """
+    Un cursor manipulado se rechaza con ValueError.
+    """
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_statement_replaces_offset():
+    """
+    Con cursor la consulta filtra por ID en lugar de usar OFFSET.
+    """
+    sql = str(build_list_statement(None, limit=10, start=500, after_id=7))
+    assert "users.id >" in sql
+    assert "OFFSET" not in sql
+    assert "ORDER BY users.id" in sql
+
+
+def test_next_cursor_only_for_full_pages():
+    """
+    Solo se devuelve cursor cuando la página está completa.
+    """
+    users = [User(id=1), User(id=2)]
+    assert decode_cursor(UserService.next_cursor(users, limit=2)) == 2
+    assert UserService.next_cursor(users, limit=3) is None
+    assert UserService.next_cursor(users, limit=None) is None
@@ -0,0 +1,225 @@
+""" Módulo de pruebas para el limitador de intentos de inicio de sesión
+"""
+import asyncio
+from typing import Dict, List, Tuple
+import pytest
+
+from infrastructure.security.rate_limiter import (
+    InMemoryRateLimitStorage,
+    LoginRateLimiter,
+    RateLimitExceeded,
+    SlidingWindowRateLimiter
+)
+
+
+class FakeClock:
+    """
+    Reloj manual para controlar la ventana deslizante.
+    """
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePipeline:
+    """
+    Pipeline transaccional simulado: los comandos se encolan y execute los aplica sin
+    ceder el control, como MULTI/EXEC en Redis.
+    """
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.queued: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, command: str):
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self.queued.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        await asyncio.sleep(0)
+        self.redis.commands.append("MULTI")
+        self.redis.in_transaction = True
+        try:
+            return [await getattr(self.redis, command)(*args, **kwargs)
+                    for command, args, kwargs in self.queued]
+        finally:
+            self.redis.in_transaction = False
+            self.redis.commands.append("EXEC")
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.queued = []
+
+
+class FakeRedis:
+    """
+    Cliente Redis simulado con los comandos que usa el limitador y los mismos tipos de
+    retorno que redis.asyncio (los miembros se devuelven como bytes). Los comandos fuera
+    de un pipeline ceden el control, como lo hace la red.
+    """
+    def __init__(self) -> None:
+        self.sets: Dict[str, Dict[bytes, float]] = {}
+        self.ttls: Dict[str, int] = {}
+        self.commands: List[str] = []
+        self.in_transaction = False
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def roundtrip(self) -> None:
+        """
+        Cede el control como una llamada por red, salvo dentro de MULTI/EXEC.
+        """
+        if not self.in_transaction:
+            await asyncio.sleep(0)
+
+    async def zadd(self, name: str, mapping: Dict[str, float]) -> int:
+        await self.roundtrip()
+        self.commands.append("ZADD")
+        members = self.sets.setdefault(name, {})
+        members.update({member.encode(): score for member, score in mapping.items()})
+        return len(mapping)
+
+    async def zrem(self, name: str, *members: str) -> int:
+        await self.roundtrip()
+        self.commands.append("ZREM")
+        current = self.sets.get(name, {})
+        return sum(current.pop(member.encode(), None) is not None for member in members)
+
+    async def zremrangebyscore(self, name: str, min_score: float, max_score: float) -> int:
+        await self.roundtrip()
+        self.commands.append("ZREMRANGEBYSCORE")
+        members = self.sets.get(name, {})
+        removed = [member for member, score in members.items() if min_score <= score <= max_score]
+        for member in removed:
+            del members[member]
+        return len(removed)
+
+    async def zcard(self, name: str) -> int:
+        await self.roundtrip()
+        self.commands.append("ZCARD")
+        return len(self.sets.get(name, {}))
+
+    async def zrange(
+        self, name: str, start: int, end: int, withscores: bool = False
+        ) -> List[Tuple[bytes, float]]:
+        await self.roundtrip()
+        self.commands.append("ZRANGE")
+        ordered = sorted(self.sets.get(name, {}).items(), key=lambda item: item[1])
+        return ordered[start:end + 1]
+
+    async def expire(self, name: str, seconds: int) -> bool:
+        await self.roundtrip()
+        self.commands.append("EXPIRE")
+        self.ttls[name] = seconds
+        return True
+
+    async def delete(self, *names: str) -> int:
+        await self.roundtrip()
+        self.commands.append("DEL")
+        return sum(self.sets.pop(name, None) is not None for name in names)
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    """
+    Fixture que crea un reloj controlable.
+    """
+    return FakeClock()
+
+
+@pytest.mark.parametrize("storage_type", ["memory", "redis"])
+def test_sliding_window_limits_attempts(clock: FakeClock, storage_type: str):
+    """
+    Prueba que la ventana deslizante admite el límite de intentos y libera cada intento
+    cuando sale de la ventana, con el almacenamiento en memoria y con Redis.
+    """
+    storage = InMemoryRateLimitStorage(clock=clock) if storage_type == "memory" else FakeRedis()
+    limiter = SlidingWindowRateLimiter(storage, limit=2, window=60, clock=clock)
+
+    async def scenario():
+        await limiter.hit("jane")
+        clock.now += 10
+        await limiter.hit("jane")
+        _, blocked = await limiter.hit("jane")
+        clock.now += 50
+        _, released = await limiter.hit("jane")
+        return blocked, released
+
+    blocked, released = asyncio.run(scenario())
+
+    assert blocked == 50
+    assert released == 0
+
+
+def test_concurrent_attempts_cannot_exceed_limit(clock: FakeClock):
+    """
+    Prueba que los intentos concurrentes sobre Redis no superan el límite, porque el
+    registro y el conteo se ejecutan en la misma transacción.
+    """
+    storage = FakeRedis()
+    login_limiter = LoginRateLimiter(
+        by_username=SlidingWindowRateLimiter(storage, 2, 60, "login:username", clock),
+        by_ip=SlidingWindowRateLimiter(storage, 10, 60, "login:ip", clock))
+
+    async def scenario():
+        return await asyncio.gather(
+            *[login_limiter.acquire("jane", "10.0.0.1") for _ in range(5)],
+            return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert len([result for result in results if isinstance(result, list)]) == 2
+    assert login_limiter.stats() == {"rejected": 3}
+    assert len(storage.sets["login:username:jane"]) == 2
+    assert len(storage.sets["login:ip:10.0.0.1"]) == 2
+
+
+def test_in_memory_storage_expires_keys(clock: FakeClock):
+    """
+    Prueba que las llaves expiradas se eliminan del almacenamiento en memoria.
+    """
+    storage = InMemoryRateLimitStorage(clock=clock)
+    limiter = SlidingWindowRateLimiter(storage, limit=1, window=60, clock=clock)
+
+    asyncio.run(limiter.hit("jane"))
+    clock.now += 61
+    asyncio.run(limiter.hit("john"))
+
+    assert len(storage) == 1
+
+
+def test_login_limiter_by_username_and_ip(clock: FakeClock):
+    """
+    Prueba que se limita por usuario y por IP, y que un inicio exitoso libera los intentos
+    del usuario y no cuenta para la IP, que conserva los intentos fallidos.
+    """
+    storage = FakeRedis()
+    login_limiter = LoginRateLimiter(
+        by_username=SlidingWindowRateLimiter(storage, 2, 60, "login:username", clock),
+        by_ip=SlidingWindowRateLimiter(storage, 3, 60, "login:ip", clock))
+
+    async def scenario():
+        await login_limiter.acquire("Jane", "10.0.0.1")
+        jane = await login_limiter.acquire("jane", "10.0.0.1")
+        with pytest.raises(RateLimitExceeded):
+            await login_limiter.acquire("JANE", "10.0.0.2")
+        await login_limiter.succeeded(jane)
+        for _ in range(5):
+            await login_limiter.succeeded(await login_limiter.acquire("john", "10.0.0.1"))
+        await login_limiter.acquire("jane", "10.0.0.1")
+        await login_limiter.acquire("jane", "10.0.0.1")
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await login_limiter.acquire("john", "10.0.0.1")
+        return exc_info.value
+
+    error = asyncio.run(scenario())
+
+    assert error.retry_after == 60
+    assert login_limiter.stats() == {"rejected": 2}
+    assert storage.ttls["login:ip:10.0.0.1"] == 60
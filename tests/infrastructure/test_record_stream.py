@@ -0,0 +1,70 @@
+""" Módulo de pruebas para la lectura incremental de registros
+"""
+import asyncio
+import pytest
+
+from infrastructure.record_stream import (
+    CSV_CONTENT_TYPE,
+    InvalidRecord,
+    JSON_CONTENT_TYPE,
+    NDJSON_CONTENT_TYPE,
+    iter_records
+)
+
+
+def read(content_type: str, *chunks: bytes):
+    """
+    Lee todos los registros de los fragmentos indicados.
+    """
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [record async for record in iter_records(content_type, stream())]
+    return asyncio.run(collect())
+
+
+def test_ndjson_lines_split_across_chunks():
+    """
+    Las líneas y caracteres multibyte partidos entre fragmentos se reconstruyen.
+    """
+    body = '{"username": "josé"}\n\n{"username": "ana"}'.encode()
+    assert read(NDJSON_CONTENT_TYPE, body[:18], body[18:30], body[30:]) == [
+        {"username": "josé"}, {"username": "ana"}]
+
+
+def test_csv_uses_header_row():
+    """
+    La primera fila del CSV define los campos.
+    """
+    body = b'username,email\r\nana,"ana@example.com"\r\n'
+    assert read(CSV_CONTENT_TYPE, body) == [{"username": "ana", "email": "ana@example.com"}]
+
+
+@pytest.mark.parametrize("content_type, body", [
+    (JSON_CONTENT_TYPE, b'{"username": "ana"}'),
+    (JSON_CONTENT_TYPE, b'[{"username"'),
+])
+def test_malformed_body_raises_value_error(content_type: str, body: bytes):
+    """
+    Un cuerpo JSON mal formado se rechaza con ValueError antes de entregar registros.
+    """
+    with pytest.raises(ValueError):
+        read(content_type, body)
+
+
+@pytest.mark.parametrize("content_type, body", [
+    (NDJSON_CONTENT_TYPE, b'{"username": "ana"}\n[1]\n{"username": "eva"}'),
+    (NDJSON_CONTENT_TYPE, b'{"username": "ana"}\n{"username"\n{"username": "eva"}'),
+    (JSON_CONTENT_TYPE, b'[{"username": "ana"}, 1, {"username": "eva"}]'),
+])
+def test_malformed_record_is_reported_and_stream_continues(content_type: str, body: bytes):
+    """
+    Un registro mal formado se entrega como InvalidRecord y los siguientes se siguen leyendo.
+    """
+    records = read(content_type, body)
+
+    assert records[0] == {"username": "ana"}
+    assert isinstance(records[1], InvalidRecord)
+    assert records[2] == {"username": "eva"}
@@ -0,0 +1,138 @@
+""" Módulo de pruebas para las políticas de resiliencia
+"""
+import asyncio
+import httpx
+import pytest
+
+from infrastructure.resilience import CircuitBreaker, RetryBudget, UpstreamError, UpstreamGuard
+
+
+class FakeClock:
+    """
+    Reloj manual para controlar el tiempo de apertura del circuito.
+    """
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def responder(*status_codes: int):
+    """
+    Crea una función de envío que devuelve los códigos indicados en orden.
+    """
+    calls = []
+
+    async def send() -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(status_codes[min(len(calls), len(status_codes)) - 1])
+
+    return send, calls
+
+
+def test_breaker_opens_and_recovers_after_probe():
+    """
+    Prueba que el circuito se abre al superar la tasa de errores y se cierra tras una prueba exitosa.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=4, minimum_calls=4,
+                             open_seconds=10, clock=clock)
+    for _ in range(2):
+        breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guard_retries_transient_errors():
+    """
+    Prueba que los errores transitorios se reintentan y los definitivos no.
+    """
+    guard = UpstreamGuard(CircuitBreaker(), RetryBudget(), max_retries=2, backoff=0)
+    send, calls = responder(503, 200)
+    response = asyncio.run(guard.call(send))
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+    send, calls = responder(404)
+    response = asyncio.run(guard.call(send))
+    assert response.status_code == 404
+    assert len(calls) == 1
+
+
+def test_retry_budget_limits_retries():
+    """
+    Prueba que sin presupuesto disponible no se reintenta.
+    """
+    guard = UpstreamGuard(
+        CircuitBreaker(), RetryBudget(ratio=0, max_tokens=1), max_retries=3, backoff=0)
+    send, calls = responder(500)
+
+    with pytest.raises(UpstreamError) as error:
+        asyncio.run(guard.call(send))
+
+    assert error.value.status_code == 502
+    assert len(calls) == 2
+
+
+def test_guard_enforces_total_timeout_and_fails_fast_when_open():
+    """
+    Prueba el timeout total y que con el circuito abierto no se llama al servicio externo.
+    """
+    breaker = CircuitBreaker(minimum_calls=1, failure_rate=1)
+    guard = UpstreamGuard(breaker, RetryBudget(), max_retries=0, total_timeout=0.01)
+
+    async def slow() -> httpx.Response:
+        await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    with pytest.raises(UpstreamError) as timeout:
+        asyncio.run(guard.call(slow))
+    send, calls = responder(200)
+    with pytest.raises(UpstreamError) as rejected:
+        asyncio.run(guard.call(send))
+
+    assert timeout.value.status_code == 504
+    assert rejected.value.status_code == 503
+    assert calls == []
+
+
+def test_cancelled_probe_releases_half_open_circuit():
+    """
+    Prueba que si la llamada de prueba se cancela el circuito vuelve a abrirse y, pasado el
+    tiempo de apertura, admite una nueva prueba.
+    """
+    clock = FakeClock()
+    breaker = CircuitBreaker(minimum_calls=1, failure_rate=1, open_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    guard = UpstreamGuard(breaker, RetryBudget(), max_retries=0)
+
+    async def cancel_probe():
+        async def hang() -> httpx.Response:
+            await asyncio.sleep(1)
+            return httpx.Response(200)
+        probe = asyncio.create_task(guard.call(hang))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    asyncio.run(cancel_probe())
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 20
+    send, calls = responder(200)
+    response = asyncio.run(guard.call(send))
+    assert response.status_code == 200
+    assert len(calls) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,47 @@
+""" Módulo de pruebas para las respuestas JSON rápidas
+"""
+import json
+from typing import List
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from infrastructure import responses
+from infrastructure.responses import FastJSONResponse, model_response
+from models.UserModel import Role, User
+from schemas.user_schema import UserSchema
+
+
+def test_model_response_matches_default_serialization():
+    """
+    El volcado directo produce el mismo JSON que la serialización por defecto.
+    """
+    users = [User(id=1, username="ana", email="ana@example.com", role_id=1,
+                  role=Role(id=1, name="admin"))]
+
+    response = model_response(users, List[UserSchema], from_attributes=True,
+                              headers={"X-Next-Cursor": "abc"})
+
+    expected = jsonable_encoder(
+        [UserSchema.model_validate(user, from_attributes=True) for user in users])
+    assert json.loads(response.body) == expected
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
+
+
+def test_model_response_can_be_disabled(monkeypatch: pytest.MonkeyPatch):
+    """
+    Con FAST_JSON_RESPONSE deshabilitado se usa la serialización de FastAPI.
+    """
+    monkeypatch.setattr(responses.env, "FAST_JSON_RESPONSE", False)
+    response = model_response([{"id": 1, "name": "admin"}], List[dict])
+    assert isinstance(response, JSONResponse)
+    assert json.loads(response.body) == [{"id": 1, "name": "admin"}]
+
+
+def test_fast_json_response_renders_like_json_response():
+    """
+    FastJSONResponse produce el mismo documento que JSONResponse.
+    """
+    content = {"title": "天空の城ラピュタ", "scores": [95, 97.5], "director": None}
+    assert json.loads(FastJSONResponse(content).body) == json.loads(JSONResponse(content).body)
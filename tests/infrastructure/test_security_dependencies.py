@@ -0,0 +1,88 @@
+""" Módulo de pruebas para las dependencias de autenticación
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from infrastructure.security import dependencies
+from infrastructure.security.authtentication import create_access_token
+from infrastructure.security.dependencies import require_role
+from schemas.auth_schema import TokenDataSchema
+
+app = FastAPI()
+
+
+def films_count(principal: TokenDataSchema = Depends(require_role('films'))) -> str:
+    """
+    Dependencia adicional que también exige el rol, para verificar la caché por petición.
+    """
+    return principal.username
+
+
+@app.get("/films")
+async def films(
+    username: str = Depends(films_count),
+    principal: TokenDataSchema = Depends(require_role('films'))):
+    return {"username": username, "role": principal.role}
+
+
+client = TestClient(app)
+
+
+def auth_headers(role: str) -> dict:
+    """
+    Construye la cabecera Authorization con un token del rol indicado.
+    """
+    token = create_access_token({"sub": f"{role}_user", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize("role", ["films", "admin"])
+def test_allowed_roles_receive_principal(role: str):
+    """
+    Prueba que el rol requerido y el rol admin acceden y reciben los datos del token.
+    """
+    response = client.get("/films", headers=auth_headers(role))
+
+    assert response.status_code == 200
+    assert response.json() == {"username": f"{role}_user", "role": role}
+
+
+def test_other_roles_are_forbidden():
+    """
+    Prueba que otros roles reciben error 403.
+    """
+    response = client.get("/films", headers=auth_headers("people"))
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Permisos insuficientes"
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer invalid"}])
+def test_missing_or_invalid_token_is_unauthorized(headers: dict):
+    """
+    Prueba que sin token o con un token inválido se recibe error 401.
+    """
+    response = client.get("/films", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_token_is_decoded_once_per_request(monkeypatch: pytest.MonkeyPatch):
+    """
+    Prueba que el token se decodifica una sola vez aunque varias dependencias lo usen.
+    """
+    calls = []
+    decode = dependencies.decode_access_token
+
+    def counting_decode(token: str) -> dict:
+        calls.append(token)
+        return decode(token)
+
+    monkeypatch.setattr(dependencies, "decode_access_token", counting_decode)
+    response = client.get("/films", headers=auth_headers("films"))
+
+    assert response.status_code == 200
+    assert len(calls) == 1
+    assert require_role('films') is require_role('films')
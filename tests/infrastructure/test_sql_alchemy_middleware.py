@@ -0,0 +1,74 @@
+""" Módulo de pruebas para el middleware de excepciones de SQLAlchemy
+"""
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from infrastructure.middlewares.sql_alchemy_middleware import SQLAlchemyMiddleware
+
+app = FastAPI()
+app.add_middleware(SQLAlchemyMiddleware)
+
+
+@app.get("/integrity")
+async def integrity():
+    raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+
+@app.get("/value")
+async def value():
+    raise ValueError("bad value")
+
+
+@app.get("/not-found")
+async def not_found():
+    raise HTTPException(status_code=404, detail="User not found")
+
+
+class FailingResponse(Response):
+    """
+    Respuesta que falla después de enviar la cabecera, como un streaming interrumpido.
+    """
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        raise ValueError("after start")
+
+
+@app.get("/stream")
+async def stream():
+    return FailingResponse()
+
+
+client = TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("path, status_code, detail", [
+    ("/integrity", 409, "Error de integridad: duplicate key"),
+    ("/value", 500, "Error interno del servidor: bad value"),
+])
+def test_known_exceptions_are_mapped_to_json(path: str, status_code: int, detail: str):
+    """
+    Las excepciones conocidas se convierten en una respuesta JSON con su código.
+    """
+    response = client.get(path)
+    assert response.status_code == status_code
+    assert response.json() == {"detail": detail, "status_code": status_code}
+
+
+def test_http_exceptions_are_not_changed():
+    """
+    Las HTTPException siguen siendo gestionadas por FastAPI.
+    """
+    response = client.get("/not-found")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "User not found"}
+
+
+def test_errors_after_response_start_are_raised():
+    """
+    Si la respuesta ya comenzó no se puede enviar otra, por lo que se relanza el error.
+    """
+    with pytest.raises(ValueError):
+        TestClient(app).get("/stream")
@@ -0,0 +1,101 @@
+""" Módulo de pruebas para la caché TTL + LRU
+"""
+import pytest
+
+from infrastructure.cache.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """
+    Reloj manual para controlar la expiración en las pruebas.
+    """
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    """
+    Fixture que crea un reloj controlable.
+    """
+    return FakeClock()
+
+
+def test_get_returns_value_until_ttl_expires(clock: FakeClock):
+    """
+    Prueba que las entradas dejan de servirse al cumplirse su TTL.
+    """
+    cache = TTLCache(clock=clock)
+    cache.set("films", ["a"], ttl=10)
+
+    assert cache.get("films") == ["a"]
+    clock.now = 10
+    assert cache.get("films") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_entries(clock: FakeClock):
+    """
+    Prueba que se desaloja la entrada menos usada recientemente.
+    """
+    cache = TTLCache(max_entries=2, clock=clock)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.get("a")
+    cache.set("c", 3, ttl=10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_memory(clock: FakeClock):
+    """
+    Prueba que la caché respeta el límite de memoria estimada.
+    """
+    cache = TTLCache(max_bytes=10, sizeof=len, clock=clock)
+    cache.set("a", "x" * 6, ttl=10)
+    cache.set("b", "y" * 6, ttl=10)
+
+    assert len(cache) == 1
+    assert cache.get("b") == "y" * 6
+    assert cache.stats()["bytes"] == 6
+
+
+def test_stale_entries_within_window(clock: FakeClock):
+    """
+    Prueba que las entradas expiradas solo se sirven como obsoletas si se permite.
+    """
+    cache = TTLCache(clock=clock)
+    cache.set("films", ["a"], ttl=10, stale_ttl=5)
+    clock.now = 12
+
+    assert cache.get("films") is None
+    entry = cache.get_entry("films", allow_stale=True)
+    assert entry.value == ["a"]
+    assert not entry.is_fresh(clock.now)
+
+    clock.now = 15
+    assert cache.get_entry("films", allow_stale=True) is None
+    assert len(cache) == 0
+
+
+def test_peek_and_add_size(clock: FakeClock):
+    """
+    Prueba que peek no altera las estadísticas y que add_size cuenta en el límite de memoria.
+    """
+    cache = TTLCache(max_bytes=10, sizeof=len, clock=clock)
+    cache.set("a", "x" * 4, ttl=10)
+    cache.set("b", "y" * 4, ttl=10)
+
+    assert cache.peek("a").value == "x" * 4
+    assert cache.stats()["hits"] == 0
+    cache.add_size("b", 4)
+
+    assert cache.peek("a") is None
+    assert cache.stats()["bytes"] == 8
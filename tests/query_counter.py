@@ -0,0 +1,33 @@
+""" Utilidades para comprobar la cantidad de consultas SQL emitidas en las pruebas
+"""
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def assert_num_queries(engine: Engine, expected: int) -> Iterator[List[str]]:
+    """
+    Verifica que el bloque emita exactamente la cantidad de consultas indicada.
+
+    Args:
+        engine (Engine): Engine cuyas consultas se cuentan.
+        expected (int): Cantidad de consultas esperada.
+
+    Yields:
+        List[str]: Consultas emitidas hasta el momento.
+    """
+    statements: List[str] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert len(statements) == expected, (
+        f"Se esperaban {expected} consultas y se emitieron {len(statements)}:\n"
+        + "\n".join(statements))
@@ -0,0 +1,125 @@
+""" Módulo de pruebas para el repositorio asíncrono de user
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from models.UserModel import RefreshToken, User
+from infrastructure.data_base import AsyncDatabaseEngine, AsyncSessionLocal
+from infrastructure.security.authtentication import get_password_hash
+from repositories.async_user_repository import AsyncUserRepository
+from schemas.user_schema import UserQuerySchema
+
+
+def run_with_repository(scenario: Callable[[AsyncUserRepository], Awaitable[None]]) -> None:
+    """
+    Ejecuta el escenario con una sesión asíncrona propia. El pool se libera al final
+    porque cada prueba usa un event loop distinto.
+    """
+    async def run() -> None:
+        async with AsyncSessionLocal() as db:
+            await scenario(AsyncUserRepository(db=db))
+        await AsyncDatabaseEngine.dispose()
+    asyncio.run(run())
+
+
+async def create_user(user_repository: AsyncUserRepository, username: str) -> User:
+    """
+    Crea un usuario administrador para las pruebas.
+    """
+    new_user = User(
+        username=username,
+        email=f"{username}@example.com",
+        password=get_password_hash("Password"),
+        role=await user_repository.get_rol("admin"))
+    return await user_repository.create(new_user)
+
+
+def test_create_and_get_user():
+    """
+    Prueba la creación y obtención de un usuario con su rol cargado.
+    """
+    async def scenario(user_repository: AsyncUserRepository) -> None:
+        created_user = await create_user(user_repository, "async_jane")
+        assert created_user.id is not None
+
+        retrieved_user = await user_repository.get(created_user.id)
+        assert retrieved_user.username == "async_jane"
+        assert retrieved_user.role.name == "admin"
+
+        await user_repository.delete(created_user.id)
+    run_with_repository(scenario)
+
+
+def test_list_users_with_filters():
+    """
+    Prueba la obtención de una lista de usuarios con filtros.
+    """
+    async def scenario(user_repository: AsyncUserRepository) -> None:
+        created_user = await create_user(user_repository, "async_david")
+
+        query = UserQuerySchema()
+        query.username = "async_david"
+        users = await user_repository.list(query_params=query, limit=10, start=0)
+        assert len(users) == 1
+        assert users[0].role.name == "admin"
+
+        await user_repository.delete(created_user.id)
+    run_with_repository(scenario)
+
+
+def test_update_user_role():
+    """
+    Prueba la actualización del rol de un usuario existente.
+    """
+    async def scenario(user_repository: AsyncUserRepository) -> None:
+        created_user = await create_user(user_repository, "async_bob")
+        films_role = await user_repository.get_rol("films")
+
+        updated_user = await user_repository.update(
+            created_user.id, {"username": "async_charlie", "role_id": films_role.id})
+        assert updated_user.username == "async_charlie"
+        assert updated_user.role.name == "films"
+
+        await user_repository.delete(created_user.id)
+    run_with_repository(scenario)
+
+
+def test_delete_user():
+    """
+    Prueba la eliminación de un usuario.
+    """
+    async def scenario(user_repository: AsyncUserRepository) -> None:
+        created_user = await create_user(user_repository, "async_pedro")
+
+        await user_repository.delete(created_user.id)
+        assert await user_repository.get(created_user.id) is None
+    run_with_repository(scenario)
+
+
+def test_rotate_refresh_token_only_once():
+    """
+    Prueba que un token de actualización solo puede rotarse una vez y que los tokens del
+    usuario se eliminan junto con él.
+    """
+    async def scenario(user_repository: AsyncUserRepository) -> None:
+        created_user = await create_user(user_repository, "async_rotation")
+        expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+        current = await user_repository.add_refresh_token(RefreshToken(
+            token_hash="a" * 64, family_id="f" * 32, user_id=created_user.id,
+            expires_at=expires_at))
+
+        replacement = RefreshToken(
+            token_hash="b" * 64, family_id="f" * 32, user_id=created_user.id,
+            expires_at=expires_at)
+        assert await user_repository.rotate_refresh_token(current, replacement)
+        assert not await user_repository.rotate_refresh_token(current, RefreshToken(
+            token_hash="c" * 64, family_id="f" * 32, user_id=created_user.id,
+            expires_at=expires_at))
+
+        stored = await user_repository.get_refresh_token("b" * 64)
+        assert stored.user.role.name == "admin"
+        assert await user_repository.revoke_refresh_tokens("f" * 32) == 1
+
+        await user_repository.delete(created_user.id)
+        assert await user_repository.get_refresh_token("a" * 64) is None
+    run_with_repository(scenario)
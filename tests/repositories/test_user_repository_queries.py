@@ -0,0 +1,62 @@
+""" Módulo de pruebas de la cantidad de consultas del repositorio de usuario
+"""
+from typing import Generator
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.BaseModel import EntityMeta
+from models.UserModel import User, Role
+from repositories.user_repository import UserRepository
+from schemas.user_schema import UserSchema
+from tests.query_counter import assert_num_queries
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture(scope="module")
+def db_session() -> Generator[Session, None, None]:
+    """
+    Fixture con una base de datos en memoria con 20 usuarios repartidos en 4 roles.
+    """
+    EntityMeta.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    roles = [Role(name=name) for name in ("admin", "films", "people", "species")]
+    db.add_all(roles)
+    db.add_all(
+        User(username=f"user{i}", email=f"user{i}@example.com", password="Password",
+             role=roles[i % len(roles)])
+        for i in range(20))
+    db.commit()
+    yield db
+    db.close()
+    EntityMeta.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def user_repository(db_session: Session) -> UserRepository:
+    """
+    Fixture del repositorio con la identidad de la sesión vacía, como en una petición nueva.
+    """
+    db_session.expunge_all()
+    return UserRepository(db=db_session)
+
+
+def test_list_loads_roles_in_one_query(user_repository: UserRepository):
+    """
+    Serializar una página de usuarios no emite una consulta por rol.
+    """
+    with assert_num_queries(engine, 1):
+        users = user_repository.list(query_params=None, limit=20, start=0)
+        serialized = [UserSchema.model_validate(user, from_attributes=True) for user in users]
+    assert len({user.role.name for user in serialized}) == 4
+
+
+def test_get_loads_role_in_one_query(user_repository: UserRepository):
+    """
+    Obtener un usuario con su rol requiere una única consulta.
+    """
+    with assert_num_queries(engine, 1):
+        user = user_repository.get(1)
+        assert user.role.name == "admin"
@@ -0,0 +1,140 @@
+""" Módulo de pruebas para el servicio de autenticación
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Generator
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.BaseModel import EntityMeta
+from models.UserModel import Role, User
+from infrastructure.security.authtentication import get_password_hash, hash_refresh_token
+from infrastructure.security.rate_limiter import (
+    InMemoryRateLimitStorage,
+    LoginRateLimiter,
+    RateLimitExceeded,
+    SlidingWindowRateLimiter
+)
+from repositories.user_repository import UserRepository
+from services import auth_service as auth_service_module
+from services.auth_service import AuthService
+from tests.query_counter import assert_num_queries
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def db_session() -> Generator[Session, None, None]:
+    """
+    Fixture con una base de datos en memoria con un usuario.
+    """
+    EntityMeta.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    role = Role(name="films")
+    db.add(role)
+    db.flush()
+    db.add(User(
+        username="jane", email="jane@example.com",
+        password=get_password_hash("Password"), role_id=role.id))
+    db.commit()
+    yield db
+    db.close()
+    EntityMeta.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def auth_service(db_session: Session) -> AuthService:
+    """
+    Fixture del servicio de autenticación con un límite de dos intentos por usuario.
+    """
+    storage = InMemoryRateLimitStorage()
+    login_limiter = LoginRateLimiter(
+        by_username=SlidingWindowRateLimiter(storage, 2, 60, "login:username"),
+        by_ip=SlidingWindowRateLimiter(storage, 10, 60, "login:ip"))
+    return AuthService(user_repository=UserRepository(db=db_session), login_limiter=login_limiter)
+
+
+def test_successful_login_releases_username_and_ip_attempts(auth_service: AuthService):
+    """
+    Un inicio de sesión exitoso no consume los intentos del usuario ni los de la IP.
+    """
+    for _ in range(11):
+        token = asyncio.run(auth_service.login("jane", "Password", "10.0.0.1"))
+        assert token.token_type == "bearer"
+
+
+def test_over_limit_is_rejected_before_query_and_hashing(
+    auth_service: AuthService, monkeypatch: pytest.MonkeyPatch):
+    """
+    Los intentos por encima del límite se rechazan sin consultar la base de datos ni
+    verificar la contraseña.
+    """
+    verifications = []
+    verify = auth_service_module.verify_password_async
+
+    async def counting_verify(plain_password: str, hashed_password: str) -> bool:
+        verifications.append(plain_password)
+        return await verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(auth_service_module, "verify_password_async", counting_verify)
+    assert asyncio.run(auth_service.login("jane", "wrong", "10.0.0.1")) is None
+    assert asyncio.run(auth_service.login("jane", "wrong", "10.0.0.1")) is None
+
+    with assert_num_queries(engine, 0):
+        with pytest.raises(RateLimitExceeded):
+            asyncio.run(auth_service.login("jane", "Password", "10.0.0.2"))
+    assert len(verifications) == 2
+
+
+def test_refresh_rotates_token_without_hashing(
+    auth_service: AuthService, monkeypatch: pytest.MonkeyPatch):
+    """
+    Renovar la sesión devuelve un nuevo par de tokens sin verificar la contraseña, y el
+    token de actualización anterior deja de ser válido.
+    """
+    login = asyncio.run(auth_service.login("jane", "Password"))
+
+    async def fail_verify(plain_password: str, hashed_password: str) -> bool:
+        raise AssertionError("refresh no debe verificar la contraseña")
+
+    monkeypatch.setattr(auth_service_module, "verify_password_async", fail_verify)
+    with assert_num_queries(engine, 3):
+        renewed = asyncio.run(auth_service.refresh(login.refresh_token))
+
+    assert renewed.access_token
+    assert renewed.refresh_token != login.refresh_token
+    stored = auth_service.user_repository.get_refresh_token(
+        hash_refresh_token(renewed.refresh_token))
+    assert stored.token_hash != renewed.refresh_token
+    assert asyncio.run(auth_service.refresh("unknown")) is None
+
+
+def test_reused_refresh_token_revokes_family(auth_service: AuthService):
+    """
+    Presentar un token ya rotado revoca todos los tokens obtenidos a partir del mismo
+    inicio de sesión.
+    """
+    login = asyncio.run(auth_service.login("jane", "Password"))
+    renewed = asyncio.run(auth_service.refresh(login.refresh_token))
+
+    assert asyncio.run(auth_service.refresh(login.refresh_token)) is None
+    assert asyncio.run(auth_service.refresh(renewed.refresh_token)) is None
+
+
+def test_revoked_and_expired_tokens_are_rejected(auth_service: AuthService, db_session: Session):
+    """
+    Los tokens revocados al cerrar sesión y los expirados no renuevan la sesión.
+    """
+    first = asyncio.run(auth_service.login("jane", "Password"))
+    second = asyncio.run(auth_service.login("jane", "Password"))
+
+    assert asyncio.run(auth_service.revoke(first.refresh_token))
+    assert asyncio.run(auth_service.refresh(first.refresh_token)) is None
+
+    stored = auth_service.user_repository.get_refresh_token(
+        hash_refresh_token(second.refresh_token))
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    assert asyncio.run(auth_service.refresh(second.refresh_token)) is None
@@ -0,0 +1,380 @@
+""" Módulo de pruebas para el servicio de Ghibli
+"""
+import asyncio
+import json
+import os
+import httpx
+import pytest
+
+from infrastructure.cache.single_flight import SingleFlight
+from infrastructure.cache.ttl_cache import TTLCache
+from infrastructure.resilience import CircuitBreaker, RetryBudget, UpstreamError, UpstreamGuard
+from repositories.ghibli_snapshot_repository import GhibliSnapshotRepository
+from schemas.film_schema import FilmSchema
+from schemas.ghibli_query_schema import GhibliFilterSchema, GhibliQuerySchema
+from schemas.people_schema import PeopleSchema
+from services.ghibli_endpoint_service import GhibliService, estimate_size
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "..", "fixtures", "ghibli_snapshot.json")
+
+FILM = {
+    "id": "2baf70d1-42bb-4437-b551-e5fed5a87abe",
+    "title": "Castle in the Sky",
+    "original_title": "天空の城ラピュタ",
+    "original_title_romanised": "Tenkū no shiro Rapyuta",
+    "description": "The orphan Sheeta inherited a mysterious crystal...",
+    "director": "Hayao Miyazaki",
+    "producer": "Isao Takahata",
+    "release_date": "1986",
+    "running_time": "124",
+    "rt_score": "95",
+    "people": ["https://ghibliapi.vercel.app/people/"],
+    "species": ["https://ghibliapi.vercel.app/species/"],
+    "locations": ["https://ghibliapi.vercel.app/locations/"],
+    "vehicles": ["https://ghibliapi.vercel.app/vehicles/"],
+    "url": "https://ghibliapi.vercel.app/films/2baf70d1-42bb-4437-b551-e5fed5a87abe"
+}
+
+
+def build_service(
+    client: httpx.AsyncClient,
+    cache: TTLCache | None = None,
+    single_flight: SingleFlight | None = None,
+    **settings
+    ) -> GhibliService:
+    """
+    Construye el servicio con sus dependencias, permitiendo sobrescribir la configuración.
+    """
+    service = GhibliService(
+        client=client,
+        cache=cache if cache is not None else TTLCache(sizeof=estimate_size),
+        single_flight=single_flight if single_flight is not None else SingleFlight(),
+        snapshot_repository=GhibliSnapshotRepository(),
+        guard=UpstreamGuard(CircuitBreaker(), RetryBudget(), max_retries=0))
+    service.env = service.env.model_copy(update=settings)
+    return service
+
+
+@pytest.fixture(scope="function")
+def requests_log() -> list:
+    """
+    Fixture que registra las peticiones realizadas a la API simulada.
+    """
+    return []
+
+
+class FakeClock:
+    """
+    Reloj manual para controlar la expiración de la caché.
+    """
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def upstream() -> dict:
+    """
+    Fixture con el estado de la API simulada.
+    """
+    return {"fail": False}
+
+
+@pytest.fixture(scope="function")
+def client(requests_log: list, upstream: dict) -> httpx.AsyncClient:
+    """
+    Fixture que crea un cliente HTTP contra una API de Ghibli simulada.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests_log.append(request)
+        await asyncio.sleep(0.01)
+        if upstream["fail"]:
+            return httpx.Response(500, json={})
+        if request.url.path == f"/films/{FILM['id']}":
+            return httpx.Response(200, json=FILM)
+        if request.url.path == "/films":
+            return httpx.Response(200, json=[FILM])
+        if request.url.path in ("/people", "/locations", "/species", "/vehicles"):
+            return httpx.Response(200, json=[])
+        return httpx.Response(404, json={})
+
+    return httpx.AsyncClient(
+        base_url="https://ghibli.test", transport=httpx.MockTransport(handler))
+
+
+def test_get_info_reuses_shared_client(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que el servicio utiliza el cliente inyectado en lugar de crear uno por petición.
+    """
+    service = build_service(client)
+
+    films = asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=10))
+    film = asyncio.run(service.get_info(FilmSchema, endpoint='films', endpoint_id=FILM["id"]))
+
+    assert films[0].title == FILM["title"]
+    assert film[0].id == FILM["id"]
+    assert len(requests_log) == 2
+    assert requests_log[0].url.params["limit"] == "10"
+    assert not client.is_closed
+
+
+def test_get_info_serves_cached_models(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que las consultas repetidas se responden desde la caché sin ir a la API.
+    """
+    cache = TTLCache(sizeof=estimate_size)
+    service = build_service(client, cache=cache)
+
+    first = asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=None))
+    second = asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=50))
+
+    assert len(requests_log) == 1
+    assert second[0] is first[0]
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_calls_share_one_upstream_request(
+    client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que las peticiones concurrentes con la misma llave esperan una única llamada.
+    """
+    single_flight = SingleFlight()
+    service = build_service(client, single_flight=single_flight)
+
+    async def burst():
+        return await asyncio.gather(
+            *[service.get_info(FilmSchema, endpoint='films', limit=None) for _ in range(20)])
+
+    results = asyncio.run(burst())
+
+    assert len(requests_log) == 1
+    assert all(result[0].id == FILM["id"] for result in results)
+    assert single_flight.stats() == {"in_flight": 0, "calls": 1, "shared": 19}
+
+
+def test_expired_entry_is_served_stale_and_refreshed(
+    client: httpx.AsyncClient, requests_log: list, upstream: dict):
+    """
+    Prueba que una entrada expirada se sirve al instante y se refresca en segundo plano,
+    manteniéndose disponible aunque la API falle.
+    """
+    clock = FakeClock()
+    cache = TTLCache(sizeof=estimate_size, clock=clock)
+    service = build_service(client, cache=cache)
+
+    async def scenario():
+        await service.get_info(FilmSchema, endpoint='films', limit=None)
+        clock.now = service.cache_ttl('films') + 1
+
+        upstream["fail"] = True
+        stale = await service.get_info(FilmSchema, endpoint='films', limit=None)
+        await asyncio.sleep(0.05)
+        still_stale = await service.get_info(FilmSchema, endpoint='films', limit=None)
+        await asyncio.sleep(0.05)
+
+        upstream["fail"] = False
+        await service.get_info(FilmSchema, endpoint='films', limit=None)
+        await asyncio.sleep(0.05)
+        return stale, still_stale
+
+    stale, still_stale = asyncio.run(scenario())
+
+    assert stale[0].id == FILM["id"]
+    assert still_stale[0].id == FILM["id"]
+    assert len(requests_log) == 4
+    assert cache.get_entry(('films', None, 50)).is_fresh(clock.now)
+
+
+def test_warm_up_preloads_all_collections(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que la precarga deja en caché las cinco colecciones.
+    """
+    cache = TTLCache(sizeof=estimate_size)
+    service = build_service(client, cache=cache)
+
+    asyncio.run(service.warm_up())
+
+    assert len(requests_log) == 5
+    assert len(cache) == 5
+
+
+def test_snapshot_mode_answers_without_network(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que con el catálogo local cargado las consultas no llegan a la API.
+    """
+    service = build_service(client, GHIBLI_SOURCE='snapshot', GHIBLI_SNAPSHOT_PATH=SNAPSHOT_PATH)
+
+    async def scenario():
+        await service.reload_snapshot()
+        films = await service.get_info(FilmSchema, endpoint='films', limit=1)
+        person = await service.get_info(
+            PeopleSchema, endpoint='people', endpoint_id='fe93adf2-2f3a-4ec4-9f68-5422f1b87c01')
+        return films, person
+
+    films, person = asyncio.run(scenario())
+
+    assert [film.title for film in films] == ["Castle in the Sky"]
+    assert person[0].name == "Pazu"
+    assert requests_log == []
+
+
+def test_snapshot_mode_unknown_id_is_not_found(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que con el catálogo local un ID inexistente responde 404 igual que la API.
+    """
+    service = build_service(client, GHIBLI_SOURCE='snapshot', GHIBLI_SNAPSHOT_PATH=SNAPSHOT_PATH)
+
+    async def scenario():
+        await service.reload_snapshot()
+        await service.get_info(FilmSchema, endpoint='films', endpoint_id='unknown')
+
+    with pytest.raises(UpstreamError) as error:
+        asyncio.run(scenario())
+
+    assert error.value.status_code == 404
+    assert requests_log == []
+
+
+def test_reload_snapshot_from_upstream_keeps_previous_on_failure(
+    client: httpx.AsyncClient, requests_log: list, upstream: dict):
+    """
+    Prueba que la recarga desde la API reemplaza el catálogo y que un fallo conserva el anterior.
+    """
+    service = build_service(client, GHIBLI_SOURCE='snapshot', GHIBLI_SNAPSHOT_PATH=None)
+
+    snapshot = asyncio.run(service.reload_snapshot())
+    upstream["fail"] = True
+    with pytest.raises(UpstreamError):
+        asyncio.run(service.reload_snapshot())
+
+    assert service.snapshot_repository.snapshot is snapshot
+    assert snapshot.stats()["films"] == 1
+    assert requests_log[0].url.params["limit"] == "250"
+
+
+def test_query_info_filters_sorts_and_paginates(client: httpx.AsyncClient):
+    """
+    Prueba los filtros de igualdad y rango, el ordenamiento y el desplazamiento.
+    """
+    service = build_service(client, GHIBLI_SOURCE='snapshot', GHIBLI_SNAPSHOT_PATH=SNAPSHOT_PATH)
+    asyncio.run(service.reload_snapshot())
+
+    def titles(**query) -> list:
+        films = asyncio.run(service.query_info(
+            FilmSchema, endpoint='films', query=GhibliQuerySchema(**query)))
+        return [film.title for film in films]
+
+    assert titles(filters=[GhibliFilterSchema.parse("rt_score>=96")]) == ["Grave of the Fireflies"]
+    assert titles(filters=[GhibliFilterSchema.parse("director=Hayao Miyazaki")]) == [
+        "Castle in the Sky"]
+    assert titles(sort=["-release_date"]) == ["Grave of the Fireflies", "Castle in the Sky"]
+    assert titles(sort=["title"], offset=1) == ["Grave of the Fireflies"]
+
+
+def test_validate_query_and_project(client: httpx.AsyncClient):
+    """
+    Prueba que se rechazan campos desconocidos y que la proyección conserva solo los pedidos.
+    """
+    service = build_service(client)
+    film = FilmSchema(**FILM)
+
+    with pytest.raises(ValueError):
+        service.validate_query(FilmSchema, GhibliQuerySchema(sort=["-budget"]))
+    with pytest.raises(ValueError):
+        GhibliFilterSchema.parse("rt_score")
+    assert service.project([film], ["id", "title"]) == [{"id": FILM["id"], "title": FILM["title"]}]
+
+
+def test_expand_embeds_references_once(client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que las referencias se resuelven una sola vez y se embeben en la respuesta,
+    conservando las URLs que no apuntan a un recurso.
+    """
+    service = build_service(client, GHIBLI_SOURCE='snapshot', GHIBLI_SNAPSHOT_PATH=SNAPSHOT_PATH)
+    asyncio.run(service.reload_snapshot())
+    films = asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=None))
+
+    expanded = asyncio.run(service.expand(films, ["people", "locations"]))
+
+    assert [person["name"] for person in expanded[0]["people"]] == [
+        "Pazu", "Lusheeta Toel Ul Laputa"]
+    assert expanded[0]["locations"] == ["https://ghibliapi.vercel.app/locations/"]
+    assert service.project(expanded, ["title"]) == [
+        {"title": "Castle in the Sky"}, {"title": "Grave of the Fireflies"}]
+    assert requests_log == []
+
+
+def test_expand_fetches_missing_references_from_upstream(
+    client: httpx.AsyncClient, requests_log: list):
+    """
+    Prueba que las referencias que no están en caché se consultan a la API.
+    """
+    service = build_service(client)
+    person = PeopleSchema(
+        id="1", name="Pazu", gender="Male", age="13", eye_color="Black", hair_color="Brown",
+        films=[FILM["url"], FILM["url"]], species="", url="")
+
+    expanded = asyncio.run(service.expand([person, person], ["films"]))
+
+    assert expanded[0]["films"][0]["title"] == FILM["title"]
+    assert len(requests_log) == 1
+
+
+def test_upstream_errors_raise_instead_of_returning_dict(
+    client: httpx.AsyncClient, upstream: dict):
+    """
+    Prueba que los errores de la API se reportan como UpstreamError con su código HTTP.
+    """
+    service = build_service(client)
+
+    with pytest.raises(UpstreamError) as not_found:
+        asyncio.run(service.get_info(FilmSchema, endpoint='films', endpoint_id='unknown'))
+    upstream["fail"] = True
+    with pytest.raises(UpstreamError) as failure:
+        asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=None))
+
+    assert not_found.value.status_code == 404
+    assert failure.value.status_code == 502
+
+
+def test_cached_collection_is_served_when_upstream_fails(
+    client: httpx.AsyncClient, requests_log: list, upstream: dict):
+    """
+    Prueba que con la API caída se responde desde la colección completa en caché.
+    """
+    service = build_service(client)
+    asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=250))
+    upstream["fail"] = True
+
+    film = asyncio.run(service.get_info(FilmSchema, endpoint='films', endpoint_id=FILM["id"]))
+    films = asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=10))
+
+    assert film[0].id == FILM["id"]
+    assert films[0].id == FILM["id"]
+    assert len(requests_log) == 3
+
+
+def test_cached_body_is_serialized_and_compressed_once(client: httpx.AsyncClient):
+    """
+    Prueba que el cuerpo de una entrada en caché se serializa y comprime una sola vez y
+    que su tamaño se suma al de la entrada.
+    """
+    cache = TTLCache(sizeof=estimate_size)
+    service = build_service(client, cache=cache, COMPRESSION_MINIMUM_SIZE=0)
+    asyncio.run(service.get_info(FilmSchema, endpoint='films', limit=None))
+    size = cache.stats()["bytes"]
+
+    body, encoding, etag = service.cached_body(FilmSchema, 'films', None, None, "gzip")
+    again, _, _ = service.cached_body(FilmSchema, 'films', None, None, "gzip")
+    plain, plain_encoding, plain_etag = service.cached_body(
+        FilmSchema, 'films', None, None, None)
+
+    assert encoding == "gzip"
+    assert again is body
+    assert plain_encoding is None
+    assert etag == plain_etag
+    assert json.loads(plain)[0]["title"] == FILM["title"]
+    assert cache.stats()["bytes"] == size + len(plain) + len(body)
+    assert service.cached_body(FilmSchema, 'people', None, None, "gzip") is None
@@ -0,0 +1,314 @@
+""" Módulo de pruebas para el servicio de usuarios
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Generator
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.BaseModel import EntityMeta
+from models.UserModel import Role, User
+from repositories.role_registry import RoleRegistry
+from repositories.user_repository import UserRepository
+from schemas.user_schema import (
+    RoleEnum,
+    UserBulkSelectionSchema,
+    UserBulkUpdateRequestSchema,
+    UserCreateRequestSchema,
+    UserQuerySchema,
+    UserUpdateRequestSchema
+)
+from infrastructure.record_stream import NDJSON_CONTENT_TYPE, iter_records
+from services import user_service as user_service_module
+from services.user_service import EXPORT_FLUSH_ROWS, UserService
+from tests.query_counter import assert_num_queries
+
+engine = create_engine(
+    "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def db_session() -> Generator[Session, None, None]:
+    """
+    Fixture con una base de datos en memoria con los roles del sistema.
+    """
+    EntityMeta.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(Role(name=role.value) for role in RoleEnum)
+    db.commit()
+    yield db
+    db.close()
+    EntityMeta.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def role_registry(db_session: Session) -> RoleRegistry:
+    """
+    Fixture del registro de roles cargado como en el arranque de la aplicación.
+    """
+    registry = RoleRegistry()
+    registry.load(UserRepository(db=db_session).list_roles())
+    return registry
+
+
+@pytest.fixture
+def user_service(db_session: Session, role_registry: RoleRegistry) -> UserService:
+    """
+    Fixture del servicio de usuarios con el repositorio síncrono.
+    """
+    return UserService(user_repository=UserRepository(db=db_session), role_registry=role_registry)
+
+
+def test_registry_maps_names(role_registry: RoleRegistry):
+    """
+    El registro resuelve los roles por nombre y por valor del enum.
+    """
+    films = role_registry.get_by_name(RoleEnum.films)
+    assert films == role_registry.get_by_name("films")
+    assert role_registry.get_by_name("unknown") is None
+
+
+def test_create_resolves_role_without_querying_roles(user_service: UserService):
+    """
+    Crear un usuario no consulta la tabla de roles.
+    """
+    request = UserCreateRequestSchema(
+        username="jane", email="jane@example.com", password="Password",
+        role_name=RoleEnum.films)
+    with assert_num_queries(engine, 2) as statements:
+        user = asyncio.run(user_service.create(request))
+    assert not any("FROM roles" in statement for statement in statements)
+    assert user.role.name == "films"
+
+
+def test_update_reloads_invalidated_registry(
+    user_service: UserService, role_registry: RoleRegistry):
+    """
+    Tras invalidar el registro, el siguiente uso vuelve a cargar los roles.
+    """
+    request = UserCreateRequestSchema(
+        username="bob", email="bob@example.com", password="Password",
+        role_name=RoleEnum.admin)
+    user = asyncio.run(user_service.create(request))
+    role_registry.invalidate()
+
+    updated_user = asyncio.run(user_service.update(
+        user.id, UserUpdateRequestSchema(role_name="species")))
+
+    assert role_registry.loaded
+    assert updated_user.role.name == "species"
+
+
+def test_reload_roles_sees_database_changes(
+    user_service: UserService, role_registry: RoleRegistry, db_session: Session):
+    """
+    Recargar los roles descarta el registro en memoria y lee los cambios de la base de datos.
+    """
+    db_session.add(Role(name="auditors"))
+    db_session.commit()
+    assert role_registry.get_by_name("auditors") is None
+
+    roles = asyncio.run(user_service.reload_roles())
+
+    assert "auditors" in [role.name for role in roles]
+    assert role_registry.get_by_name("auditors").name == "auditors"
+
+
+async def as_stream(*records):
+    """
+    Convierte los registros en un flujo asíncrono como el de la petición.
+    """
+    for record in records:
+        yield record
+
+
+def test_bulk_create_reports_each_row(user_service: UserService):
+    """
+    La carga masiva inserta por lotes e informa el resultado de cada fila.
+    """
+    records = as_stream(
+        {"username": "ana", "email": "ana@example.com", "password": "P", "role_name": "films"},
+        {"username": "ana", "email": "ana2@example.com", "password": "P", "role_name": "films"},
+        {"username": "luis", "email": "not-an-email", "password": "P", "role_name": "films"},
+        {"username": "eva", "email": "eva@example.com", "password": "P", "role_name": "people"})
+
+    with assert_num_queries(engine, 2) as statements:
+        result = asyncio.run(user_service.bulk_create(records, batch_size=2))
+
+    assert all(statement.startswith("INSERT") for statement in statements)
+    assert [item.status for item in result.results] == [
+        "created", "conflict", "invalid", "created"]
+    assert (result.created, result.failed) == (2, 2)
+    assert user_service.user_repository.get(result.results[3].id).role.name == "people"
+
+
+def test_bulk_create_keeps_committed_batches_when_a_line_is_malformed(user_service: UserService):
+    """
+    Una línea mal formada después de un lote insertado se informa como inválida sin
+    descartar las filas ya creadas ni las siguientes.
+    """
+    async def body():
+        yield b'{"username": "ana", "email": "ana@example.com", "password": "P", "role_name": "films"}\n'
+        yield b'{"username": "eva", "email": "eva@example.com", "password": "P", "role_name": "films"}\n'
+        yield b'not json\n'
+        yield b'{"username": "luis", "email": "luis@example.com", "password": "P", "role_name": "films"}\n'
+
+    result = asyncio.run(user_service.bulk_create(
+        iter_records(NDJSON_CONTENT_TYPE, body()), batch_size=1))
+
+    assert [item.status for item in result.results] == [
+        "created", "created", "invalid", "created"]
+    assert (result.created, result.failed) == (3, 1)
+    assert user_service.user_repository.get(result.results[1].id).username == "eva"
+
+
+def test_bulk_create_reports_stream_failure_after_committed_rows(user_service: UserService):
+    """
+    Si el cuerpo deja de poder leerse después de insertar filas, el error se informa en la
+    fila siguiente y las filas creadas se conservan.
+    """
+    async def body():
+        yield b'{"username": "ana", "email": "ana@example.com", "password": "P", "role_name": "films"}\n'
+        yield b'\xff\xfe\n'
+
+    result = asyncio.run(user_service.bulk_create(
+        iter_records(NDJSON_CONTENT_TYPE, body()), batch_size=1))
+
+    assert [(item.row, item.status) for item in result.results] == [
+        (1, "created"), (2, "invalid")]
+    assert user_service.user_repository.get(result.results[0].id).username == "ana"
+
+
+def test_bulk_create_reports_duplicates_and_hashing_errors_per_row(user_service: UserService):
+    """
+    Los usuarios o correos repetidos dentro de un lote se informan como conflicto antes del
+    INSERT, y una contraseña que no puede cifrarse solo invalida su fila.
+    """
+    records = as_stream(
+        {"username": "ana", "email": "ana@example.com", "password": "P", "role_name": "films"},
+        {"username": "ana", "email": "other@example.com", "password": "P", "role_name": "films"},
+        {"username": "eva", "email": "ana@example.com", "password": "P", "role_name": "films"},
+        {"username": "luis", "email": "luis@example.com", "password": "P" * 5000,
+         "role_name": "films"},
+        {"username": "mia", "email": "mia@example.com", "password": "P", "role_name": "films"})
+
+    result = asyncio.run(user_service.bulk_create(records, batch_size=5))
+
+    assert [item.status for item in result.results] == [
+        "created", "conflict", "conflict", "invalid", "created"]
+    assert user_service.user_repository.get(result.results[0].id).email == "ana@example.com"
+    assert user_service.user_repository.get(result.results[4].id).username == "mia"
+
+    records = as_stream(
+        {"username": "kai", "email": "mia@example.com", "password": "P", "role_name": "films"},
+        {"username": "kai", "email": "kai@example.com", "password": "P", "role_name": "films"})
+    result = asyncio.run(user_service.bulk_create(records, batch_size=2))
+
+    assert [item.status for item in result.results] == ["conflict", "conflict"]
+    assert result.created == 0
+
+
+def test_bulk_create_reports_failed_batch_and_continues(
+    user_service: UserService, monkeypatch: pytest.MonkeyPatch):
+    """
+    Si un lote no puede insertarse, cada una de sus filas se informa como error y los lotes
+    siguientes se insertan.
+    """
+    bulk_create = user_service.user_repository.bulk_create
+    calls = []
+
+    def failing_first_batch(rows):
+        calls.append(rows)
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        return bulk_create(rows)
+    monkeypatch.setattr(user_service.user_repository, "bulk_create", failing_first_batch)
+    records = as_stream(
+        {"username": "ana", "email": "ana@example.com", "password": "P", "role_name": "films"},
+        {"username": "eva", "email": "eva@example.com", "password": "P", "role_name": "films"},
+        {"username": "mia", "email": "mia@example.com", "password": "P", "role_name": "films"})
+
+    result = asyncio.run(user_service.bulk_create(records, batch_size=2))
+
+    assert [item.status for item in result.results] == ["error", "error", "created"]
+    assert (result.created, result.failed) == (1, 2)
+
+
+def test_export_streams_csv_in_chunks(
+    user_service: UserService, db_session: Session, monkeypatch: pytest.MonkeyPatch):
+    """
+    La exportación envía la cabecera CSV y las filas en fragmentos acotados.
+    """
+    @asynccontextmanager
+    async def open_repository():
+        yield UserRepository(db=db_session)
+    monkeypatch.setattr(user_service_module, "open_user_repository", open_repository)
+    films = user_service.role_registry.get_by_name("films")
+    db_session.add_all(
+        User(username=f"user{i}", email=f"user{i}@example.com", password="P",
+             role_id=films.id)
+        for i in range(EXPORT_FLUSH_ROWS + 1))
+    db_session.commit()
+
+    async def collect():
+        return [chunk async for chunk in user_service.export(None, "csv", batch_size=10)]
+    chunks = asyncio.run(collect())
+
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "id,username,email,role_id,role"
+    assert lines[1].endswith(",user0,user0@example.com,2,films")
+    assert len(lines) == EXPORT_FLUSH_ROWS + 2
+
+
+def add_users(db_session: Session, role_registry: RoleRegistry, count: int) -> None:
+    """
+    Inserta usuarios con el rol films directamente en la base de datos.
+    """
+    films = role_registry.get_by_name("films")
+    db_session.add_all(
+        User(username=f"user{i}", email=f"user{i}@example.com", password="P",
+             role_id=films.id)
+        for i in range(count))
+    db_session.commit()
+
+
+def test_bulk_update_runs_one_statement_per_chunk(
+    user_service: UserService, db_session: Session, role_registry: RoleRegistry):
+    """
+    La reasignación masiva de rol emite un UPDATE por fragmento.
+    """
+    add_users(db_session, role_registry, 5)
+    request = UserBulkUpdateRequestSchema(
+        filters=UserQuerySchema(role_id=role_registry.get_by_name("films").id),
+        role_name=RoleEnum.people, chunk_size=2)
+
+    with assert_num_queries(engine, 3) as statements:
+        result = asyncio.run(user_service.bulk_update(request))
+
+    assert all(statement.startswith("UPDATE users") for statement in statements)
+    assert result.count == 5
+    assert {user.role.name for user in user_service.user_repository.list(None)} == {"people"}
+
+
+def test_bulk_delete_by_ids(
+    user_service: UserService, db_session: Session, role_registry: RoleRegistry):
+    """
+    La eliminación masiva devuelve solo los IDs que existían.
+    """
+    add_users(db_session, role_registry, 3)
+
+    result = asyncio.run(user_service.bulk_delete(UserBulkSelectionSchema(ids=[1, 3, 99])))
+
+    assert result.ids == [1, 3]
+    assert [user.id for user in user_service.user_repository.list(None)] == [2]
+
+
+def test_bulk_operations_require_a_selection(user_service: UserService):
+    """
+    Sin IDs ni filtros la operación se rechaza en lugar de afectar toda la tabla.
+    """
+    with pytest.raises(ValueError):
+        asyncio.run(user_service.bulk_delete(UserBulkSelectionSchema(filters=UserQuerySchema())))